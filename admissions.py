@@ -0,0 +1,44 @@
+from flask import Blueprint, request, jsonify, current_app
+from src.models.school import db, UserRole
+from src.routes.auth import role_required
+from src.utils.user_import import read_rows, import_users
+
+admissions_bp = Blueprint('admissions', __name__)
+
+DEFAULT_MAX_IMPORT_ROWS = 5000
+
+@admissions_bp.route('/import', methods=['POST'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL])
+def import_admissions():
+    """Create student and parent accounts from a CSV or XLSX sheet.
+
+    Send the sheet as a multipart 'file' or as a text/csv body; ?dry_run=1
+    only validates. Valid rows are imported even when others fail, and
+    every rejected row is listed in the report.
+    """
+    try:
+        upload = request.files.get('file')
+        raw = upload.read() if upload is not None else request.get_data()
+        filename = upload.filename if upload is not None else None
+        try:
+            rows = read_rows(raw, filename, upload.mimetype if upload is not None else request.mimetype)
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({'error': str(e)}), 400
+        if not rows:
+            return jsonify({'error': 'Sheet has no rows'}), 400
+
+        # Hashing dominates: large intakes belong in the import_users.py CLI
+        max_rows = current_app.config.get('USER_IMPORT_MAX_ROWS', DEFAULT_MAX_IMPORT_ROWS)
+        if len(rows) > max_rows:
+            return jsonify({'error': f'Sheet has {len(rows)} rows; the limit is {max_rows}, use the import CLI'}), 413
+
+        dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        report = import_users(rows, dry_run=dry_run)
+        accepted = report['valid'] if dry_run else report['created']
+        # Partial imports succeed; a sheet where every row failed does not
+        status = 400 if report['failed'] and not accepted['students'] + accepted['parents'] else 200
+        return jsonify(report), status
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
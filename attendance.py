@@ -0,0 +1,306 @@
+from flask import Blueprint, request, jsonify, session, current_app
+from collections import Counter
+from src.models.school import (
+    db, UserRole, Student, Teacher, Parent, StudentParent, Attendance, AttendanceSummary,
+    attendance_percentage
+)
+from src.routes.auth import login_required, role_required, get_principal
+from src.routes.events import publish_attendance_alerts
+from src.utils.dialects import insert_for, month_key
+from datetime import datetime
+
+attendance_bp = Blueprint('attendance', __name__)
+
+ATTENDANCE_STATUSES = ('present', 'absent', 'late')
+
+def upsert_attendance(rows, subject_id=None):
+    """Insert or update a batch of attendance rows in a single statement.
+
+    rows are dicts with student_id, class_id, subject_id, date, status,
+    marked_by and marked_at. Conflicts on the (student, date, subject) key
+    overwrite the status and marker, so re-submitting a roster is idempotent.
+    The monthly summaries are adjusted in the same transaction.
+    """
+    if not rows:
+        return
+
+    _update_summaries(rows, subject_id)
+
+    stmt = insert_for(Attendance).values(rows)
+    update_columns = {
+        'status': stmt.excluded.status,
+        'class_id': stmt.excluded.class_id,
+        'marked_by': stmt.excluded.marked_by,
+        'marked_at': stmt.excluded.marked_at,
+    }
+    if subject_id is None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['student_id', 'date'],
+            index_where=Attendance.subject_id.is_(None),
+            set_=update_columns
+        )
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['student_id', 'date', 'subject_id'],
+            set_=update_columns
+        )
+    db.session.execute(stmt)
+
+def _update_summaries(rows, subject_id):
+    """Apply the count deltas of an attendance write to the monthly rollups.
+
+    Existing marks being overwritten are subtracted from their old
+    (student, class, month) bucket before the new marks are added, so the
+    rollup stays exact when a roster is corrected.
+
+    The old marks are only read once the summary rows of the new marks'
+    buckets are locked. Attendance rows that do not exist yet cannot be
+    locked, so without this two first-time marks of the same student and
+    day would both see nothing to subtract and both count. The insert that
+    creates missing summary rows also takes SQLite's write lock, which
+    serializes writers there.
+    """
+    buckets = sorted({(row['student_id'], row['class_id'], row['date'].strftime('%Y-%m')) for row in rows})
+    db.session.execute(insert_for(AttendanceSummary).values([
+        {'student_id': student_id, 'class_id': class_id, 'month': month,
+         'present_count': 0, 'absent_count': 0, 'late_count': 0}
+        for student_id, class_id, month in buckets
+    ]).on_conflict_do_nothing(index_elements=['student_id', 'class_id', 'month']))
+    db.session.query(AttendanceSummary.id).filter(
+        db.tuple_(AttendanceSummary.student_id, AttendanceSummary.class_id, AttendanceSummary.month).in_(buckets)
+    ).order_by(AttendanceSummary.id).with_for_update().all()
+
+    deltas = {}
+
+    def bump(student_id, class_id, day, status, amount):
+        key = (student_id, class_id, day.strftime('%Y-%m'))
+        deltas.setdefault(key, Counter())[status] += amount
+
+    existing = db.session.query(
+        Attendance.student_id, Attendance.class_id, Attendance.date, Attendance.status
+    ).filter(
+        Attendance.student_id.in_({row['student_id'] for row in rows}),
+        Attendance.date.in_({row['date'] for row in rows}),
+        Attendance.subject_id.is_(None) if subject_id is None else Attendance.subject_id == subject_id
+    )
+    written = {(row['student_id'], row['date']) for row in rows}
+    for old in existing:
+        if (old.student_id, old.date) in written:
+            bump(old.student_id, old.class_id, old.date, old.status, -1)
+    for row in rows:
+        bump(row['student_id'], row['class_id'], row['date'], row['status'], 1)
+
+    summary_rows = [
+        {
+            'student_id': student_id,
+            'class_id': class_id,
+            'month': month,
+            'present_count': counts['present'],
+            'absent_count': counts['absent'],
+            'late_count': counts['late']
+        }
+        for (student_id, class_id, month), counts in deltas.items()
+        if any(counts.values())
+    ]
+    if not summary_rows:
+        return
+
+    stmt = insert_for(AttendanceSummary).values(summary_rows)
+    table = AttendanceSummary.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['student_id', 'class_id', 'month'],
+        set_={
+            'present_count': table.c.present_count + stmt.excluded.present_count,
+            'absent_count': table.c.absent_count + stmt.excluded.absent_count,
+            'late_count': table.c.late_count + stmt.excluded.late_count
+        }
+    )
+    db.session.execute(stmt)
+
+def rebuild_attendance_summaries():
+    """Recompute every monthly rollup from the Attendance table."""
+    month = month_key(Attendance.date)
+    counts = db.session.query(
+        Attendance.student_id,
+        Attendance.class_id,
+        month,
+        *(db.func.sum(db.case((Attendance.status == status, 1), else_=0)) for status in ATTENDANCE_STATUSES)
+    ).group_by(Attendance.student_id, Attendance.class_id, month)
+
+    db.session.query(AttendanceSummary).delete()
+    db.session.execute(AttendanceSummary.__table__.insert().from_select(
+        ['student_id', 'class_id', 'month', 'present_count', 'absent_count', 'late_count'],
+        counts
+    ))
+
+def _can_view_student(student_id):
+    role, _ = get_principal(session['user_id'])
+    if role in (UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER):
+        return True
+    if role == UserRole.STUDENT:
+        return db.session.query(Student.id).filter_by(id=student_id, user_id=session['user_id']).first() is not None
+    if role == UserRole.PARENT:
+        return db.session.query(StudentParent.id).join(Parent).filter(
+            StudentParent.student_id == student_id,
+            Parent.user_id == session['user_id']
+        ).first() is not None
+    return False
+
+def _totals(summaries):
+    present = sum(s.present_count for s in summaries)
+    absent = sum(s.absent_count for s in summaries)
+    late = sum(s.late_count for s in summaries)
+    return {
+        'present_count': present,
+        'absent_count': absent,
+        'late_count': late,
+        'total_count': present + absent + late,
+        'attendance_percentage': attendance_percentage(present, absent, late)
+    }
+
+@attendance_bp.route('/summary/student/<int:student_id>', methods=['GET'])
+@login_required
+def get_student_attendance_summary(student_id):
+    try:
+        if not _can_view_student(student_id):
+            return jsonify({'error': 'Insufficient permissions'}), 403
+        
+        query = AttendanceSummary.query.filter_by(student_id=student_id)
+        month = request.args.get('month')
+        if month:
+            query = query.filter_by(month=month)
+        summaries = query.order_by(AttendanceSummary.month).all()
+        
+        return jsonify({
+            'student_id': student_id,
+            'months': [summary.to_dict() for summary in summaries],
+            'overall': _totals(summaries)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/summary/class/<int:class_id>', methods=['GET'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def get_class_attendance_summary(class_id):
+    try:
+        query = AttendanceSummary.query.filter_by(class_id=class_id)
+        month = request.args.get('month')
+        if month:
+            query = query.filter_by(month=month)
+        summaries = query.all()
+        
+        by_student = {}
+        for summary in summaries:
+            by_student.setdefault(summary.student_id, []).append(summary)
+        
+        return jsonify({
+            'class_id': class_id,
+            'month': month,
+            'students': [
+                dict(_totals(rows), student_id=student_id)
+                for student_id, rows in sorted(by_student.items())
+            ],
+            'overall': _totals(summaries)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/summary/rebuild', methods=['POST'])
+@role_required([UserRole.ADMIN])
+def rebuild_summaries():
+    try:
+        rebuild_attendance_summaries()
+        db.session.commit()
+        return jsonify({
+            'message': 'Attendance summaries rebuilt',
+            'rows': AttendanceSummary.query.count()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/bulk', methods=['POST'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def mark_bulk_attendance():
+    try:
+        data = request.get_json()
+
+        # Validate required fields
+        required_fields = ['class_id', 'date', 'records']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'{field} is required'}), 400
+
+        records = data['records']
+        if not isinstance(records, dict) or not records:
+            return jsonify({'error': 'records must be a non-empty {student_id: status} map'}), 400
+
+        try:
+            attendance_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+            statuses = {int(student_id): status for student_id, status in records.items()}
+        except ValueError:
+            return jsonify({'error': 'Invalid date or student id'}), 400
+
+        # Statuses may be any JSON value; compare them as text so sorting can't fail
+        invalid = sorted({str(status) for status in statuses.values() if status not in ATTENDANCE_STATUSES})
+        if invalid:
+            return jsonify({'error': f'Invalid status: {", ".join(invalid)}'}), 400
+
+        class_id = data['class_id']
+        subject_id = data.get('subject_id')
+
+        # Teachers mark as themselves; admins may mark on behalf of a teacher
+        role, _ = get_principal(session['user_id'])
+        if role == UserRole.TEACHER:
+            marked_by = db.session.query(Teacher.id).filter_by(user_id=session['user_id']).scalar()
+        else:
+            marked_by = data.get('marked_by')
+        if not marked_by:
+            return jsonify({'error': 'marked_by teacher is required'}), 400
+
+        # Every student must belong to the class being marked
+        enrolled = {
+            row.id for row in db.session.query(Student.id).filter(
+                Student.class_id == class_id,
+                Student.id.in_(statuses.keys())
+            )
+        }
+        unknown = sorted(set(statuses) - enrolled)
+        if unknown:
+            return jsonify({'error': 'Students not in class', 'student_ids': unknown}), 400
+
+        marked_at = datetime.utcnow()
+        rows = [
+            {
+                'student_id': student_id,
+                'class_id': class_id,
+                'subject_id': subject_id,
+                'date': attendance_date,
+                'status': status,
+                'marked_by': marked_by,
+                'marked_at': marked_at
+            }
+            for student_id, status in statuses.items()
+        ]
+        upsert_attendance(rows, subject_id)
+        db.session.commit()
+
+        # Alerts are best effort; the marks are already saved
+        try:
+            publish_attendance_alerts(rows)
+        except Exception:
+            current_app.logger.exception('Failed to publish attendance alerts')
+
+        return jsonify({
+            'message': 'Attendance marked successfully',
+            'class_id': class_id,
+            'date': attendance_date.isoformat(),
+            'marked': len(rows)
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
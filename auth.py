@@ -1,10 +1,105 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, current_app
 from functools import wraps
+from collections import OrderedDict
+from sqlalchemy.orm import joinedload
 from src.models.school import db, User, UserRole, Student, Teacher, Parent
+from src.utils.pagination import keyset_page, InvalidCursor
+from src.utils.serializers import parse_fields, project, serialize_all, json_response
+from src.utils.session_store import revoke_user_sessions
 from datetime import datetime, date
+import threading
+import time
 
 auth_bp = Blueprint('auth', __name__)
 
+class PrincipalCache:
+    """In-process TTL/LRU cache of (role, is_active) keyed by user id.
+
+    Used by role_required so authorization checks don't hit the database on
+    every request. Entries must be invalidated whenever a user's role or
+    active flag changes; the TTL bounds staleness across worker processes.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[0], entry[1]
+
+    def set(self, user_id, role, is_active, ttl):
+        with self._lock:
+            self._entries[user_id] = (role, is_active, time.monotonic() + ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+principal_cache = PrincipalCache()
+
+def get_principal(user_id):
+    """Return (role, is_active) for user_id, or None if the user is gone."""
+    ttl = current_app.config.get('PRINCIPAL_CACHE_TTL', 60)
+    if ttl > 0:
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+    
+    row = db.session.query(User.role, User.is_active).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    
+    principal = (row.role, row.is_active)
+    if ttl > 0:
+        principal_cache.set(user_id, principal[0], principal[1], ttl)
+    return principal
+
+PROFILE_RELATIONSHIPS = {
+    UserRole.STUDENT: User.student_profile,
+    UserRole.TEACHER: User.teacher_profile,
+    UserRole.PARENT: User.parent_profile,
+}
+
+def load_user_with_profile(*criterion, role=None):
+    """Load a user and its role profile in a single joined SELECT.
+
+    When the role is known (e.g. from the session) only that profile is
+    joined; otherwise all three are outer-joined, since a user has at most
+    one of them.
+    """
+    if role is not None:
+        relationships = [PROFILE_RELATIONSHIPS[role]] if role in PROFILE_RELATIONSHIPS else []
+    else:
+        relationships = list(PROFILE_RELATIONSHIPS.values())
+    
+    query = User.query.filter(*criterion)
+    if relationships:
+        query = query.options(*(joinedload(rel) for rel in relationships))
+    return query.first()
+
+def get_profile_data(user):
+    relationship = PROFILE_RELATIONSHIPS.get(user.role)
+    if relationship is None:
+        return None
+    profile = getattr(user, relationship.key)
+    return profile.to_dict() if profile else None
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -20,8 +115,8 @@ def role_required(roles):
             if 'user_id' not in session:
                 return jsonify({'error': 'Authentication required'}), 401
             
-            user = User.query.get(session['user_id'])
-            if not user or user.role not in roles:
+            principal = get_principal(session['user_id'])
+            if not principal or not principal[1] or principal[0] not in roles:
                 return jsonify({'error': 'Insufficient permissions'}), 403
             
             return f(*args, **kwargs)
@@ -122,7 +217,7 @@ def login():
         if not data.get('email') or not data.get('password'):
             return jsonify({'error': 'Email and password are required'}), 400
         
-        user = User.query.filter_by(email=data['email']).first()
+        user = load_user_with_profile(User.email == data['email'])
         
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
@@ -130,18 +225,17 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Upgrade the stored hash when the configured method or cost changed
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        
         # Create session
         session['user_id'] = user.id
         session['user_role'] = user.role.value
         
         # Get profile data based on role
-        profile_data = None
-        if user.role == UserRole.STUDENT and user.student_profile:
-            profile_data = user.student_profile.to_dict()
-        elif user.role == UserRole.TEACHER and user.teacher_profile:
-            profile_data = user.teacher_profile.to_dict()
-        elif user.role == UserRole.PARENT and user.parent_profile:
-            profile_data = user.parent_profile.to_dict()
+        profile_data = get_profile_data(user)
         
         return jsonify({
             'message': 'Login successful',
@@ -155,25 +249,32 @@ def login():
 @auth_bp.route('/logout', methods=['POST'])
 @login_required
 def logout():
+    # Clearing the session deletes it from the server-side store
     session.clear()
     return jsonify({'message': 'Logout successful'}), 200
 
+@auth_bp.route('/logout-all', methods=['POST'])
+@login_required
+def logout_all():
+    """End every session of the current user, on all devices."""
+    revoked = revoke_user_sessions(current_app, session['user_id'])
+    session.clear()
+    return jsonify({'message': 'Logged out everywhere', 'sessions_revoked': revoked}), 200
+
 @auth_bp.route('/me', methods=['GET'])
 @login_required
 def get_current_user():
     try:
-        user = User.query.get(session['user_id'])
+        try:
+            role_hint = UserRole(session.get('user_role'))
+        except ValueError:
+            role_hint = None
+        user = load_user_with_profile(User.id == session['user_id'], role=role_hint)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Get profile data based on role
-        profile_data = None
-        if user.role == UserRole.STUDENT and user.student_profile:
-            profile_data = user.student_profile.to_dict()
-        elif user.role == UserRole.TEACHER and user.teacher_profile:
-            profile_data = user.teacher_profile.to_dict()
-        elif user.role == UserRole.PARENT and user.parent_profile:
-            profile_data = user.parent_profile.to_dict()
+        profile_data = get_profile_data(user)
         
         return jsonify({
             'user': user.to_dict(),
@@ -203,6 +304,9 @@ def change_password():
         user.updated_at = datetime.utcnow()
         db.session.commit()
         
+        # Sign out other devices that may know the old password
+        revoke_user_sessions(current_app, user.id, keep=session)
+        
         return jsonify({'message': 'Password changed successfully'}), 200
         
     except Exception as e:
@@ -216,6 +320,13 @@ def get_all_users():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         role_filter = request.args.get('role')
+        if per_page < 1:
+            return jsonify({'error': 'per_page must be at least 1'}), 400
+        
+        try:
+            fields = parse_fields(User, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         query = User.query
         
@@ -226,22 +337,76 @@ def get_all_users():
             except ValueError:
                 return jsonify({'error': 'Invalid role filter'}), 400
         
-        users = query.paginate(
+        # Cursor mode: keyset pagination, no OFFSET scan and COUNT only on request
+        if request.args.get('pagination') == 'cursor' or 'cursor' in request.args:
+            return _get_users_by_cursor(query, per_page, bool(role_filter), fields)
+        
+        users = project(query, User, fields).order_by(User.id).paginate(
             page=page, 
             per_page=per_page, 
             error_out=False
         )
         
-        return jsonify({
-            'users': [user.to_dict() for user in users.items],
+        return json_response({
+            'users': serialize_all(User, users.items, fields),
             'total': users.total,
             'pages': users.pages,
             'current_page': page
-        }), 200
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+USER_SORT_KEYS = {
+    'id': [User.id],
+    'created_at': [User.created_at, User.id],
+}
+
+def _estimate_user_count():
+    """Planner row estimate for the users table; exact COUNT off PostgreSQL."""
+    if db.engine.dialect.name == 'postgresql':
+        estimate = db.session.execute(
+            db.text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass")
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+    return User.query.count()
+
+def _get_users_by_cursor(query, per_page, filtered, fields=None):
+    order_by = request.args.get('order_by', 'id')
+    if order_by not in USER_SORT_KEYS:
+        return jsonify({'error': 'Invalid order_by'}), 400
+    
+    # The sort key must be loaded to build the next cursor
+    loaded = fields and tuple(dict.fromkeys(fields + tuple(c.key for c in USER_SORT_KEYS[order_by])))
+    
+    try:
+        users, next_cursor = keyset_page(
+            project(query, User, loaded),
+            USER_SORT_KEYS[order_by],
+            cursor=request.args.get('cursor'),
+            limit=per_page,
+            serializers={'created_at': lambda v: v.isoformat() if v else None},
+            parsers={'created_at': lambda v: datetime.fromisoformat(v) if v else None}
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = {
+        'users': serialize_all(User, users, fields),
+        'next_cursor': next_cursor
+    }
+    
+    # Totals are opt-in: exact runs COUNT(*), estimate uses planner statistics
+    total_mode = request.args.get('total')
+    if total_mode == 'exact' or (total_mode == 'estimate' and filtered):
+        response['total'] = query.order_by(None).count()
+    elif total_mode == 'estimate':
+        response['total'] = _estimate_user_count()
+        response['total_is_estimate'] = True
+    
+    return json_response(response)
+
 @auth_bp.route('/users/<int:user_id>', methods=['PUT'])
 @role_required([UserRole.ADMIN])
 def update_user(user_id):
@@ -268,6 +433,13 @@ def update_user(user_id):
         user.updated_at = datetime.utcnow()
         db.session.commit()
         
+        # Role or active flag may have changed; drop the cached principal
+        principal_cache.invalidate(user_id)
+        
+        # Deactivated users and users with a new role must log in again
+        if not user.is_active or 'role' in data:
+            revoke_user_sessions(current_app, user_id)
+        
         return jsonify({
             'message': 'User updated successfully',
             'user': user.to_dict()
@@ -289,6 +461,8 @@ def delete_user(user_id):
         
         db.session.delete(user)
         db.session.commit()
+        principal_cache.invalidate(user_id)
+        revoke_user_sessions(current_app, user_id)
         
         return jsonify({'message': 'User deleted successfully'}), 200
         
@@ -0,0 +1,110 @@
+"""Load test for POST /api/attendance/bulk: every class marks at the same time.
+
+Simulates the 8 AM rush where each class teacher submits a full roster at
+once. Run from the project root:
+
+    python -m benchmarks.bench_attendance_bulk --classes 24 --students 40
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from src.models.school import db, UserRole, AcademicYear, Class, Teacher, Student, Attendance
+from benchmarks.common import setup_app, create_user, login_as
+
+def seed(class_count, students_per_class):
+    year = AcademicYear(name='2024-2025', start_date=date(2024, 4, 1), end_date=date(2025, 3, 31), is_current=True)
+    db.session.add(year)
+    db.session.flush()
+
+    teachers = []
+    for i in range(class_count):
+        user = create_user(f'teacher{i}@bench.local', UserRole.TEACHER)
+        teacher = Teacher(user_id=user.id, employee_id=f'TEA{i:06d}', first_name='Teacher', last_name=str(i), hire_date=date(2020, 1, 1))
+        db.session.add(teacher)
+        teachers.append(teacher)
+    db.session.flush()
+
+    rosters = []
+    for i, teacher in enumerate(teachers):
+        class_obj = Class(name=f'Grade {i // 2 + 1}', section='AB'[i % 2], academic_year_id=year.id, class_teacher_id=teacher.id)
+        db.session.add(class_obj)
+        db.session.flush()
+        student_ids = []
+        for j in range(students_per_class):
+            user = create_user(f'student{i}-{j}@bench.local', UserRole.STUDENT)
+            student = Student(user_id=user.id, student_id=f'STU{i:03d}{j:03d}', first_name='Student', last_name=f'{i}-{j}',
+                              date_of_birth=date(2012, 1, 1), admission_date=date(2024, 4, 1), class_id=class_obj.id)
+            db.session.add(student)
+            db.session.flush()
+            student_ids.append(student.id)
+        rosters.append((teacher.user_id, class_obj.id, student_ids))
+    db.session.commit()
+    return rosters
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-uri')
+    parser.add_argument('--classes', type=int, default=24)
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--days', type=int, default=5)
+    args = parser.parse_args()
+
+    # Threads need real connections, so default to a throwaway SQLite file
+    tmpdir = tempfile.mkdtemp()
+    database_uri = args.database_uri or 'sqlite:///' + os.path.join(tmpdir, 'attendance_bench.db')
+    app = setup_app(database_uri)
+    with app.app_context():
+        rosters = seed(args.classes, args.students)
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(rosters))
+
+    def mark(teacher_user_id, class_id, student_ids, day):
+        client = app.test_client()
+        login_as(client, teacher_user_id, UserRole.TEACHER)
+        payload = {
+            'class_id': class_id,
+            'date': date(2024, 9, day + 1).isoformat(),
+            'records': {str(sid): ('present', 'absent', 'late')[sid % 3] for sid in student_ids}
+        }
+        barrier.wait()
+        start = time.perf_counter()
+        response = client.post('/api/attendance/bulk', json=payload)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code != 200:
+                errors.append(response.get_json())
+
+    wall = 0.0
+    for day in range(args.days):
+        threads = [threading.Thread(target=mark, args=(*roster, day)) for roster in rosters]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall += time.perf_counter() - start
+
+    with app.app_context():
+        rows = db.session.query(Attendance).count()
+
+    latencies.sort()
+    submissions = len(latencies)
+    print(f'classes x days:      {args.classes} x {args.days} ({submissions} roster submissions)')
+    print(f'attendance rows:     {rows}')
+    print(f'errors:              {len(errors)}')
+    print(f'rosters/sec:         {submissions / wall:.1f}')
+    print(f'marks/sec:           {submissions * args.students / wall:.1f}')
+    print(f'p50 / p95 / max ms:  {latencies[submissions // 2] * 1000:.1f} / '
+          f'{latencies[int(submissions * 0.95)] * 1000:.1f} / {latencies[-1] * 1000:.1f}')
+    if errors:
+        print('first error:', errors[0])
+
+if __name__ == '__main__':
+    main()
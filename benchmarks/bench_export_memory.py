@@ -0,0 +1,85 @@
+"""Check that streaming exports keep peak memory flat on a large table.
+
+Fills a throwaway SQLite database with synthetic attendance rows (one
+million by default), streams /api/exports/attendance as CSV and NDJSON and
+reports the tracemalloc peak for each. Exits non-zero if the peak exceeds
+--max-peak-mb. Run from the project root:
+
+    python -m benchmarks.bench_export_memory --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from src.models.school import db, UserRole, Attendance
+from benchmarks.common import setup_app, create_user, login_as
+
+def fill_attendance(rows, students=1000):
+    # Foreign keys are not enforced by SQLite by default, so the referenced
+    # students/classes/teachers don't need to exist for a memory test
+    start = date(2020, 1, 1)
+    marked_at = datetime(2020, 1, 1, 8)
+    batch = []
+    for i in range(rows):
+        day, student = divmod(i, students)
+        batch.append({
+            'student_id': student + 1, 'class_id': student // 40 + 1, 'subject_id': None,
+            'date': start + timedelta(days=day), 'status': ('present', 'absent', 'late')[i % 3],
+            'marked_by': 1, 'marked_at': marked_at
+        })
+        if len(batch) == 50000:
+            db.session.execute(Attendance.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Attendance.__table__.insert(), batch)
+    db.session.commit()
+
+def measure(client, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(path, buffered=False)
+    size = 0
+    lines = 0
+    for chunk in response.response:
+        size += len(chunk)
+        lines += chunk.count(b'\n' if isinstance(chunk, bytes) else '\n')
+    response.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return lines, size, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--max-peak-mb', type=float, default=32.0)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    app = setup_app('sqlite:///' + os.path.join(tmpdir, 'export_bench.db'))
+    with app.app_context():
+        admin = create_user('admin@bench.local', UserRole.ADMIN)
+        db.session.commit()
+        admin_id = admin.id
+        started = time.perf_counter()
+        fill_attendance(args.rows)
+        print(f'filled {args.rows} attendance rows in {time.perf_counter() - started:.1f}s')
+
+    client = app.test_client()
+    login_as(client, admin_id, UserRole.ADMIN)
+
+    failed = False
+    for fmt in ('csv', 'ndjson'):
+        lines, size, elapsed, peak = measure(client, f'/api/exports/attendance?format={fmt}')
+        peak_mb = peak / 1024 / 1024
+        status = 'ok' if peak_mb <= args.max_peak_mb else 'FAIL'
+        failed = failed or status == 'FAIL'
+        print(f'{status:<4} {fmt:<7} {lines} lines, {size / 1024 / 1024:.1f} MB streamed in {elapsed:.1f}s, '
+              f'peak {peak_mb:.1f} MB (limit {args.max_peak_mb} MB)')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Report /api/auth/login throughput per core at different hash costs.
+
+Each configuration drives a login storm from several client threads, once
+verifying inline on the request thread and once through the password
+verification process pool. Run from the project root:
+
+    python -m benchmarks.bench_password_hashing
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from src.models.school import db, UserRole
+from benchmarks.common import setup_app, create_user
+
+METHODS = [
+    'pbkdf2:sha256:100000',
+    'pbkdf2:sha256:600000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+]
+
+def login_storm(app, emails, threads, duration):
+    count = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(email):
+        client = app.test_client()
+        done = 0
+        while time.perf_counter() < deadline:
+            response = client.post('/api/auth/login', json={'email': email, 'password': 'password'})
+            assert response.status_code == 200, response.get_json()
+            done += 1
+        with lock:
+            count[0] += done
+
+    workers = [threading.Thread(target=worker, args=(emails[i % len(emails)],)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return count[0] / (time.perf_counter() - start)
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=cores * 2)
+    parser.add_argument('--pool-size', type=int, default=cores)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--methods', nargs='*', default=METHODS)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    app = setup_app('sqlite:///' + os.path.join(tmpdir, 'password_bench.db'))
+
+    print(f'{"method":<24} {"mode":<10} {"logins/s":>9} {"per core":>9}')
+    for method in args.methods:
+        app.config['PASSWORD_HASH_METHOD'] = method
+        with app.app_context():
+            db.session.query(db.metadata.tables['users']).delete()
+            emails = [create_user(f'user{i}@bench.local', UserRole.STUDENT).email for i in range(args.threads)]
+            db.session.commit()
+
+        for mode, pool_size in (('inline', 0), ('pool', args.pool_size)):
+            app.config['PASSWORD_VERIFY_POOL_SIZE'] = pool_size
+            rate = login_storm(app, emails, args.threads, args.duration)
+            used_cores = min(pool_size, cores) if pool_size else 1
+            print(f'{method:<24} {mode:<10} {rate:9.1f} {rate / used_cores:9.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Compare requests/sec on /api/auth/users with and without the principal cache.
+
+Run from the project root:
+
+    python -m benchmarks.bench_principal_cache
+"""
+import argparse
+from src.models.school import db, UserRole
+from src.routes.auth import principal_cache
+from benchmarks.common import setup_app, create_user, login_as, requests_per_second
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    app = setup_app(args.database_uri)
+    with app.app_context():
+        admin = create_user('admin@bench.local', UserRole.ADMIN)
+        for i in range(args.users):
+            create_user(f'student{i}@bench.local', UserRole.STUDENT)
+        db.session.commit()
+        admin_id = admin.id
+
+    client = app.test_client()
+    login_as(client, admin_id, UserRole.ADMIN)
+
+    results = {}
+    for label, ttl in (('before (no cache)', 0), ('after (principal cache)', 60)):
+        app.config['PRINCIPAL_CACHE_TTL'] = ttl
+        principal_cache.clear()
+        requests_per_second(client, '/api/auth/users', duration=0.5)  # warm up
+        results[label] = requests_per_second(client, '/api/auth/users', duration=args.duration)
+
+    for label, rps in results.items():
+        print(f'{label:<26} {rps:8.1f} req/s')
+    before, after = results.values()
+    print(f'{"speedup":<26} {after / before:8.2f}x')
+
+if __name__ == '__main__':
+    main()
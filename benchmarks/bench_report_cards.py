@@ -0,0 +1,67 @@
+"""Benchmark class report cards: cold build, cached reads and invalidation.
+
+Seeds the synthetic school, then renders every class's midterm report
+cards through GET /api/reports/class/<id>, counting SELECTs per class.
+Re-posting one exam sheet must drop only that class's cached report. Run
+from the project root:
+
+    python -m benchmarks.bench_report_cards --students 960
+"""
+import argparse
+import os
+import tempfile
+import time
+from src.models.school import db, UserRole, Class, Exam, ExamResult
+from src.routes.reports import report_card_cache
+from benchmarks.common import setup_app, login_as, count_queries, selects
+import seed_data
+
+def render_all(client, class_ids):
+    timings = []
+    counts = []
+    for class_id in class_ids:
+        with count_queries() as statements:
+            start = time.perf_counter()
+            response = client.get(f'/api/reports/class/{class_id}?term=midterm')
+            timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+        counts.append(len(selects(statements)))
+    return timings, counts
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=960)
+    parser.add_argument('--days', type=int, default=20)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    app = setup_app('sqlite:///' + os.path.join(tmpdir, 'report_bench.db'))
+    seed_data.seed_scale(args.students, days=args.days)
+
+    client = app.test_client()
+    login_as(client, 1, UserRole.ADMIN)
+    with app.app_context():
+        class_ids = [row.id for row in db.session.query(Class.id).order_by(Class.id)]
+        report_card_cache.clear()
+
+        cold, counts = render_all(client, class_ids)
+        warm, warm_counts = render_all(client, class_ids)
+        print(f'classes: {len(class_ids)}, students: {args.students}')
+        print(f'cold: {sum(cold) * 1000 / len(cold):.1f} ms/class, max {max(counts)} SELECTs per class')
+        print(f'warm: {sum(warm) * 1000 / len(warm):.2f} ms/class, max {max(warm_counts)} SELECTs per class')
+
+        # Re-grade one exam and make sure only its class is rebuilt
+        exam = db.session.query(Exam).filter_by(exam_type='midterm').first()
+        results = [
+            {'student_id': r.student_id, 'marks_obtained': min(100, r.marks_obtained + 5)}
+            for r in db.session.query(ExamResult).filter_by(exam_id=exam.id)
+        ]
+        response = client.post(f'/api/exams/{exam.id}/results/bulk', json={'results': results})
+        assert response.status_code == 200, response.get_json()
+        _, after = render_all(client, class_ids)
+        rebuilt = [class_id for class_id, count in zip(class_ids, after) if count > 2]
+        assert rebuilt == [exam.class_id], rebuilt
+        print(f'after re-grading exam {exam.id}: rebuilt class(es) {rebuilt}')
+
+if __name__ == '__main__':
+    main()
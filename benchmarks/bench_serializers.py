@@ -0,0 +1,62 @@
+"""Microbenchmark: model.to_dict + json vs compiled serializers.
+
+Serializes 10k in-memory Attendance and User rows each way. Run from the
+project root:
+
+    python -m benchmarks.bench_serializers
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+from src.models.school import User, UserRole, Attendance
+from src.utils.serializers import compile_serializer, orjson
+
+def make_rows(count):
+    attendance = [
+        Attendance(id=i, student_id=i % 500, class_id=i % 24, subject_id=None,
+                   date=date(2024, 4, 1) + timedelta(days=i % 200), status='present',
+                   marked_by=1, marked_at=datetime(2024, 4, 1, 8))
+        for i in range(count)
+    ]
+    users = [
+        User(id=i, email=f'user{i}@bench.local', password_hash='x', role=UserRole.STUDENT,
+             is_active=True, created_at=datetime(2024, 4, 1, 8))
+        for i in range(count)
+    ]
+    return {'Attendance': (Attendance, attendance), 'User': (User, users)}
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for name, (model, rows) in make_rows(args.rows).items():
+        serialize = compile_serializer(model)
+        sparse = compile_serializer(model, ('id', 'student_id' if model is Attendance else 'email'))
+        cases = {
+            'to_dict + json': lambda: json.dumps([row.to_dict() for row in rows]),
+            'compiled + json': lambda: json.dumps([serialize(row) for row in rows]),
+            'compiled sparse + json': lambda: json.dumps([sparse(row) for row in rows]),
+        }
+        if orjson is not None:
+            cases['compiled + orjson'] = lambda: orjson.dumps([serialize(row) for row in rows])
+
+        baseline = None
+        print(f'{name} ({args.rows} rows)')
+        for label, fn in cases.items():
+            elapsed = best_of(fn, args.repeat)
+            baseline = baseline or elapsed
+            print(f'  {label:<24} {elapsed * 1000:8.1f} ms  {baseline / elapsed:5.2f}x')
+
+if __name__ == '__main__':
+    main()
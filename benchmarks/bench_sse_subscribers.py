@@ -0,0 +1,180 @@
+"""Hold thousands of idle SSE subscribers and time event delivery.
+
+Serves the app with gevent's WSGI server (the same model as
+gunicorn -k gevent) and opens --subscribers streams on
+/api/events/stream, each logged in as a separate parent. It then:
+
+  * marks one class absent through POST /api/attendance/bulk and times
+    how long each affected parent takes to receive the alert;
+  * publishes a notice to all parents and times the full fan-out.
+
+Needs gevent (pip install gevent). Run from the project root:
+
+    python -m benchmarks.bench_sse_subscribers --subscribers 5000
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import argparse
+import json
+import os
+import resource
+import secrets
+import socket
+import tempfile
+import time
+from datetime import date
+import gevent
+from gevent.pywsgi import WSGIServer
+from src.models.school import db, UserRole, AcademicYear, Class, Teacher, Student, Parent, StudentParent
+from src.utils.session_store import session_store, session_key
+from benchmarks.common import setup_app, create_user
+
+def seed(parent_count, students_per_class):
+    year = AcademicYear(name='2024-2025', start_date=date(2024, 4, 1), end_date=date(2025, 3, 31), is_current=True)
+    db.session.add(year)
+    db.session.flush()
+    admin = create_user('admin@bench.local', UserRole.ADMIN)
+    teacher_user = create_user('teacher@bench.local', UserRole.TEACHER)
+    teacher = Teacher(user_id=teacher_user.id, employee_id='TEA000001', first_name='T', last_name='T', hire_date=date(2020, 1, 1))
+    db.session.add(teacher)
+    db.session.flush()
+
+    # One child per parent, students_per_class children per class
+    parent_user_ids = []
+    classes = {}
+    for i in range(parent_count):
+        class_index = i // students_per_class
+        if class_index not in classes:
+            class_obj = Class(name=f'Grade {class_index + 1}', section='A', academic_year_id=year.id, class_teacher_id=teacher.id)
+            db.session.add(class_obj)
+            db.session.flush()
+            classes[class_index] = (class_obj.id, [])
+        student_user = create_user(f'student{i}@bench.local', UserRole.STUDENT)
+        student = Student(user_id=student_user.id, student_id=f'STU{i:06d}', first_name='Student', last_name=str(i),
+                          date_of_birth=date(2012, 1, 1), admission_date=date(2024, 4, 1), class_id=classes[class_index][0])
+        parent_user = create_user(f'parent{i}@bench.local', UserRole.PARENT)
+        parent = Parent(user_id=parent_user.id, first_name='Parent', last_name=str(i))
+        db.session.add_all([student, parent])
+        db.session.flush()
+        db.session.add(StudentParent(student_id=student.id, parent_id=parent.id, relationship='guardian'))
+        classes[class_index][1].append((student.id, parent_user.id))
+        parent_user_ids.append(parent_user.id)
+    db.session.commit()
+    return admin.id, teacher.id, classes[0], parent_user_ids
+
+def session_cookie(app, user_id, role):
+    """Store a server-side session for user_id directly and return its id for the cookie."""
+    sid = secrets.token_urlsafe(32)
+    data = app.session_interface.serializer.dumps({'user_id': user_id, 'user_role': role.value})
+    expires_at = time.time() + app.permanent_session_lifetime.total_seconds()
+    session_store(app).set(session_key(sid), data, user_id, expires_at)
+    return sid
+
+def subscriber(port, cookie, received, ready):
+    """Minimal SSE client: records (event, data, arrival time) per message."""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall((f'GET /api/events/stream HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n'
+                  f'Cookie: session={cookie}\r\n\r\n').encode())
+    buffer = b''
+    first = True
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return
+        buffer += chunk
+        if first and b'retry:' in buffer:
+            first = False
+            ready.append(1)
+        while b'\n\n' in buffer:
+            block, buffer = buffer.split(b'\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in block.decode().splitlines() if ': ' in line and not line.startswith(':'))
+            if 'event' in fields:
+                received.append((fields['event'], json.loads(fields['data']), time.perf_counter()))
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscribers', type=int, default=5000)
+    parser.add_argument('--students-per-class', type=int, default=40)
+    args = parser.parse_args()
+
+    # Two descriptors per stream (client and server side) plus headroom
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.subscribers * 2 + 256)), hard))
+
+    tmpdir = tempfile.mkdtemp()
+    app = setup_app('sqlite:///' + os.path.join(tmpdir, 'sse_bench.db'), EVENTS_HEARTBEAT=30)
+    with app.app_context():
+        admin_id, teacher_id, (class_id, roster), parent_user_ids = seed(args.subscribers, args.students_per_class)
+
+    server = WSGIServer(('127.0.0.1', 0), app, log=None, error_log=None, spawn=10000)
+    server.start()
+    port = server.server_port
+
+    received = {}
+    ready = []
+    started = time.perf_counter()
+    greenlets = []
+    for user_id in parent_user_ids:
+        received[user_id] = []
+        cookie = session_cookie(app, user_id, UserRole.PARENT)
+        greenlets.append(gevent.spawn(subscriber, port, cookie, received[user_id], ready))
+    while len(ready) < len(parent_user_ids):
+        gevent.sleep(0.05)
+        if time.perf_counter() - started > 120:
+            raise SystemExit(f'only {len(ready)} of {len(parent_user_ids)} streams connected')
+    connect = time.perf_counter() - started
+    with app.app_context():
+        from src.utils.pubsub import event_hub
+        subscribers = event_hub().subscriber_count()
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'streams open:        {subscribers} (connected in {connect:.1f}s, max RSS {rss_mb:.0f} MB)')
+
+    client = app.test_client()
+
+    # Attendance alerts: one class marked absent, only its parents notified
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+        sess['user_role'] = UserRole.ADMIN.value
+    sent = time.perf_counter()
+    response = client.post('/api/attendance/bulk', json={
+        'class_id': class_id,
+        'date': date(2024, 9, 2).isoformat(),
+        'marked_by': teacher_id,
+        'records': {str(student_id): 'absent' for student_id, _ in roster}
+    })
+    assert response.status_code == 200, response.get_json()
+    expected = {parent_user_id for _, parent_user_id in roster}
+    deadline = time.perf_counter() + 5
+    while time.perf_counter() < deadline and any(not received[user_id] for user_id in expected):
+        gevent.sleep(0.005)
+    latencies = [received[user_id][0][2] - sent for user_id in expected if received[user_id]]
+    stray = sum(1 for user_id, events in received.items() if events and user_id not in expected)
+    print(f'attendance alerts:   {len(latencies)}/{len(expected)} parents, {stray} unexpected, '
+          f'p50 {percentile(latencies, 0.5) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms')
+
+    # Notice fan-out to every parent
+    for events in received.values():
+        events.clear()
+    sent = time.perf_counter()
+    response = client.post('/api/notices', json={
+        'title': 'School closed tomorrow', 'content': 'Weather warning', 'target_role': 'parent', 'is_published': True
+    })
+    assert response.status_code == 201, response.get_json()
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline and any(not events for events in received.values()):
+        gevent.sleep(0.01)
+    latencies = [events[0][2] - sent for events in received.values() if events]
+    print(f'notice fan-out:      {len(latencies)}/{len(received)} parents, '
+          f'p50 {percentile(latencies, 0.5) * 1000:.0f} ms, p99 {percentile(latencies, 0.99) * 1000:.0f} ms, '
+          f'max {max(latencies) * 1000:.0f} ms')
+
+    server.stop(timeout=1)
+    gevent.killall(greenlets, block=False)
+
+if __name__ == '__main__':
+    main()
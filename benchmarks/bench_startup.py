@@ -0,0 +1,77 @@
+"""Cold start: time to import the app and serve its first request.
+
+Each run is a fresh interpreter, as with a new gunicorn worker or a
+--preload master. It times `import src.main`, then binding the db and
+answering one request, for the full app and for workers started with a
+subset of blueprints via APP_BLUEPRINTS. It also checks that the model
+layer has one SQLAlchemy instance and one metadata. Run from the project
+root:
+
+    python -m benchmarks.bench_startup --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r'''
+import gc, json, sys, time
+started = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+import src.models.user
+from flask_sqlalchemy import SQLAlchemy
+from src.models.school import db
+from benchmarks.common import setup_app
+app = setup_app('sqlite://')
+response = app.test_client().get('/api/auth/me')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (served - started) * 1000,
+    'status': response.status_code,
+    'sqlalchemy_instances': sum(isinstance(o, SQLAlchemy) for o in gc.get_objects()),
+    'user_models_shared': src.models.user.User is src.models.school.User,
+    'tables': len(db.metadata.tables),
+    'blueprints': len(app.blueprints),
+    'modules': len(sys.modules),
+    'numpy_loaded': 'numpy' in sys.modules,
+}))
+'''
+
+def run(blueprints, runs):
+    env = dict(os.environ)
+    env.pop('PROFILING', None)
+    if blueprints:
+        env['APP_BLUEPRINTS'] = blueprints
+    else:
+        env.pop('APP_BLUEPRINTS', None)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', CHILD], env=env, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--subsets', default='auth;auth,events',
+                        help='semicolon-separated APP_BLUEPRINTS values to compare with the full app')
+    args = parser.parse_args()
+
+    for blueprints in [''] + [subset for subset in args.subsets.split(';') if subset]:
+        results = run(blueprints, args.runs)
+        last = results[-1]
+        print(f'{blueprints or "all blueprints":<16} '
+              f'import {statistics.median(r["import_ms"] for r in results):6.0f} ms  '
+              f'first request {statistics.median(r["first_request_ms"] for r in results):6.0f} ms  '
+              f'(median of {args.runs}), {last["blueprints"]} blueprints, {last["modules"]} modules')
+
+    print(f'SQLAlchemy instances: {last["sqlalchemy_instances"]}, tables: {last["tables"]}, '
+          f'src.models.user.User is the school User: {last["user_models_shared"]}, '
+          f'numpy loaded at startup: {last["numpy_loaded"]}')
+
+if __name__ == '__main__':
+    main()
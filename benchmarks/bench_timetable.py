@@ -0,0 +1,81 @@
+"""Benchmark the timetable solver on the seeded school layout.
+
+Seeds the synthetic school (24 classes x 9 subjects by default), generates
+a full timetable through POST /api/timetable/generate, then reassigns a
+few TeacherSubject rows and times the incremental /resolve. Run from the
+project root:
+
+    python -m benchmarks.bench_timetable --students 960
+"""
+import argparse
+import os
+import tempfile
+import time
+from src.models.school import db, UserRole, Subject, TeacherSubject, Teacher, TimetableSlot
+from benchmarks.common import setup_app, login_as
+import seed_data
+
+PERIODS_PER_WEEK = {'MATH': 6, 'ENG': 5, 'SCI': 5, 'SS': 4, 'URD': 4, 'CS': 3, 'PHY': 4, 'CHEM': 4, 'BIO': 4}
+SHARED_ROOMS = {'CS': 'computer-lab', 'PHY': 'physics-lab', 'CHEM': 'chemistry-lab', 'BIO': 'biology-lab'}
+ROOM_CAPACITY = {'computer-lab': 2, 'physics-lab': 3, 'chemistry-lab': 3, 'biology-lab': 3}
+
+def check(app):
+    """Assert no class or teacher is double-booked."""
+    with app.app_context():
+        seen = set()
+        for slot in TimetableSlot.query:
+            for key in (('class', slot.class_id, slot.day, slot.period), ('teacher', slot.teacher_id, slot.day, slot.period)):
+                assert key not in seen, key
+                seen.add(key)
+        return len(seen) // 2
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=960)
+    parser.add_argument('--changes', type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    app = setup_app('sqlite:///' + os.path.join(tmpdir, 'timetable_bench.db'))
+    seed_data.seed_scale(args.students, days=1)
+
+    with app.app_context():
+        codes = {subject.id: subject.code for subject in Subject.query}
+        teacher_ids = [teacher.id for teacher in Teacher.query.order_by(Teacher.id)]
+        assignments = TeacherSubject.query.count()
+    options = {
+        'periods_per_week': {str(sid): PERIODS_PER_WEEK[code] for sid, code in codes.items()},
+        'rooms': {str(sid): SHARED_ROOMS[code] for sid, code in codes.items() if code in SHARED_ROOMS},
+        'room_capacity': ROOM_CAPACITY
+    }
+
+    client = app.test_client()
+    login_as(client, 1, UserRole.ADMIN)
+
+    start = time.perf_counter()
+    response = client.post('/api/timetable/generate', json=options)
+    total = time.perf_counter() - start
+    result = response.get_json()
+    assert response.status_code == 200, result
+    print(f'assignments: {assignments}, lessons: {result["lessons"]}, placed: {result["placed"]}, '
+          f'unplaced: {len(result["unplaced"])}')
+    print(f'generate: solve {result["solve_ms"]:.1f} ms, request {total * 1000:.1f} ms')
+    print(f'verified {check(app)} slots without conflicts')
+
+    for i in range(args.changes):
+        with app.app_context():
+            assignment = db.session.get(TeacherSubject, 1 + i * 17 % assignments)
+            assignment.teacher_id = teacher_ids[(teacher_ids.index(assignment.teacher_id) + 7) % len(teacher_ids)]
+            db.session.commit()
+            assignment_id = assignment.id
+        start = time.perf_counter()
+        response = client.post('/api/timetable/resolve', json=dict(options, teacher_subject_id=assignment_id))
+        total = time.perf_counter() - start
+        result = response.get_json()
+        assert response.status_code == 200, result
+        print(f'resolve #{i + 1}: solve {result["solve_ms"]:.1f} ms, request {total * 1000:.1f} ms, '
+              f'{result["changed_slots"]} slots rewritten, unplaced {len(result["unplaced"])}')
+    print(f'verified {check(app)} slots without conflicts')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Deadline rush: a whole class uploads assignment files at once.
+
+Every student streams a --size MB file through the chunked upload API
+concurrently. Bodies are generated lazily on the client side, so the
+tracemalloc peak is what the server buffers. Half the class uploads the
+same file to exercise deduplication, one upload is cut off mid-chunk
+and resumed, and a teacher fetches a byte range. Run from the project
+root:
+
+    python -m benchmarks.bench_uploads --students 40 --size 8
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime
+from src.models.school import db, UserRole, AcademicYear, Class, Subject, Teacher, Student, Assignment
+from benchmarks.common import setup_app, create_user, login_as
+
+class GeneratedBody:
+    """File-like request body producing size bytes without holding them."""
+
+    def __init__(self, size, seed, fail_after=None):
+        self.size = size
+        self.position = 0
+        self.block = hashlib.sha256(str(seed).encode()).digest() * 2048  # 64 KiB
+        self.fail_after = fail_after
+
+    def read(self, n=-1):
+        if self.fail_after is not None and self.position >= self.fail_after:
+            raise ConnectionResetError('client went away')
+        if n is None or n < 0:
+            n = self.size - self.position
+        n = min(n, self.size - self.position, len(self.block))
+        self.position += n
+        return self.block[:n]
+
+def seed(student_count):
+    year = AcademicYear(name='2024-2025', start_date=date(2024, 4, 1), end_date=date(2025, 3, 31), is_current=True)
+    subject = Subject(name='Computer Science', code='CS')
+    db.session.add_all([year, subject])
+    db.session.flush()
+    teacher_user = create_user('teacher@bench.local', UserRole.TEACHER)
+    teacher = Teacher(user_id=teacher_user.id, employee_id='TEA000001', first_name='T', last_name='T', hire_date=date(2020, 1, 1))
+    db.session.add(teacher)
+    db.session.flush()
+    class_obj = Class(name='Grade 9', section='A', academic_year_id=year.id, class_teacher_id=teacher.id)
+    db.session.add(class_obj)
+    db.session.flush()
+    assignment = Assignment(title='Project', teacher_id=teacher.id, subject_id=subject.id, class_id=class_obj.id,
+                            due_date=datetime(2030, 1, 1))
+    db.session.add(assignment)
+    student_users = []
+    for i in range(student_count):
+        user = create_user(f'student{i}@bench.local', UserRole.STUDENT)
+        db.session.add(Student(user_id=user.id, student_id=f'STU{i:06d}', first_name='Student', last_name=str(i),
+                               date_of_birth=date(2010, 1, 1), admission_date=date(2024, 4, 1), class_id=class_obj.id))
+        student_users.append(user.id)
+    db.session.commit()
+    return teacher_user.id, assignment.id, student_users
+
+def upload(client, assignment_id, size, chunk, content_seed, fail_at=None):
+    response = client.post('/api/uploads', json={'assignment_id': assignment_id, 'filename': 'project.zip', 'size': size})
+    assert response.status_code == 201, response.get_json()
+    upload_id = response.get_json()['upload_id']
+    offset = 0
+    resumed = False
+    while offset < size:
+        length = min(chunk, size - offset)
+        # Every chunk repeats the same generated block pattern
+        body = GeneratedBody(length, content_seed)
+        if fail_at is not None and not resumed and offset + length > fail_at:
+            body.fail_after = fail_at - offset
+        try:
+            # Hand the body straight to the app as wsgi.input, like a server would
+            response = client.patch(f'/api/uploads/{upload_id}', headers={'Upload-Offset': str(offset)},
+                                    environ_overrides={'wsgi.input': body, 'CONTENT_LENGTH': str(length)})
+        except ConnectionResetError:
+            response = None
+        if response is None or response.status_code != 200:
+            # Interrupted: ask where the server got to and carry on from there
+            resumed = True
+            offset = int(client.head(f'/api/uploads/{upload_id}').headers['Upload-Offset'])
+            continue
+        offset = int(response.headers['Upload-Offset'])
+    return response.get_json(), resumed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--size', type=float, default=8, help='file size in MB')
+    parser.add_argument('--chunk', type=float, default=1, help='chunk size in MB')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    upload_root = os.path.join(tmpdir, 'uploads')
+    app = setup_app('sqlite:///' + os.path.join(tmpdir, 'upload_bench.db'), UPLOAD_FOLDER=upload_root)
+    with app.app_context():
+        teacher_user_id, assignment_id, student_users = seed(args.students)
+
+    size = int(args.size * 1024 * 1024)
+    chunk = int(args.chunk * 1024 * 1024)
+    results = []
+    errors = []
+    lock = threading.Lock()
+
+    def student(index, user_id):
+        client = app.test_client()
+        login_as(client, user_id, UserRole.STUDENT)
+        # Even students share one file; the first upload is interrupted halfway
+        content_seed = 'shared' if index % 2 == 0 else f'own-{index}'
+        try:
+            result = upload(client, assignment_id, size, chunk, content_seed, fail_at=size // 2 + 123 if index == 0 else None)
+            with lock:
+                results.append(result)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+
+    tracemalloc.start()
+    threads = [threading.Thread(target=student, args=(i, user_id)) for i, user_id in enumerate(student_users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    blobs = sum(len(files) for _, _, files in os.walk(os.path.join(upload_root, 'blobs')))
+    total = size * len(results)
+    print(f'uploads:        {len(results)} x {args.size:g} MB in {args.chunk:g} MB chunks, {len(errors)} errors')
+    print(f'throughput:     {total / elapsed / 1024 / 1024:.1f} MB/s ({elapsed:.1f}s)')
+    print(f'python peak:    {peak / 1024 / 1024:.1f} MB for {total / 1024 / 1024:.0f} MB received')
+    print(f'blobs on disk:  {blobs} (expected {args.students // 2 + 1})')
+    print(f'resumed:        {sum(1 for _, resumed in results if resumed)} upload(s)')
+    if errors:
+        print('first error:', errors[0])
+
+    client = app.test_client()
+    login_as(client, teacher_user_id, UserRole.TEACHER)
+    submission_id = results[0][0]['submission']['id']
+    response = client.get(f'/api/uploads/submissions/{submission_id}/file', headers={'Range': 'bytes=1000-1999'})
+    print(f'range request:  HTTP {response.status_code}, {len(response.data)} bytes, {response.headers.get("Content-Range")}')
+
+if __name__ == '__main__':
+    main()
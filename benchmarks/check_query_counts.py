@@ -0,0 +1,143 @@
+"""Fail if hot endpoints issue more SELECTs than their budget.
+
+Meant to run in CI alongside the benchmarks; exits non-zero on a
+regression. Run from the project root:
+
+    python -m benchmarks.check_query_counts
+"""
+import sys
+from datetime import date, datetime, timedelta
+from src.models.school import (
+    db, UserRole, AcademicYear, Class, Subject, Teacher, Student, Parent, StudentParent,
+    Fee, Assignment, AssignmentSubmission, Exam, ExamResult
+)
+from src.routes.attendance import rebuild_attendance_summaries
+from benchmarks.common import setup_app, create_user, login_as, count_queries, selects
+
+# (label, method, path, max SELECTs) checked for every role
+BUDGETS = [
+    ('login', 'POST', '/api/auth/login', 1),
+    ('me', 'GET', '/api/auth/me', 1),
+]
+
+# The parent dashboard must cost the same no matter how many children
+DASHBOARD_BUDGET = 7
+DASHBOARD_CHILDREN = (1, 3, 8)
+
+def seed():
+    year = AcademicYear(name='2024-2025', start_date=date(2024, 4, 1), end_date=date(2025, 3, 31), is_current=True)
+    db.session.add(year)
+    db.session.flush()
+    class_obj = Class(name='Grade 1', section='A', academic_year_id=year.id)
+    db.session.add(class_obj)
+    db.session.flush()
+
+    users = {}
+    users[UserRole.ADMIN] = create_user('admin@bench.local', UserRole.ADMIN)
+    users[UserRole.TEACHER] = create_user('teacher@bench.local', UserRole.TEACHER)
+    db.session.add(Teacher(user_id=users[UserRole.TEACHER].id, employee_id='TEA000001', first_name='T', last_name='T', hire_date=date(2020, 1, 1)))
+    users[UserRole.STUDENT] = create_user('student@bench.local', UserRole.STUDENT)
+    db.session.add(Student(user_id=users[UserRole.STUDENT].id, student_id='STU000001', first_name='S', last_name='S',
+                           date_of_birth=date(2012, 1, 1), admission_date=date(2024, 4, 1), class_id=class_obj.id))
+    users[UserRole.PARENT] = create_user('parent@bench.local', UserRole.PARENT)
+    db.session.add(Parent(user_id=users[UserRole.PARENT].id, first_name='P', last_name='P'))
+    db.session.commit()
+    return {role: user.email for role, user in users.items()}
+
+def seed_families(class_id, teacher_id):
+    """One parent per entry of DASHBOARD_CHILDREN, with that many children.
+
+    Every child has fees, exam results and an upcoming assignment so each
+    section of the dashboard returns rows.
+    """
+    subject = Subject(name='Mathematics', code='MATH')
+    db.session.add(subject)
+    db.session.flush()
+    exam = Exam(name='Midterm', exam_type='midterm', subject_id=subject.id, class_id=class_id,
+                exam_date=datetime(2024, 9, 15), duration_minutes=60, max_marks=100, created_by=teacher_id)
+    assignment = Assignment(title='Homework', teacher_id=teacher_id, subject_id=subject.id, class_id=class_id,
+                            due_date=datetime.utcnow() + timedelta(days=7))
+    db.session.add_all([exam, assignment])
+    db.session.flush()
+
+    parents = {}
+    for family, children in enumerate(DASHBOARD_CHILDREN):
+        user = create_user(f'family{family}@bench.local', UserRole.PARENT)
+        parent = Parent(user_id=user.id, first_name='Family', last_name=str(family))
+        db.session.add(parent)
+        db.session.flush()
+        for child in range(children):
+            student_user = create_user(f'family{family}-child{child}@bench.local', UserRole.STUDENT)
+            student = Student(user_id=student_user.id, student_id=f'FAM{family:02d}{child:02d}', first_name='Child', last_name=str(child),
+                              date_of_birth=date(2012, 1, 1), admission_date=date(2024, 4, 1), class_id=class_id)
+            db.session.add(student)
+            db.session.flush()
+            db.session.add_all([
+                StudentParent(student_id=student.id, parent_id=parent.id, relationship='guardian'),
+                Fee(student_id=student.id, fee_type='tuition', amount=5000, due_date=date(2024, 9, 10),
+                    academic_year_id=1, month='September', is_paid=False, paid_amount=0),
+                ExamResult(exam_id=exam.id, student_id=student.id, marks_obtained=70 + child, grade='B'),
+                AssignmentSubmission(assignment_id=assignment.id, student_id=student.id, submission_text='done')
+            ])
+        parents[children] = user.id
+    rebuild_attendance_summaries()
+    db.session.commit()
+    return parents
+
+def check_parent_dashboard(app):
+    with app.app_context():
+        class_id = db.session.query(Class.id).scalar()
+        teacher_id = db.session.query(Teacher.id).scalar()
+        parents = seed_families(class_id, teacher_id)
+
+    failures = []
+    counts = set()
+    with app.app_context():
+        for children, user_id in parents.items():
+            client = app.test_client()
+            login_as(client, user_id, UserRole.PARENT)
+            with count_queries() as statements:
+                response = client.get('/api/dashboard/parent')
+            count = len(selects(statements))
+            counts.add(count)
+            returned = len(response.get_json().get('children', []))
+            status = 'ok' if count <= DASHBOARD_BUDGET and response.status_code == 200 and returned == children else 'FAIL'
+            print(f'{status:<4} dashboard {children} child(ren): {count} SELECT(s), budget {DASHBOARD_BUDGET}, HTTP {response.status_code}')
+            if status != 'ok':
+                failures.append((f'dashboard with {children} children', 'parent', selects(statements)))
+    if len(counts) > 1:
+        print(f'FAIL dashboard query count varies with children: {sorted(counts)}')
+        failures.append(('dashboard', 'parent', []))
+    return failures
+
+def main():
+    app = setup_app()
+    with app.app_context():
+        emails = seed()
+
+    failures = []
+    with app.app_context():
+        for role, email in emails.items():
+            client = app.test_client()
+            for label, method, path, budget in BUDGETS:
+                with count_queries() as statements:
+                    if method == 'POST':
+                        response = client.post(path, json={'email': email, 'password': 'password'})
+                    else:
+                        response = client.get(path)
+                count = len(selects(statements))
+                status = 'ok' if count <= budget and response.status_code == 200 else 'FAIL'
+                print(f'{status:<4} {label:<8} {role.value:<9} {count} SELECT(s), budget {budget}, HTTP {response.status_code}')
+                if status != 'ok':
+                    failures.append((label, role.value, selects(statements)))
+
+    failures.extend(check_parent_dashboard(app))
+
+    for label, role, statements in failures:
+        print(f'\n{label} as {role}:')
+        for statement in statements:
+            print('   ', ' '.join(statement.split()))
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from src.main import app
+from src.models.school import db, User
+from src.utils import passwords
+
+def setup_app(database_uri='sqlite://', **config):
+    """Bind the shared db to the app for a benchmark run and create tables."""
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_uri,
+        SECRET_KEY='benchmark',
+        TESTING=True,
+        **config
+    )
+    # Benchmarks run in one process; keep their sessions out of the instance folder
+    if not app.config.get('SESSION_STORE_URL'):
+        app.config['SESSION_STORE_URL'] = 'memory://'
+    if 'sqlalchemy' not in app.extensions:
+        db.init_app(app)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+_password_hashes = {}
+
+def create_user(email, role, password='password'):
+    # Hash each distinct password once; seeding thousands of users otherwise
+    # spends most of its time in the password KDF.
+    key = (password, passwords.hash_method())
+    if key not in _password_hashes:
+        _password_hashes[key] = passwords.hash_password(password)
+    user = User(email=email, role=role, is_active=True, password_hash=_password_hashes[key])
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+def login_as(client, user_id, role):
+    """Put a user into the test client's session without going through /login."""
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['user_role'] = role.value
+
+def requests_per_second(client, path, duration=2.0):
+    count = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        response = client.get(path)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+@contextmanager
+def count_queries():
+    """Record every SQL statement issued inside the block.
+
+    Yields a list of statements; SELECTs can be picked out with
+    selects(statements).
+    """
+    statements = []
+    engine = db.engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT')]
@@ -0,0 +1,338 @@
+"""Load test of the API's hot paths over real HTTP.
+
+Seeds the synthetic school (seed_data.seed_scale), serves the app with a
+threaded werkzeug server on a local port and drives it with concurrent
+keep-alive clients. Scenarios:
+
+    login_storm   students and parents logging in at 8 AM (POST /api/auth/login)
+    attendance    class teachers submitting full rosters (POST /api/attendance/bulk)
+    dashboard     parents opening their dashboard (GET /api/dashboard/parent)
+    admin_users   admin paging through users, offset and cursor (GET /api/auth/users)
+    mixed         all of the above interleaved, weighted like a school morning
+
+Sessions for the non-login scenarios are created before timing starts.
+Each scenario reports p50/p95/p99 latency and throughput. The results are
+written as JSON (by default to benchmarks/results/loadtest-<commit>.json),
+and --compare prints the change against an earlier file. Run from the
+project root:
+
+    python -m benchmarks.loadtest --students 2000 --requests 400 --concurrency 16
+    python -m benchmarks.loadtest --compare benchmarks/results/loadtest-abc1234.json --fail-over 20
+
+--database accepts any SQLAlchemy URL, for example a local PostgreSQL
+database (it is dropped and re-seeded). The default is a temporary SQLite
+file.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from werkzeug.serving import make_server
+from src.models.school import db, Class, Student, Parent
+from src.utils import passwords
+from benchmarks.common import setup_app
+import seed_data
+
+ADMIN = ('admin@crestwoodacademy.edu.pk', 'admin123')
+ATTENDANCE_DATE = date(2025, 3, 3).isoformat()
+MIXED_WEIGHTS = {'dashboard': 50, 'login_storm': 25, 'attendance': 15, 'admin_users': 10}
+
+class Client:
+    """Keep-alive HTTP connection sending JSON with a session cookie."""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = None
+
+    def request(self, method, path, body=None, cookie=None):
+        headers = {'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if cookie:
+            headers['Cookie'] = cookie
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            try:
+                self.conn.request(method, path, payload, headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.getheader('Connection', '').lower() == 'close':
+                    self.close()
+                return response, data
+            except (ConnectionError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; reconnect once
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+def login(client, account):
+    response, data = client.request('POST', '/api/auth/login', {'email': account[0], 'password': account[1]})
+    assert response.status == 200, data
+    return response.getheader('Set-Cookie').split(';', 1)[0]
+
+def school_layout():
+    """Ids the scenarios need, read from the seeded database."""
+    rosters = {}
+    for student_id, class_id in db.session.query(Student.id, Student.class_id):
+        rosters.setdefault(class_id, []).append(student_id)
+    return {
+        'rosters': rosters,
+        'class_teachers': dict(db.session.query(Class.id, Class.class_teacher_id)),
+        'students': sum(len(student_ids) for student_ids in rosters.values()),
+        'parents': db.session.query(Parent.id).count()
+    }
+
+# Each builder returns n requests as (method, path, body, account); the
+# account's session is used, or None to send the request without one.
+
+def build_login_storm(layout, n, rng):
+    requests = []
+    for _ in range(n):
+        if rng.random() < 0.5:
+            account = (f'student{rng.randint(1, layout["students"])}@crestwoodacademy.edu.pk', 'student123')
+        else:
+            account = (f'parent{rng.randint(1, layout["parents"])}@example.com', 'parent123')
+        requests.append(('POST', '/api/auth/login', {'email': account[0], 'password': account[1]}, None))
+    return requests
+
+def build_attendance(layout, n, rng):
+    class_ids = sorted(layout['rosters'])
+    requests = []
+    for i in range(n):
+        class_id = class_ids[i % len(class_ids)]
+        records = {
+            str(student_id): 'present' if rng.random() < 0.9 else rng.choice(('absent', 'late'))
+            for student_id in layout['rosters'][class_id]
+        }
+        # seed_scale gives teacher N the user teacher<N>@...
+        teacher = (f'teacher{layout["class_teachers"][class_id]}@crestwoodacademy.edu.pk', 'teacher123')
+        requests.append(('POST', '/api/attendance/bulk', {'class_id': class_id, 'date': ATTENDANCE_DATE, 'records': records}, teacher))
+    return requests
+
+def build_dashboard(layout, n, rng):
+    # A few hundred distinct parents; logging in every parent would dominate setup
+    parents = rng.sample(range(1, layout['parents'] + 1), min(layout['parents'], 200))
+    return [
+        ('GET', '/api/dashboard/parent', None, (f'parent{rng.choice(parents)}@example.com', 'parent123'))
+        for _ in range(n)
+    ]
+
+def build_admin_users(layout, n, rng):
+    total_users = layout['students'] + layout['parents']
+    requests = []
+    for _ in range(n):
+        if rng.random() < 0.5:
+            path = f'/api/auth/users?page={rng.randint(1, max(1, total_users // 50))}&per_page=50'
+        else:
+            path = f'/api/auth/users?pagination=cursor&per_page=50&role={rng.choice(("student", "parent", "teacher"))}'
+        requests.append(('GET', path, None, ADMIN))
+    return requests
+
+BUILDERS = {
+    'login_storm': build_login_storm,
+    'attendance': build_attendance,
+    'dashboard': build_dashboard,
+    'admin_users': build_admin_users,
+}
+
+def build_mixed(layout, n, rng):
+    requests = []
+    total = sum(MIXED_WEIGHTS.values())
+    for name, weight in MIXED_WEIGHTS.items():
+        requests.extend(BUILDERS[name](layout, max(1, n * weight // total), rng))
+    rng.shuffle(requests)
+    return requests
+
+BUILDERS['mixed'] = build_mixed
+
+def open_sessions(port, accounts, concurrency):
+    """Log every account in once, concurrently; returns {account: cookie}."""
+    cookies = {}
+    pending = list(accounts)
+    lock = threading.Lock()
+
+    def worker():
+        client = Client(port)
+        while True:
+            with lock:
+                if not pending:
+                    break
+                account = pending.pop()
+            cookie = login(client, account)
+            with lock:
+                cookies[account] = cookie
+        client.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return cookies
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def run_scenario(port, requests, cookies, concurrency):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    queue = list(reversed(requests))
+
+    def worker():
+        client = Client(port)
+        mine = []
+        while True:
+            with lock:
+                if not queue:
+                    break
+                method, path, body, account = queue.pop()
+            start = time.perf_counter()
+            response, _ = client.request(method, path, body, cookies.get(account))
+            mine.append(time.perf_counter() - start)
+            with lock:
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+        client.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(count for status, count in statuses.items() if status >= 400),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 2),
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p95': round(percentile(latencies, 95) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2)
+        }
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(previous, current, fail_over=None):
+    """Print latency/throughput changes; returns the scenarios whose p95 regressed past fail_over %."""
+    regressions = []
+    print(f'\ncompared with {previous.get("commit")} ({previous.get("timestamp")}):')
+    for name, result in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            print(f'  {name:<12} (new)')
+            continue
+        changes = []
+        for key in ('p50', 'p95', 'p99'):
+            old, new = before['latency_ms'][key], result['latency_ms'][key]
+            changes.append(f'{key} {old:.1f}->{new:.1f} ms ({(new - old) / old * 100:+.0f}%)' if old else f'{key} {new:.1f} ms')
+        old_rps, new_rps = before['throughput_rps'], result['throughput_rps']
+        changes.append(f'{old_rps:.0f}->{new_rps:.0f} req/s')
+        print(f'  {name:<12} ' + ', '.join(changes))
+        old_p95 = before['latency_ms']['p95']
+        if fail_over is not None and old_p95 and (result['latency_ms']['p95'] - old_p95) / old_p95 * 100 > fail_over:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=400, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--scenarios', default=','.join(BUILDERS), help='comma-separated subset of: ' + ', '.join(BUILDERS))
+    parser.add_argument('--database', help='SQLAlchemy URL to seed and test against (default: temporary SQLite file)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='results file (default: benchmarks/results/loadtest-<commit>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--fail-over', type=float, help='exit 1 if any p95 is this many percent slower than --compare')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(BUILDERS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+
+    database = args.database or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'loadtest.db')
+    app = setup_app(database)
+    seed_data.seed_scale(args.students, days=20, random_seed=args.seed)
+    with app.app_context():
+        layout = school_layout()
+        dialect = db.engine.dialect.name
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    rng = random.Random(args.seed)
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'database': dialect,
+        'password_hash_method': passwords.hash_method(),
+        'students': args.students,
+        'concurrency': args.concurrency,
+        'scenarios': {}
+    }
+    print(f'{dialect}, {args.students} students, {args.concurrency} clients, {args.requests} requests per scenario')
+    try:
+        for name in scenarios:
+            requests = BUILDERS[name](layout, args.requests, rng)
+            cookies = open_sessions(port, {account for _, _, _, account in requests if account}, args.concurrency)
+            result = results['scenarios'][name] = run_scenario(port, requests, cookies, args.concurrency)
+            latency = result['latency_ms']
+            print(f'  {name:<12} {result["throughput_rps"]:7.1f} req/s  p50 {latency["p50"]:7.1f}  p95 {latency["p95"]:7.1f}  '
+                  f'p99 {latency["p99"]:7.1f} ms  errors {result["errors"]}/{result["requests"]}')
+    finally:
+        server.shutdown()
+
+    output = args.output or os.path.join(os.path.dirname(__file__), 'results', f'loadtest-{results["commit"]}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'results written to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.fail_over)
+        if regressions:
+            print(f'p95 regressed by more than {args.fail_over:g}%: {", ".join(regressions)}')
+            raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Content-addressed file storage with resumable, chunked uploads.
+
+An upload starts as a partial file under <root>/uploads/<upload_id> with
+a small JSON sidecar (declared size, filename, owner). Clients append
+byte ranges at the current offset, so an interrupted upload resumes from
+wherever the partial file ends. On completion the file is hashed
+(SHA-256) and moved to <root>/blobs/<aa>/<digest>; if that blob already
+exists the partial copy is discarded, so identical files are stored once.
+
+Request bodies are copied to disk in COPY_BUFFER pieces and never held
+in memory whole. Uploads untouched for max_age seconds are swept when a
+new upload starts, at most once every expire_every seconds per process;
+run this module with the store roots as arguments to sweep from cron.
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; appends are then unlocked
+    fcntl = None
+
+COPY_BUFFER = 64 * 1024
+UPLOAD_MAX_AGE = 24 * 3600
+EXPIRE_EVERY = 3600
+
+class UploadError(Exception):
+    """Client-side upload problem; status is the HTTP code to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class BlobStore:
+    def __init__(self, root, max_age=UPLOAD_MAX_AGE, expire_every=EXPIRE_EVERY):
+        self.root = root
+        self.upload_dir = os.path.join(root, 'uploads')
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.max_age = max_age
+        self.expire_every = expire_every
+        self._expired_at = 0
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    # -- uploads ---------------------------------------------------------
+
+    def _partial(self, upload_id):
+        # Upload ids are uuid4 hex; anything else could escape the directory
+        if len(upload_id) != 32 or not all(c in '0123456789abcdef' for c in upload_id):
+            raise UploadError('Upload not found', 404)
+        return os.path.join(self.upload_dir, upload_id)
+
+    def create_upload(self, size, **meta):
+        now = time.time()
+        if now - self._expired_at >= self.expire_every:
+            self._expired_at = now
+            self.expire_uploads(self.max_age)
+        upload_id = uuid.uuid4().hex
+        path = self._partial(upload_id)
+        with open(path + '.json', 'w') as f:
+            json.dump(dict(meta, size=size, created_at=time.time()), f)
+        open(path, 'wb').close()
+        return upload_id
+
+    def upload_meta(self, upload_id, _retry=True):
+        """Sidecar metadata plus the current offset.
+
+        Completed uploads keep their sidecar with the blob digest, so a
+        client retrying its last chunk learns the upload already finished.
+        """
+        path = self._partial(upload_id)
+        try:
+            with open(path + '.json') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            raise UploadError('Upload not found', 404)
+        if 'digest' in meta:
+            meta['offset'] = meta['size']
+            return meta
+        try:
+            meta['offset'] = os.path.getsize(path)
+        except FileNotFoundError:
+            # Finished by a concurrent request between the two reads
+            if _retry:
+                return self.upload_meta(upload_id, _retry=False)
+            raise UploadError('Upload not found', 404)
+        return meta
+
+    def append(self, upload_id, offset, stream, length=None):
+        """Write stream at offset; returns the upload's metadata afterwards.
+
+        offset must equal the bytes already stored, which is what makes a
+        retried or resumed chunk safe: a mismatch answers 409 with nothing
+        written, and the client asks for the current offset again. The
+        chunk that completes the upload also moves it into the blob store,
+        and the returned metadata then carries its digest.
+        """
+        meta = self.upload_meta(upload_id)
+        if 'digest' in meta:
+            return meta
+        if not 0 <= offset <= meta['size']:
+            raise UploadError(f'Offset mismatch: upload is at {meta["offset"]}', 409)
+        remaining = meta['size'] - offset
+        if length is not None and length > remaining:
+            raise UploadError('Chunk runs past the declared size', 413)
+
+        path = self._partial(upload_id)
+        try:
+            # No O_CREAT: a partial file that was already finished must not
+            # be recreated empty
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        except FileNotFoundError:
+            return self.upload_meta(upload_id)
+        with os.fdopen(fd, 'ab') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            meta = self.upload_meta(upload_id)
+            if 'digest' in meta:
+                return meta
+            if meta['offset'] != offset:
+                raise UploadError(f'Offset mismatch: upload is at {meta["offset"]}', 409)
+            written = 0
+            while True:
+                chunk = stream.read(min(COPY_BUFFER, remaining - written + 1))
+                if not chunk:
+                    break
+                if written + len(chunk) > remaining:
+                    f.truncate(offset)
+                    raise UploadError('Chunk runs past the declared size', 413)
+                f.write(chunk)
+                written += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+            meta['offset'] = offset + written
+            if meta['offset'] == meta['size']:
+                meta = self._finish(upload_id, meta)
+        return meta
+
+    def _finish(self, upload_id, meta):
+        """Hash a complete upload into the blob store. Called under the upload's lock."""
+        path = self._partial(upload_id)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(COPY_BUFFER), b''):
+                digest.update(chunk)
+        meta = dict(meta, digest=digest.hexdigest())
+        del meta['offset']
+
+        # Record completion first so concurrent readers never see an
+        # upload with neither a partial file nor a digest
+        with open(path + '.json.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.json.tmp', path + '.json')
+
+        target = self.path(meta['digest'])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            os.remove(path)
+        else:
+            os.replace(path, target)
+        meta['offset'] = meta['size']
+        return meta
+
+    def expire_uploads(self, max_age=UPLOAD_MAX_AGE):
+        """Delete abandoned partial uploads and old completion records.
+
+        Other workers may sweep or finish the same uploads concurrently, so
+        files vanishing underneath are expected. Returns the number of
+        uploads removed.
+        """
+        removed = 0
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.upload_dir):
+            if not name.endswith('.json'):
+                continue
+            sidecar = os.path.join(self.upload_dir, name)
+            partial = sidecar[:-len('.json')]
+            mtimes = []
+            for p in (sidecar, partial):
+                try:
+                    mtimes.append(os.path.getmtime(p))
+                except FileNotFoundError:
+                    pass
+            if not mtimes or max(mtimes) >= cutoff:
+                continue
+            for p in (partial, sidecar):
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        return removed
+
+    # -- blobs -----------------------------------------------------------
+
+    def path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+def blob_reference(digest, filename):
+    """Value stored in file_path: the content hash plus the original name."""
+    return f'sha256/{digest}/{filename}'
+
+def parse_reference(reference):
+    """(digest, filename) from blob_reference, or None for other paths."""
+    parts = (reference or '').split('/', 2)
+    if len(parts) != 3 or parts[0] != 'sha256' or len(parts[1]) != 64:
+        return None
+    return parts[1], parts[2]
+
+if __name__ == '__main__':
+    import sys
+    for root in sys.argv[1:]:
+        print(f'{root}: {BlobStore(root).expire_uploads()} uploads expired')
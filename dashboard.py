@@ -0,0 +1,207 @@
+from flask import Blueprint, request, jsonify, session, current_app
+from sqlalchemy.orm import contains_eager
+from src.models.school import (
+    db, UserRole, Student, Parent, StudentParent, Subject, AttendanceSummary,
+    Fee, Assignment, AssignmentSubmission, Exam, ExamResult, attendance_percentage
+)
+from src.routes.auth import role_required, get_principal
+from datetime import datetime
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+def _children(parent_filter):
+    """The parent's children with their class, in one joined query."""
+    return db.session.query(Student, StudentParent.relationship).join(
+        StudentParent, StudentParent.student_id == Student.id
+    ).join(
+        Parent, StudentParent.parent_id == Parent.id
+    ).join(
+        Student.class_assigned
+    ).options(
+        contains_eager(Student.class_assigned)
+    ).filter(parent_filter).order_by(Student.id).all()
+
+def _attendance(student_ids, month):
+    """Per-child attendance totals overall and for month, from the rollups."""
+    rows = db.session.query(
+        AttendanceSummary.student_id,
+        AttendanceSummary.month,
+        AttendanceSummary.present_count,
+        AttendanceSummary.absent_count,
+        AttendanceSummary.late_count
+    ).filter(AttendanceSummary.student_id.in_(student_ids))
+
+    totals = {student_id: {'overall': [0, 0, 0], 'month': [0, 0, 0]} for student_id in student_ids}
+    for student_id, row_month, present, absent, late in rows:
+        buckets = [totals[student_id]['overall']]
+        if row_month == month:
+            buckets.append(totals[student_id]['month'])
+        for bucket in buckets:
+            bucket[0] += present
+            bucket[1] += absent
+            bucket[2] += late
+
+    def summary(counts):
+        return {
+            'present_count': counts[0],
+            'absent_count': counts[1],
+            'late_count': counts[2],
+            'attendance_percentage': attendance_percentage(*counts)
+        }
+    return {
+        student_id: {'overall': summary(t['overall']), 'month': dict(summary(t['month']), month=month)}
+        for student_id, t in totals.items()
+    }
+
+def _fees(student_ids, today):
+    """Outstanding dues per child, aggregated in SQL."""
+    outstanding = Fee.amount - db.func.coalesce(Fee.paid_amount, 0)
+    rows = db.session.query(
+        Fee.student_id,
+        db.func.count(Fee.id),
+        db.func.sum(outstanding),
+        db.func.sum(db.case((Fee.due_date < today, outstanding), else_=0)),
+        db.func.min(Fee.due_date)
+    ).filter(
+        Fee.student_id.in_(student_ids),
+        Fee.is_paid == db.false()
+    ).group_by(Fee.student_id)
+
+    fees = {student_id: {'unpaid_count': 0, 'outstanding': 0.0, 'overdue': 0.0, 'next_due_date': None} for student_id in student_ids}
+    for student_id, count, total, overdue, next_due in rows:
+        fees[student_id] = {
+            'unpaid_count': count,
+            'outstanding': float(total or 0),
+            'overdue': float(overdue or 0),
+            'next_due_date': next_due.isoformat() if next_due else None
+        }
+    return fees
+
+def _assignments(children, now, limit):
+    """Upcoming assignments for each child's class with their submission status."""
+    class_ids = {student.class_id for student, _ in children}
+    assignments = db.session.query(
+        Assignment.id, Assignment.title, Assignment.class_id, Assignment.due_date, Assignment.max_marks, Subject.name
+    ).join(Subject, Assignment.subject_id == Subject.id).filter(
+        Assignment.class_id.in_(class_ids),
+        Assignment.due_date >= now
+    ).order_by(Assignment.due_date, Assignment.id).all()
+
+    submissions = {}
+    if assignments:
+        for assignment_id, student_id, submitted_at, marks in db.session.query(
+            AssignmentSubmission.assignment_id,
+            AssignmentSubmission.student_id,
+            AssignmentSubmission.submitted_at,
+            AssignmentSubmission.marks_obtained
+        ).filter(
+            AssignmentSubmission.assignment_id.in_([a.id for a in assignments]),
+            AssignmentSubmission.student_id.in_([student.id for student, _ in children])
+        ):
+            submissions[(assignment_id, student_id)] = (submitted_at, marks)
+
+    by_class = {}
+    for assignment in assignments:
+        by_class.setdefault(assignment.class_id, []).append(assignment)
+
+    result = {}
+    for student, _ in children:
+        rows = []
+        for assignment in by_class.get(student.class_id, [])[:limit]:
+            submission = submissions.get((assignment.id, student.id))
+            rows.append({
+                'id': assignment.id,
+                'title': assignment.title,
+                'subject': assignment.name,
+                'due_date': assignment.due_date.isoformat(),
+                'max_marks': assignment.max_marks,
+                'submitted': submission is not None,
+                'submitted_at': submission[0].isoformat() if submission and submission[0] else None,
+                'marks_obtained': submission[1] if submission else None
+            })
+        result[student.id] = rows
+    return result
+
+def _recent_results(student_ids, limit):
+    """Each child's latest exam results, ranked per child with a window function."""
+    position = db.func.row_number().over(
+        partition_by=ExamResult.student_id,
+        order_by=(Exam.exam_date.desc(), ExamResult.id.desc())
+    ).label('position')
+    ranked = db.session.query(
+        ExamResult.student_id,
+        Exam.id.label('exam_id'),
+        Exam.name.label('exam_name'),
+        Exam.exam_type,
+        Exam.exam_date,
+        Exam.max_marks,
+        Subject.name.label('subject'),
+        ExamResult.marks_obtained,
+        ExamResult.grade,
+        position
+    ).join(Exam, ExamResult.exam_id == Exam.id).join(
+        Subject, Exam.subject_id == Subject.id
+    ).filter(ExamResult.student_id.in_(student_ids)).subquery()
+
+    results = {student_id: [] for student_id in student_ids}
+    for row in db.session.query(ranked).filter(ranked.c.position <= limit).order_by(ranked.c.student_id, ranked.c.position):
+        results[row.student_id].append({
+            'exam_id': row.exam_id,
+            'exam_name': row.exam_name,
+            'exam_type': row.exam_type,
+            'exam_date': row.exam_date.isoformat() if row.exam_date else None,
+            'subject': row.subject,
+            'marks_obtained': row.marks_obtained,
+            'max_marks': row.max_marks,
+            'grade': row.grade
+        })
+    return results
+
+def build_parent_dashboard(parent_filter):
+    """Every child's profile and summaries in six queries, however many children."""
+    children = _children(parent_filter)
+    if not children:
+        return []
+
+    student_ids = [student.id for student, _ in children]
+    now = datetime.utcnow()
+    config = current_app.config
+    attendance = _attendance(student_ids, now.strftime('%Y-%m'))
+    fees = _fees(student_ids, now.date())
+    assignments = _assignments(children, now, config.get('DASHBOARD_ASSIGNMENTS', 5))
+    results = _recent_results(student_ids, config.get('DASHBOARD_RESULTS', 5))
+
+    return [
+        {
+            'student': student.to_dict(),
+            'relationship': relationship,
+            'class': student.class_assigned.to_dict(),
+            'attendance': attendance[student.id],
+            'fees': fees[student.id],
+            'upcoming_assignments': assignments[student.id],
+            'recent_results': results[student.id]
+        }
+        for student, relationship in children
+    ]
+
+@dashboard_bp.route('/parent', methods=['GET'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.PARENT])
+def get_parent_dashboard():
+    try:
+        # Parents see their own children; staff may look up any parent
+        role, _ = get_principal(session['user_id'])
+        if role == UserRole.PARENT:
+            parent_filter = Parent.user_id == session['user_id']
+        else:
+            parent_id = request.args.get('parent_id', type=int)
+            if not parent_id:
+                return jsonify({'error': 'parent_id is required'}), 400
+            parent_filter = Parent.id == parent_id
+
+        return jsonify({
+            'generated_at': datetime.utcnow().isoformat(),
+            'children': build_parent_dashboard(parent_filter)
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,147 @@
+"""Engine, pool and read-replica configuration for the shared db.
+
+configure_database(app) turns DATABASE_URL / DB_* environment variables
+into Flask-SQLAlchemy settings. Server databases get a TimedQueuePool,
+which records how long requests wait for a connection; pool_stats()
+reports that next to the pool's own counters.
+
+With DATABASE_REPLICA_URL set, code inside `with read_replica():` runs its
+queries on the replica. Flushes always go to the primary.
+"""
+from flask_sqlalchemy.session import Session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import exc
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import threading
+import time
+
+REPLICA_BIND = 'replica'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+class RoutingSession(Session):
+    """Session sending reads to the replica inside read_replica()."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing:
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@contextmanager
+def read_replica():
+    """Run the enclosed queries on the read replica when one is configured.
+
+    Replica data may lag the primary slightly, so use this only for
+    reports and exports, never for a read that decides a write.
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that also records checkout waits and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self.stats_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+def _env_bool(env, name, default):
+    value = env.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def engine_options(uri, env=os.environ):
+    """SQLALCHEMY_ENGINE_OPTIONS for uri from DB_* environment variables.
+
+    SQLite gets no pool sizing (it has its own single-file pools);
+    PostgreSQL also gets a server-side statement_timeout.
+    """
+    if uri.startswith('sqlite'):
+        return {}
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': int(env.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(env.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(env.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(env.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool(env, 'DB_POOL_PRE_PING', True),
+        'pool_use_lifo': True
+    }
+    statement_timeout = int(env.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    if uri.startswith('postgresql') and statement_timeout > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+def configure_database(app, env=os.environ):
+    """Apply DATABASE_URL, DATABASE_REPLICA_URL and DB_* settings to app.config.
+
+    Does nothing when DATABASE_URL is unset, leaving whatever the app or a
+    test harness configured.
+    """
+    uri = env.get('DATABASE_URL')
+    if not uri:
+        return
+    # Heroku-style URLs use the scheme SQLAlchemy dropped in 1.4
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri, env)
+
+    replica = env.get('DATABASE_REPLICA_URL')
+    if replica:
+        if replica.startswith('postgres://'):
+            replica = 'postgresql://' + replica[len('postgres://'):]
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = dict(engine_options(replica, env), url=replica)
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+def pool_stats(engines):
+    """Counters for each engine's pool, keyed by bind name ('default' for the primary)."""
+    stats = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow
+            })
+        if isinstance(pool, TimedQueuePool):
+            with pool.stats_lock:
+                entry.update({
+                    'checkouts': pool.checkouts,
+                    'wait_seconds_total': round(pool.wait_seconds, 6),
+                    'wait_seconds_max': round(pool.max_wait_seconds, 6),
+                    'timeouts': pool.timeouts
+                })
+        stats[key or 'default'] = entry
+    return stats
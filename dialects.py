@@ -0,0 +1,19 @@
+from src.models.school import db
+
+def insert_for(model):
+    """Dialect-specific INSERT construct supporting ON CONFLICT upserts."""
+    dialect = db.session.get_bind(mapper=model.__mapper__).dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f'Upserts are not supported on {dialect}')
+    return insert(model.__table__)
+
+def month_key(column):
+    """SQL expression formatting a date column as 'YYYY-MM'."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return db.func.to_char(column, 'YYYY-MM')
+    return db.func.strftime('%Y-%m', column)
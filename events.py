@@ -0,0 +1,94 @@
+from flask import Blueprint, Response, jsonify, current_app, session, stream_with_context
+from src.models.school import db, UserRole, Student, Parent, StudentParent
+from src.routes.auth import login_required, get_principal
+from src.utils.pubsub import event_hub
+
+events_bp = Blueprint('events', __name__)
+
+ALERT_STATUSES = ('absent', 'late')
+
+def role_channel(role):
+    return f'role:{role.value}'
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+def publish_notice(notice):
+    """Push a published notice to every role it targets."""
+    if not notice.is_published:
+        return
+    payload = notice.to_dict()
+    if notice.target_role in (None, 'all'):
+        roles = list(UserRole)
+    else:
+        roles = [UserRole(notice.target_role), UserRole.ADMIN, UserRole.PRINCIPAL]
+    hub = event_hub()
+    for role in roles:
+        hub.publish(role_channel(role), 'notice', payload)
+
+def publish_attendance_alerts(rows):
+    """Alert parents of students marked absent or late in an attendance batch.
+
+    Parents are resolved for the whole batch in one query through
+    StudentParent, then each parent user gets one event per child.
+    """
+    flagged = {row['student_id']: row for row in rows if row['status'] in ALERT_STATUSES}
+    if not flagged:
+        return 0
+
+    links = db.session.query(
+        Parent.user_id, Student.id, Student.first_name, Student.last_name
+    ).select_from(StudentParent).join(
+        Parent, StudentParent.parent_id == Parent.id
+    ).join(
+        Student, StudentParent.student_id == Student.id
+    ).filter(StudentParent.student_id.in_(flagged))
+
+    hub = event_hub()
+    sent = 0
+    for parent_user_id, student_id, first_name, last_name in links:
+        row = flagged[student_id]
+        hub.publish(user_channel(parent_user_id), 'attendance', {
+            'student_id': student_id,
+            'student_name': f'{first_name} {last_name}',
+            'class_id': row['class_id'],
+            'subject_id': row['subject_id'],
+            'date': row['date'].isoformat(),
+            'status': row['status']
+        })
+        sent += 1
+    return sent
+
+def _format(message):
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {message['data']}\n\n"
+
+@events_bp.route('/stream', methods=['GET'])
+@login_required
+def stream_events():
+    principal = get_principal(session['user_id'])
+    if not principal or not principal[1]:
+        return jsonify({'error': 'Insufficient permissions'}), 403
+    role = principal[0]
+
+    subscription = event_hub().subscribe((role_channel(role), user_channel(session['user_id'])))
+    heartbeat = current_app.config.get('EVENTS_HEARTBEAT', 15)
+    # An open stream must not pin a pooled database connection
+    db.session.close()
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                messages = subscription.get(timeout=heartbeat)
+                if messages:
+                    yield ''.join(_format(message) for message in messages)
+                else:
+                    yield ': keepalive\n\n'
+        finally:
+            subscription.close()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,155 @@
+from flask import Blueprint, request, jsonify, session
+from collections import Counter
+from src.models.school import db, UserRole, Exam, ExamResult, Student, Teacher, TeacherSubject
+from src.routes.auth import role_required, get_principal
+from src.routes.reports import report_card_cache
+from src.utils.dialects import insert_for
+from src.utils.grading import grade_table, mark_statistics, parse_marks
+import csv
+import io
+
+exams_bp = Blueprint('exams', __name__)
+
+def _can_grade(exam):
+    """Admins and principals grade any exam; teachers only their own classes."""
+    role, _ = get_principal(session['user_id'])
+    if role in (UserRole.ADMIN, UserRole.PRINCIPAL):
+        return True
+    teacher_id = db.session.query(Teacher.id).filter_by(user_id=session['user_id']).scalar()
+    if teacher_id is None:
+        return False
+    if exam.created_by == teacher_id:
+        return True
+    return db.session.query(TeacherSubject.id).filter_by(
+        teacher_id=teacher_id, class_id=exam.class_id, subject_id=exam.subject_id
+    ).first() is not None
+
+def _read_sheet():
+    """Result rows and optional grade boundaries from a JSON body or a CSV upload.
+
+    CSV sheets need student_id and marks_obtained columns; remarks is optional.
+    """
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype == 'text/csv':
+        raw = upload.read() if upload is not None else request.get_data()
+        reader = csv.DictReader(io.StringIO(raw.decode('utf-8-sig')))
+        missing = {'student_id', 'marks_obtained'} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f'CSV is missing column(s): {", ".join(sorted(missing))}')
+        return list(reader), None
+
+    data = request.get_json(silent=True) or {}
+    results = data.get('results')
+    if not isinstance(results, list):
+        raise ValueError('results must be a list of {student_id, marks_obtained, remarks}')
+    return results, data.get('boundaries')
+
+def _validate_rows(rows, max_marks):
+    """Split raw sheet rows into parallel columns plus per-row errors.
+
+    Row numbers in errors are 1-based, matching the sheet a teacher uploaded.
+    """
+    student_ids, marks, remarks, errors = [], [], [], []
+    seen = set()
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({'row': number, 'error': 'Row must be an object'})
+            continue
+        try:
+            student_id = int(row.get('student_id'))
+            mark = parse_marks(row.get('marks_obtained'))
+        except (TypeError, ValueError):
+            errors.append({'row': number, 'error': 'student_id and marks_obtained must be whole numbers'})
+            continue
+        if not 0 <= mark <= max_marks:
+            errors.append({'row': number, 'student_id': student_id, 'error': f'marks_obtained must be between 0 and {max_marks}'})
+            continue
+        if student_id in seen:
+            errors.append({'row': number, 'student_id': student_id, 'error': 'Duplicate student'})
+            continue
+        seen.add(student_id)
+        student_ids.append(student_id)
+        marks.append(mark)
+        remarks.append(row.get('remarks') or None)
+    return student_ids, marks, remarks, errors
+
+def upsert_results(rows):
+    """Insert or update exam results in one statement keyed on (exam, student)."""
+    if not rows:
+        return
+    stmt = insert_for(ExamResult).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['exam_id', 'student_id'],
+        set_={
+            'marks_obtained': stmt.excluded.marks_obtained,
+            'grade': stmt.excluded.grade,
+            'remarks': stmt.excluded.remarks
+        }
+    )
+    db.session.execute(stmt)
+
+@exams_bp.route('/<int:exam_id>/results/bulk', methods=['POST'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def ingest_exam_results(exam_id):
+    try:
+        exam = db.session.get(Exam, exam_id)
+        if not exam:
+            return jsonify({'error': 'Exam not found'}), 404
+        if not _can_grade(exam):
+            return jsonify({'error': 'Insufficient permissions'}), 403
+        if not exam.max_marks or exam.max_marks <= 0:
+            return jsonify({'error': 'Exam max_marks must be positive'}), 400
+
+        try:
+            rows, boundaries = _read_sheet()
+            table = grade_table(boundaries)
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({'error': str(e)}), 400
+        if not rows:
+            return jsonify({'error': 'Sheet has no rows'}), 400
+
+        student_ids, marks, remarks, errors = _validate_rows(rows, exam.max_marks)
+
+        # Every student must belong to the exam's class
+        enrolled = {
+            row.id for row in db.session.query(Student.id).filter(
+                Student.class_id == exam.class_id,
+                Student.id.in_(student_ids)
+            )
+        }
+        errors.extend(
+            {'student_id': student_id, 'error': 'Student not in exam class'}
+            for student_id in student_ids if student_id not in enrolled
+        )
+        if errors:
+            return jsonify({'error': 'Invalid rows in sheet', 'errors': errors}), 400
+
+        # Grade the whole sheet in one pass, then write it in one statement
+        grades = table.grade_all(marks, exam.max_marks)
+        upsert_results([
+            {
+                'exam_id': exam.id,
+                'student_id': student_id,
+                'marks_obtained': mark,
+                'grade': grade,
+                'remarks': remark
+            }
+            for student_id, mark, grade, remark in zip(student_ids, marks, grades, remarks)
+        ])
+        db.session.commit()
+        # The upsert bypasses the ORM, so the session hooks don't see it
+        report_card_cache.invalidate_exams([exam.id])
+
+        return jsonify({
+            'message': 'Exam results saved',
+            'exam_id': exam.id,
+            'saved': len(student_ids),
+            'statistics': mark_statistics(marks, exam.max_marks),
+            'grade_distribution': {
+                grade: count for grade, count in sorted(Counter(grades).items())
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,66 @@
+from flask import Blueprint, request, jsonify
+from src.models.school import db, UserRole, Attendance, Fee, ExamResult, Exam
+from src.routes.auth import role_required
+from src.utils.streaming import stream_rows, FORMATS
+from src.utils.database import read_replica
+from datetime import datetime
+
+exports_bp = Blueprint('exports', __name__)
+
+# Rows fetched per round trip; PostgreSQL uses a server-side cursor
+YIELD_PER = 2000
+
+# table name -> (model, equality filters, date column for date_from/date_to)
+EXPORTS = {
+    'attendance': (Attendance, ('student_id', 'class_id', 'subject_id', 'status'), 'date'),
+    'fees': (Fee, ('student_id', 'academic_year_id', 'month', 'fee_type', 'is_paid'), 'due_date'),
+    'exam_results': (ExamResult, ('exam_id', 'student_id'), None),
+}
+
+def export_query(model, filter_columns, date_column, args):
+    """Core SELECT of every column of model, filtered by request args."""
+    table = model.__table__
+    stmt = db.select(*table.columns)
+
+    for name in filter_columns:
+        if name in args:
+            value = args[name]
+            if name == 'is_paid':
+                value = value.lower() in ('1', 'true', 'yes')
+            stmt = stmt.where(table.c[name] == value)
+
+    if date_column:
+        for arg, compare in (('date_from', '__ge__'), ('date_to', '__le__')):
+            if arg in args:
+                day = datetime.strptime(args[arg], '%Y-%m-%d').date()
+                stmt = stmt.where(getattr(table.c[date_column], compare)(day))
+
+    # Exam results are usually wanted per class; resolve through the exam
+    if model is ExamResult and 'class_id' in args:
+        stmt = stmt.where(table.c.exam_id.in_(
+            db.select(Exam.id).where(Exam.class_id == args['class_id'])
+        ))
+
+    return stmt.order_by(table.c.id).execution_options(yield_per=YIELD_PER)
+
+@exports_bp.route('/<table_name>', methods=['GET'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL])
+def export_table(table_name):
+    if table_name not in EXPORTS:
+        return jsonify({'error': 'Unknown export'}), 404
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(FORMATS)}'}), 400
+
+    model, filter_columns, date_column = EXPORTS[table_name]
+    try:
+        stmt = export_query(model, filter_columns, date_column, request.args)
+    except ValueError:
+        return jsonify({'error': 'date_from and date_to must be YYYY-MM-DD'}), 400
+
+    columns = [column.name for column in model.__table__.columns]
+    # Exports scan whole tables, so they read from the replica when there is one
+    with read_replica():
+        rows = db.session.execute(stmt)
+    return stream_rows(columns, rows, fmt, filename=f'{table_name}.{fmt}')
@@ -0,0 +1,96 @@
+"""Versioned caches for precomputed feeds.
+
+A feed cache holds one precomputed value per key (e.g. per role) plus a
+single version counter. Writers bump the counter; readers rebuild a key
+only when its stored version differs from the current one. The counter
+only decides when to rebuild: a per-process cache can rebuild after its
+TTL without seeing another worker's bump, so callers derive their ETag
+from the feed's content (notices hash the feed) rather than the version.
+LocalFeedCache keeps everything in process and is the default;
+RedisFeedCache shares the counter and values between workers.
+"""
+from flask import current_app
+import json
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # optional, only needed for a shared cache
+    redis = None
+
+class LocalFeedCache:
+    """Per-process stand-in. Other workers only see a bump after ttl seconds."""
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._version = 1
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def version(self):
+        return self._version
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            return self._version
+
+    def get(self, key):
+        """(version, items) stored for key, or None when missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[2] < time.monotonic():
+            return None
+        return entry[0], entry[1]
+
+    def set(self, key, version, items):
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = (version, items, time.monotonic() + self.ttl)
+
+class RedisFeedCache:
+    """Shared cache: INCR for the version, one JSON string per key."""
+
+    def __init__(self, url, prefix='feed', ttl=300):
+        if redis is None:
+            raise RuntimeError('redis is not installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def version(self):
+        return int(self.client.get(f'{self.prefix}:version') or 1)
+
+    def bump(self):
+        # Start from 2 so the first bump differs from the implicit version 1
+        version = self.client.incr(f'{self.prefix}:version')
+        if version == 1:
+            version = self.client.incr(f'{self.prefix}:version')
+        return version
+
+    def get(self, key):
+        raw = self.client.get(f'{self.prefix}:{key}')
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry['version'], entry['items']
+
+    def set(self, key, version, items):
+        self.client.set(f'{self.prefix}:{key}', json.dumps({'version': version, 'items': items}), ex=self.ttl)
+
+def feed_cache(name):
+    """The app's cache for the named feed, created on first use.
+
+    <NAME>_CACHE_URL selects Redis; otherwise a LocalFeedCache is used with
+    <NAME>_CACHE_TTL (default 30s) as the cross-worker staleness bound.
+    """
+    caches = current_app.extensions.setdefault('feed_caches', {})
+    if name not in caches:
+        prefix = name.upper()
+        url = current_app.config.get(f'{prefix}_CACHE_URL')
+        if url:
+            caches[name] = RedisFeedCache(url, prefix=name)
+        else:
+            caches[name] = LocalFeedCache(ttl=current_app.config.get(f'{prefix}_CACHE_TTL', 30))
+    return caches[name]
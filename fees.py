@@ -0,0 +1,116 @@
+from flask import Blueprint, request, jsonify
+from src.models.school import db, UserRole, Fee, Student, Class
+from src.routes.auth import role_required
+from src.utils.streaming import stream_rows
+from src.utils.database import read_replica
+from datetime import datetime, date
+
+fees_bp = Blueprint('fees', __name__)
+
+def _outstanding():
+    return Fee.amount - db.func.coalesce(Fee.paid_amount, 0)
+
+def dues_query(academic_year_id=None, month=None, as_of=None, class_id=None, fee_type=None):
+    """Unpaid fees due on or before as_of, joined to the student's class.
+
+    All filters are optional; the caller picks the columns and grouping.
+    """
+    query = db.session.query().select_from(Fee).join(Student, Fee.student_id == Student.id).filter(
+        Fee.is_paid == db.false(),
+        Fee.due_date <= (as_of or date.today())
+    )
+    if academic_year_id:
+        query = query.filter(Fee.academic_year_id == academic_year_id)
+    if month:
+        query = query.filter(Fee.month == month)
+    if class_id:
+        query = query.filter(Student.class_id == class_id)
+    if fee_type:
+        query = query.filter(Fee.fee_type == fee_type)
+    return query
+
+def outstanding_by(query, *group_columns):
+    """Grouped SQL aggregate of dues as (group key, totals) pairs."""
+    rows = query.with_entities(
+        *group_columns,
+        db.func.count(Fee.id),
+        db.func.count(db.distinct(Fee.student_id)),
+        db.func.sum(Fee.amount),
+        db.func.sum(db.func.coalesce(Fee.paid_amount, 0)),
+        db.func.sum(_outstanding())
+    ).group_by(*group_columns).order_by(*group_columns)
+
+    width = len(group_columns)
+    return [
+        (tuple(row[:width]), {
+            'fees': row[width],
+            'students': row[width + 1],
+            'amount': float(row[width + 2] or 0),
+            'paid_amount': float(row[width + 3] or 0),
+            'outstanding': float(row[width + 4] or 0)
+        })
+        for row in rows
+    ]
+
+def _parse_filters():
+    as_of = request.args.get('as_of')
+    return {
+        'academic_year_id': request.args.get('academic_year_id', type=int),
+        'month': request.args.get('month'),
+        'as_of': datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else None,
+        'class_id': request.args.get('class_id', type=int),
+        'fee_type': request.args.get('fee_type')
+    }
+
+@fees_bp.route('/outstanding', methods=['GET'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL])
+def get_outstanding_dues():
+    try:
+        try:
+            filters = _parse_filters()
+        except ValueError:
+            return jsonify({'error': 'as_of must be YYYY-MM-DD'}), 400
+        query = dues_query(**filters)
+
+        with read_replica():
+            by_class = outstanding_by(query.join(Class, Student.class_id == Class.id), Class.id, Class.name, Class.section)
+            by_fee_type = outstanding_by(query, Fee.fee_type)
+
+        return jsonify({
+            'by_class': [
+                dict(totals, class_id=class_id, class_name=name, section=section)
+                for (class_id, name, section), totals in by_class
+            ],
+            'by_fee_type': [dict(totals, fee_type=fee_type) for (fee_type,), totals in by_fee_type],
+            'total_outstanding': sum(totals['outstanding'] for _, totals in by_fee_type),
+            'filters': dict(filters, as_of=(filters['as_of'] or date.today()).isoformat())
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+DEFAULTER_COLUMNS = [
+    'student_id', 'student_code', 'first_name', 'last_name', 'class_id',
+    'fee_id', 'fee_type', 'month', 'due_date', 'amount', 'paid_amount', 'outstanding'
+]
+
+@fees_bp.route('/defaulters.csv', methods=['GET'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL])
+def export_defaulters():
+    try:
+        filters = _parse_filters()
+    except ValueError:
+        return jsonify({'error': 'as_of must be YYYY-MM-DD'}), 400
+
+    query = dues_query(**filters).with_entities(
+        Student.id, Student.student_id, Student.first_name, Student.last_name, Student.class_id,
+        Fee.id, Fee.fee_type, Fee.month, Fee.due_date, Fee.amount,
+        db.func.coalesce(Fee.paid_amount, 0), _outstanding()
+    ).order_by(Student.class_id, Student.id, Fee.due_date).execution_options(yield_per=1000)
+
+    # Execute here so the query runs on the replica; rows are still fetched lazily
+    with read_replica():
+        rows = iter(query)
+
+    filename = f"defaulters-{(filters['as_of'] or date.today()).isoformat()}.csv"
+    return stream_rows(DEFAULTER_COLUMNS, rows, 'csv', filename=filename)
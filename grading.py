@@ -0,0 +1,131 @@
+"""Grade computation and mark statistics for a whole exam sheet at once.
+
+Grades come from a boundary table of (minimum percentage, grade) pairs.
+With numpy installed a sheet is graded with a single searchsorted over the
+percentage array; without it the same lookup runs through bisect. numpy is
+imported on first use rather than at startup, since importing it costs
+more than the rest of the routes together.
+"""
+from flask import current_app
+from bisect import bisect_right
+import math
+import statistics
+
+_numpy = None
+
+def _np():
+    """numpy, imported on first call, or None when it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:  # optional, pure Python fallback below
+            _numpy = False
+    return _numpy or None
+
+DEFAULT_GRADE_BOUNDARIES = ((80, 'A'), (70, 'B'), (60, 'C'), (50, 'D'), (0, 'F'))
+DEFAULT_PERCENTILES = (25, 75, 90)
+
+def parse_marks(value):
+    """Whole-number marks from a JSON number or CSV text.
+
+    72 and 72.0 give 72; 72.5, true and non-numbers raise ValueError
+    rather than being truncated or counted as 1.
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            value = float(text)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError('marks must be a whole number')
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError('marks must be a whole number')
+        return int(value)
+    return value
+
+class GradeTable:
+    """Boundary table sorted ascending so a lookup is one binary search."""
+
+    def __init__(self, boundaries):
+        # A dict or string would unpack its keys or characters as pairs
+        if not isinstance(boundaries, (list, tuple)) or not all(
+            isinstance(pair, (list, tuple)) and len(pair) == 2
+            and isinstance(pair[0], (int, float)) and not isinstance(pair[0], bool) and math.isfinite(pair[0])
+            and isinstance(pair[1], str)
+            for pair in boundaries
+        ):
+            raise ValueError('boundaries must be [minimum percentage, grade] pairs')
+        pairs = sorted((float(minimum), grade) for minimum, grade in boundaries)
+        if not pairs:
+            raise ValueError('boundaries must not be empty')
+        if pairs[0][0] > 0:
+            raise ValueError('the lowest boundary must start at 0')
+        thresholds = [minimum for minimum, _ in pairs]
+        if len(set(thresholds)) != len(thresholds):
+            raise ValueError('boundary percentages must be unique')
+        self.thresholds = thresholds
+        self.grades = [grade for _, grade in pairs]
+
+    def grade(self, percentage):
+        return self.grades[bisect_right(self.thresholds, percentage) - 1]
+
+    def grade_all(self, marks, max_marks):
+        """Grades for a sequence of marks out of max_marks, in order."""
+        if max_marks <= 0:
+            raise ValueError('max_marks must be positive')
+        np = _np()
+        if np is not None:
+            percentages = np.asarray(marks, dtype=float) * (100.0 / max_marks)
+            index = np.searchsorted(self.thresholds, percentages, side='right') - 1
+            return np.asarray(self.grades, dtype=object)[index].tolist()
+        return [self.grade(m * 100.0 / max_marks) for m in marks]
+
+def grade_table(boundaries=None):
+    """GradeTable from explicit boundaries, the GRADE_BOUNDARIES config or the defaults."""
+    if boundaries is None:
+        boundaries = current_app.config.get('GRADE_BOUNDARIES', DEFAULT_GRADE_BOUNDARIES)
+    return GradeTable(boundaries)
+
+def _percentile(ordered, q):
+    # Linear interpolation between closest ranks, same as numpy's default
+    position = (len(ordered) - 1) * q / 100.0
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+def mark_statistics(marks, max_marks, percentiles=DEFAULT_PERCENTILES):
+    """Count, mean, median, spread and percentiles of a batch of marks."""
+    if not marks:
+        return {'count': 0}
+    if max_marks <= 0:
+        raise ValueError('max_marks must be positive')
+    np = _np()
+    if np is not None:
+        values = np.asarray(marks, dtype=float)
+        mean = float(values.mean())
+        median = float(np.median(values))
+        stdev = float(values.std())
+        points = [float(p) for p in np.percentile(values, percentiles)]
+        low, high = float(values.min()), float(values.max())
+    else:
+        ordered = sorted(float(m) for m in marks)
+        mean = statistics.fmean(ordered)
+        median = statistics.median(ordered)
+        stdev = statistics.pstdev(ordered)
+        points = [_percentile(ordered, p) for p in percentiles]
+        low, high = ordered[0], ordered[-1]
+    return {
+        'count': len(marks),
+        'max_marks': max_marks,
+        'mean': round(mean, 2),
+        'median': round(median, 2),
+        'min': low,
+        'max': high,
+        'std_dev': round(stdev, 2),
+        'mean_percentage': round(mean * 100.0 / max_marks, 2),
+        'percentiles': {f'p{p}': round(value, 2) for p, value in zip(percentiles, points)}
+    }
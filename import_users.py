@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Import students, parents and their links from a CSV or XLSX sheet.
+
+    python import_users.py admissions-2025.csv [--dry-run] [--batch-size 500] [--report errors.json]
+
+See src/utils/user_import.py for the sheet format. Prints a summary and
+writes every rejected row to the report file (or stdout).
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.main import app
+from src.utils.user_import import read_rows, import_users, BATCH_SIZE
+import argparse
+import json
+import time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import user accounts")
+    parser.add_argument("sheet", help="CSV or XLSX file")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, create nothing")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--report", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with open(args.sheet, "rb") as f:
+        raw = f.read()
+
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            rows = read_rows(raw, args.sheet)
+        except (ValueError, UnicodeDecodeError) as e:
+            sys.exit(f"Cannot read {args.sheet}: {e}")
+        report = import_users(rows, dry_run=args.dry_run, batch_size=args.batch_size)
+
+    created = report["created"]
+    print(f"{report['rows']} rows in {time.perf_counter() - started:.1f}s: "
+          f"{created['students']} students, {created['parents']} parents, {created['links']} links created, "
+          f"{report['failed']} rejected{' (dry run)' if args.dry_run else ''}", file=sys.stderr)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    else:
+        json.dump(report["errors"], sys.stdout, indent=2, default=str)
+        print()
+    sys.exit(1 if report["failed"] else 0)
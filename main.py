@@ -1,45 +1,112 @@
-from flask import Flask, jsonify, send_from_directory, redirect, url_for
+from flask import Flask, jsonify, redirect, url_for
 from flask_cors import CORS
-from .routes.auth import auth_bp
-from .routes.user import user_bp
+from .utils import passwords
+from .utils.database import configure_database
+from .utils.session_store import ServerSideSessionInterface
+from .utils.static_assets import StaticIndex
+from datetime import timedelta
+import importlib
 import os
 
-app = Flask(__name__, static_folder='../../frontend/school-landing/dist', static_url_path='/')
+# Static files are served by StaticIndex below rather than Flask's static route
+app = Flask(__name__, static_folder=None)
 CORS(app)
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(user_bp, url_prefix='/api/users')
+# Password hashing cost and optional process pool for login verification
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', passwords.DEFAULT_HASH_METHOD)
+app.config['PASSWORD_VERIFY_POOL_SIZE'] = int(os.environ.get('PASSWORD_VERIFY_POOL_SIZE', 0))
+
+# Server-side sessions (SESSION_STORE_URL: memory://, sqlite:///path or redis://);
+# expiry slides by PERMANENT_SESSION_LIFETIME on every request
+app.session_interface = ServerSideSessionInterface()
+app.config['SESSION_STORE_URL'] = os.environ.get('SESSION_STORE_URL')
+app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=int(os.environ.get('SESSION_LIFETIME_HOURS', 24 * 7)))
+
+# Database URL, pool sizing, statement timeout and read replica from DATABASE_URL / DB_*
+configure_database(app)
+
+# Blueprints as (module under src.routes, attribute, URL prefix). Modules are
+# imported here rather than at the top so APP_BLUEPRINTS (comma-separated
+# module names) can start a worker with only the routes it serves.
+BLUEPRINTS = [
+    ('auth', 'auth_bp', '/api/auth'),
+    ('user', 'user_bp', '/api/users'),
+    ('attendance', 'attendance_bp', '/api/attendance'),
+    ('fees', 'fees_bp', '/api/fees'),
+    ('exports', 'exports_bp', '/api/exports'),
+    ('timetable', 'timetable_bp', '/api/timetable'),
+    ('exams', 'exams_bp', '/api/exams'),
+    ('reports', 'reports_bp', '/api/reports'),
+    ('notices', 'notices_bp', '/api/notices'),
+    ('events', 'events_bp', '/api/events'),
+    ('dashboard', 'dashboard_bp', '/api/dashboard'),
+    ('submissions', 'submissions_bp', '/api/submissions'),
+    ('uploads', 'uploads_bp', '/api/uploads'),
+    ('metrics', 'metrics_bp', '/api/metrics'),
+    ('admissions', 'admissions_bp', '/api/admissions'),
+]
+
+def register_blueprints(app, names=None):
+    """Import and register the blueprints in names, or all of them."""
+    unknown = set(names or ()) - {module for module, _, _ in BLUEPRINTS}
+    if unknown:
+        raise ValueError(f'Unknown blueprints: {", ".join(sorted(unknown))}')
+    for module, attribute, prefix in BLUEPRINTS:
+        if names and module not in names:
+            continue
+        blueprint = getattr(importlib.import_module(f'.routes.{module}', __package__), attribute)
+        app.register_blueprint(blueprint, url_prefix=prefix)
+
+register_blueprints(app, [name.strip() for name in os.environ.get('APP_BLUEPRINTS', '').split(',') if name.strip()])
+
+# Opt-in profiling: latency/SQL metrics on /metrics, stacks of slow requests in PROFILE_DIR
+if os.environ.get('PROFILING', '').lower() in ('1', 'true', 'yes', 'on'):
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 100))
+    app.config['PROFILE_SLOW_REQUEST_MS'] = float(os.environ.get('PROFILE_SLOW_REQUEST_MS', 0))
+    app.config['PROFILE_INTERVAL_MS'] = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
+    app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR')
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    from .utils.profiling import init_profiling
+    init_profiling(app)
 
 # Serve React build files for specific panels
+landing_assets = StaticIndex('../../frontend/school-landing/dist')
+student_assets = StaticIndex('../../frontend/student-panel/dist')
+teacher_assets = StaticIndex('../../frontend/teacher-panel/dist')
+parent_assets = StaticIndex('../../frontend/parent-panel/dist')
+
 @app.route('/student-panel/<path:filename>')
 def serve_student_panel(filename):
-    return send_from_directory('../../frontend/student-panel/dist', filename)
+    return student_assets.serve(filename)
 
 @app.route('/student-panel/')
 def student_panel_root():
-    return send_from_directory('../../frontend/student-panel/dist', 'index.html')
+    return student_assets.serve('index.html')
 
 @app.route('/teacher-panel/<path:filename>')
 def serve_teacher_panel(filename):
-    return send_from_directory('../../frontend/teacher-panel/dist', filename)
+    return teacher_assets.serve(filename)
 
 @app.route('/teacher-panel/')
 def teacher_panel_root():
-    return send_from_directory('../../frontend/teacher-panel/dist', 'index.html')
+    return teacher_assets.serve('index.html')
 
 @app.route('/parent-panel/<path:filename>')
 def serve_parent_panel(filename):
-    return send_from_directory('../../frontend/parent-panel/dist', filename)
+    return parent_assets.serve(filename)
 
 @app.route('/parent-panel/')
 def parent_panel_root():
-    return send_from_directory('../../frontend/parent-panel/dist', 'index.html')
+    return parent_assets.serve('index.html')
 
 # Redirect root to landing page
 @app.route('/')
 def index():
-    return send_from_directory('../../frontend/school-landing/dist', 'index.html')
+    return landing_assets.serve('index.html')
+
+@app.route('/<path:filename>')
+def serve_landing(filename):
+    return landing_assets.serve(filename)
 
 @app.route('/api/test')
 def test_api():
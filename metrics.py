@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+from src.models.school import db, UserRole
+from src.routes.auth import role_required
+from src.utils.database import pool_stats
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/pool', methods=['GET'])
+@role_required([UserRole.ADMIN])
+def get_pool_metrics():
+    """Connection pool usage per engine for this worker process."""
+    try:
+        return jsonify({'engines': pool_stats(db.engines)}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,192 @@
+from flask import Blueprint, request, jsonify, session, current_app
+from src.models.school import db, UserRole, Notice
+from src.routes.auth import login_required, role_required, get_principal
+from src.routes.events import publish_notice
+from src.utils.feed_cache import feed_cache
+from src.utils.serializers import json_response
+from datetime import datetime, timezone
+import hashlib
+import json
+
+notices_bp = Blueprint('notices', __name__)
+
+NOTICE_TARGETS = ('all', 'student', 'teacher', 'parent')
+# Staff see every published notice regardless of target
+STAFF_ROLES = (UserRole.ADMIN, UserRole.PRINCIPAL)
+
+def _feed_key(role):
+    return 'staff' if role in STAFF_ROLES else role.value
+
+def build_notice_feed(role):
+    """Latest published notices visible to role, newest first."""
+    query = Notice.query.filter(Notice.is_published == db.true())
+    if role not in STAFF_ROLES:
+        query = query.filter(db.or_(
+            Notice.target_role.in_(('all', role.value)),
+            Notice.target_role.is_(None)
+        ))
+    limit = current_app.config.get('NOTICE_FEED_SIZE', 50)
+    notices = query.order_by(Notice.created_at.desc(), Notice.id.desc()).limit(limit)
+    return [notice.to_dict() for notice in notices]
+
+def get_notice_feed(role):
+    """(version, feed) for role, rebuilding only after a version bump.
+
+    feed holds the notices and a digest of them; the digest rather than the
+    version is the ETag, since a per-process cache may rebuild after its
+    TTL without ever seeing another worker's bump.
+    """
+    cache = feed_cache('notice_feed')
+    # Read the version before querying so a concurrent bump can't be
+    # recorded against data from before it
+    version = cache.version()
+    key = _feed_key(role)
+    entry = cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry
+    notices = build_notice_feed(role)
+    digest = hashlib.blake2b(json.dumps(notices, sort_keys=True).encode(), digest_size=12).hexdigest()
+    feed = {'etag': f'notices-{key}-{digest}', 'notices': notices}
+    cache.set(key, version, feed)
+    return version, feed
+
+def bump_notice_feed():
+    return feed_cache('notice_feed').bump()
+
+def _notify(notice):
+    # Pushing to open streams is best effort; pollers still see the feed
+    try:
+        publish_notice(notice)
+    except Exception:
+        current_app.logger.exception('Failed to publish notice %s', notice.id)
+
+def _changed_since(notice, since):
+    stamp = notice['updated_at'] or notice['created_at']
+    return stamp is not None and datetime.fromisoformat(stamp) > since
+
+@notices_bp.route('/feed', methods=['GET'])
+@login_required
+def get_feed():
+    try:
+        since = request.args.get('since')
+        try:
+            since = datetime.fromisoformat(since) if since else None
+        except ValueError:
+            return jsonify({'error': 'since must be an ISO 8601 timestamp'}), 400
+        if since is not None and since.tzinfo is not None:
+            # Stored stamps are naive UTC
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+        role, _ = get_principal(session['user_id'])
+        version, feed = get_notice_feed(role)
+
+        etag = feed['etag']
+        if since is not None:
+            # A filtered body differs from the full feed, so must its validator
+            etag = f'{etag}-since-{since.isoformat()}'
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            notices = feed['notices']
+            if since is not None:
+                notices = [notice for notice in notices if _changed_since(notice, since)]
+            response = json_response({'version': version, 'notices': notices})
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _apply_notice_fields(notice, data):
+    if 'target_role' in data and data['target_role'] not in NOTICE_TARGETS:
+        raise ValueError(f'target_role must be one of: {", ".join(NOTICE_TARGETS)}')
+    for field in ('title', 'content', 'target_role', 'is_published'):
+        if field in data:
+            setattr(notice, field, data[field])
+
+def _can_edit(notice):
+    role, _ = get_principal(session['user_id'])
+    return role in STAFF_ROLES or notice.created_by == session['user_id']
+
+@notices_bp.route('', methods=['POST'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def create_notice():
+    try:
+        data = request.get_json()
+
+        # Validate required fields
+        required_fields = ['title', 'content']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'{field} is required'}), 400
+
+        notice = Notice(created_by=session['user_id'], target_role='all')
+        try:
+            _apply_notice_fields(notice, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        db.session.add(notice)
+        db.session.commit()
+        bump_notice_feed()
+        _notify(notice)
+
+        return jsonify({
+            'message': 'Notice created successfully',
+            'notice': notice.to_dict()
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@notices_bp.route('/<int:notice_id>', methods=['PUT'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def update_notice(notice_id):
+    try:
+        notice = db.session.get(Notice, notice_id)
+        if not notice:
+            return jsonify({'error': 'Notice not found'}), 404
+        if not _can_edit(notice):
+            return jsonify({'error': 'Insufficient permissions'}), 403
+
+        try:
+            _apply_notice_fields(notice, request.get_json() or {})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        notice.updated_at = datetime.utcnow()
+        db.session.commit()
+        bump_notice_feed()
+        _notify(notice)
+
+        return jsonify({
+            'message': 'Notice updated successfully',
+            'notice': notice.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@notices_bp.route('/<int:notice_id>', methods=['DELETE'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def delete_notice(notice_id):
+    try:
+        notice = db.session.get(Notice, notice_id)
+        if not notice:
+            return jsonify({'error': 'Notice not found'}), 404
+        if not _can_edit(notice):
+            return jsonify({'error': 'Insufficient permissions'}), 403
+
+        db.session.delete(notice)
+        db.session.commit()
+        bump_notice_feed()
+
+        return jsonify({'message': 'Notice deleted successfully'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,79 @@
+from sqlalchemy import tuple_
+import base64
+import json
+
+MAX_LIMIT = 100
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(values):
+    """Pack the sort key of the last row on a page into an opaque token."""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+def _cursor_value(column, value, parser):
+    """value parsed and checked against column's Python type; None passes."""
+    if value is not None and not isinstance(value, (str, int, float)):
+        raise InvalidCursor('Invalid cursor')
+    if parser is not None:
+        try:
+            value = parser(value)
+        except (ValueError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+    if value is None:
+        return value
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        return value
+    if isinstance(value, bool) and expected is not bool or not isinstance(value, expected):
+        raise InvalidCursor('Invalid cursor')
+    return value
+
+def keyset_page(query, columns, cursor=None, limit=20, serializers=None, parsers=None, max_limit=MAX_LIMIT):
+    """Fetch one page of query ordered by columns, starting after cursor.
+
+    columns is the ordered sort key and must end with a unique column
+    (usually the primary key) so pages never overlap. serializers/parsers
+    convert non-JSON values (e.g. datetimes) to and from the cursor token.
+    limit is clamped to 1..max_limit; callers should reject values outside
+    that range with a 400 themselves.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    serializers = serializers or {}
+    parsers = parsers or {}
+    limit = max(1, min(limit, max_limit))
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise InvalidCursor('Cursor does not match sort order')
+        values = [_cursor_value(col, v, parsers.get(col.key)) for col, v in zip(columns, values)]
+        if len(columns) == 1:
+            query = query.filter(columns[0] > values[0])
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+
+    # Fetch one extra row to learn whether another page exists without a COUNT
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor([
+        serializers.get(col.key, lambda v: v)(getattr(last, col.key)) for col in columns
+    ])
+    return rows, next_cursor
@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+import atexit
+import os
+import threading
+
+# werkzeug method string; the cost is part of it, e.g. "scrypt:32768:8:1"
+# (N:r:p) or "pbkdf2:sha256:600000" (iterations)
+DEFAULT_HASH_METHOD = 'scrypt:32768:8:1'
+
+_method_prefixes = {}
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+def _config(key, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+def hash_method():
+    return _config('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD)
+
+def _get_pool(size):
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != size:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=size)
+            _pool_size = size
+        return _pool
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+
+def hash_password(password):
+    return generate_password_hash(password, method=hash_method())
+
+def hash_passwords(passwords):
+    """Hash many passwords, each with its own salt, across a process pool.
+
+    Uses PASSWORD_VERIFY_POOL_SIZE workers when set (sharing the login
+    pool), otherwise one per CPU. Bulk imports spend nearly all their time
+    here, so this is what scales them with the core count.
+    """
+    pool_size = _config('PASSWORD_VERIFY_POOL_SIZE', 0) or os.cpu_count() or 1
+    hasher = partial(generate_password_hash, method=hash_method())
+    if pool_size <= 1 or len(passwords) < 2:
+        return [hasher(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (pool_size * 4))
+    return list(_get_pool(pool_size).map(hasher, passwords, chunksize=chunksize))
+
+def verify_password(pwhash, password):
+    """Check password against pwhash.
+
+    With PASSWORD_VERIFY_POOL_SIZE > 0 the hash runs in a process pool, so a
+    burst of logins is spread over every core instead of serialising on the
+    worker that received it.
+    """
+    pool_size = _config('PASSWORD_VERIFY_POOL_SIZE', 0)
+    if pool_size > 0:
+        return _get_pool(pool_size).submit(check_password_hash, pwhash, password).result()
+    return check_password_hash(pwhash, password)
+
+def _method_prefix(method):
+    # werkzeug fills in default parameters ("scrypt" -> "scrypt:32768:8:1"),
+    # so derive the canonical prefix from a real hash once per method
+    if method not in _method_prefixes:
+        _method_prefixes[method] = generate_password_hash('', method=method).split('$', 1)[0]
+    return _method_prefixes[method]
+
+def needs_rehash(pwhash):
+    """True if pwhash was made with a different method or cost than configured."""
+    return pwhash.split('$', 1)[0] != _method_prefix(hash_method())
@@ -0,0 +1,313 @@
+"""Opt-in request profiling and SQL instrumentation.
+
+init_profiling(app) adds request hooks and SQLAlchemy cursor events that
+record, per endpoint:
+
+* a latency histogram and request counts by status,
+* SQL queries and SQL time per request (also sent as a Server-Timing
+  header), and
+* queries slower than SLOW_QUERY_MS, which are logged with their statement.
+
+Everything is served in Prometheus text format at /metrics, together with
+the connection pool gauges from src.utils.database. Counters are per
+process; scrape each worker, or aggregate in Prometheus. /metrics takes a
+METRICS_TOKEN bearer token, or an admin session when no token is set.
+
+With PROFILE_SLOW_REQUEST_MS set, a sampling profiler records the stack of
+every in-flight request every PROFILE_INTERVAL_MS. Requests slower than
+the threshold have their samples written to PROFILE_DIR as folded stacks,
+which flamegraph.pl and speedscope read directly. Sampling sees OS threads
+only, so under gevent all greenlets of a worker share one stack.
+"""
+from flask import current_app, g, request, Response, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.utils.database import pool_stats
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+import hmac
+import os
+import sys
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Streams stay open for minutes and would swamp the latency histograms
+UNTIMED_MIMETYPES = ('text/event-stream',)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """(le, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield ('+Inf' if bound == float('inf') else repr(bound)), total
+
+class RequestMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.query_counts = {}
+        self.requests = Counter()
+        self.sql_seconds = Counter()
+        self.slow_queries = Counter()
+        self.slow_requests = Counter()
+
+    def observe_request(self, endpoint, method, status, seconds, queries, sql_seconds):
+        key = (endpoint, method)
+        with self.lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.query_counts[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.query_counts[key].observe(queries)
+            self.requests[key + (status,)] += 1
+            self.sql_seconds[key] += sql_seconds
+
+    def observe_slow_query(self, endpoint):
+        with self.lock:
+            self.slow_queries[endpoint] += 1
+
+    def observe_slow_request(self, endpoint):
+        with self.lock:
+            self.slow_requests[endpoint] += 1
+
+    def render(self, pools=None):
+        """Prometheus text exposition of everything recorded so far."""
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, histograms):
+            for (endpoint, method), hist in sorted(histograms.items()):
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                for le, count in hist.samples():
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f'{name}_sum{{{labels}}} {hist.sum:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {hist.count}')
+
+        with self.lock:
+            metric('http_request_duration_seconds', 'histogram', 'Request latency by endpoint.')
+            histogram('http_request_duration_seconds', self.latency)
+            metric('http_requests_total', 'counter', 'Requests by endpoint and status.')
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+            metric('http_request_sql_queries', 'histogram', 'SQL statements executed per request.')
+            histogram('http_request_sql_queries', self.query_counts)
+            metric('http_request_sql_seconds_total', 'counter', 'Time spent in SQL by endpoint.')
+            for (endpoint, method), seconds in sorted(self.sql_seconds.items()):
+                lines.append(f'http_request_sql_seconds_total{{endpoint="{endpoint}",method="{method}"}} {seconds:.6f}')
+            metric('sql_slow_queries_total', 'counter', 'Queries slower than SLOW_QUERY_MS.')
+            for endpoint, count in sorted(self.slow_queries.items()):
+                lines.append(f'sql_slow_queries_total{{endpoint="{endpoint}"}} {count}')
+            metric('http_slow_requests_total', 'counter', 'Requests slower than PROFILE_SLOW_REQUEST_MS.')
+            for endpoint, count in sorted(self.slow_requests.items()):
+                lines.append(f'http_slow_requests_total{{endpoint="{endpoint}"}} {count}')
+
+        gauges = {
+            'checked_out': 'Connections in use.',
+            'checked_in': 'Idle connections in the pool.',
+            'overflow': 'Connections opened beyond pool_size.',
+            'timeouts': 'Checkouts that gave up waiting.',
+            'wait_seconds_total': 'Time spent waiting for a connection.'
+        }
+        for field, help_text in gauges.items():
+            name = f'db_pool_{field}'
+            metric(name, 'counter' if field in ('timeouts', 'wait_seconds_total') else 'gauge', help_text)
+            for bind, stats in sorted((pools or {}).items()):
+                if field in stats:
+                    lines.append(f'{name}{{bind="{bind}"}} {stats[field]}')
+        return '\n'.join(lines) + '\n'
+
+class StackSampler:
+    """Background thread sampling the stacks of registered request threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.active = {}
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self, thread_id):
+        with self.lock:
+            self.active[thread_id] = Counter()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def stop(self, thread_id):
+        """Stop sampling a thread and return its folded stack counts."""
+        with self.lock:
+            return self.active.pop(thread_id, Counter())
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            if not self.active:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, stacks in self.active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != own_id:
+                        stacks[fold_stack(frame)] += 1
+
+def fold_stack(frame):
+    """Root-to-leaf 'func (file:line);...' string as flamegraph.pl expects."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+def write_folded(directory, name, stacks):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{datetime.utcnow():%Y%m%dT%H%M%S%f}-{name}.folded')
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f'{stack} {count}\n')
+    return path
+
+class RequestProfile:
+    __slots__ = ('started', 'queries', 'sql_seconds', 'status', 'timed', 'sampling')
+
+    def __init__(self, sampling):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.status = 500
+        self.timed = True
+        self.sampling = sampling
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    if not has_request_context():
+        return
+    profile = g.get('_profile')
+    if profile is None:
+        return
+    elapsed = time.perf_counter() - started
+    profile.queries += 1
+    profile.sql_seconds += elapsed
+    if elapsed * 1000 >= current_app.config.get('SLOW_QUERY_MS', 100):
+        current_app.extensions['profiling'].observe_slow_query(_endpoint())
+        current_app.logger.warning('Slow query (%.1f ms) in %s: %s', elapsed * 1000, _endpoint(), statement)
+
+def _handle_error(context):
+    # after_cursor_execute does not fire for failed statements
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+def _start_request():
+    sampler = current_app.extensions.get('profiling_sampler')
+    sampling = sampler is not None and current_app.config.get('PROFILE_SLOW_REQUEST_MS', 0) > 0
+    g._profile = RequestProfile(sampling)
+    if sampling:
+        sampler.start(threading.get_ident())
+
+def _finish_response(response):
+    profile = g.get('_profile')
+    if profile is None:
+        return response
+    profile.status = response.status_code
+    if response.mimetype in UNTIMED_MIMETYPES:
+        profile.timed = False
+    elapsed = time.perf_counter() - profile.started
+    response.headers['Server-Timing'] = (
+        f'app;dur={elapsed * 1000:.1f}, sql;dur={profile.sql_seconds * 1000:.1f};desc="{profile.queries} queries"'
+    )
+    return response
+
+def _record_request(exc):
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return
+    elapsed = time.perf_counter() - profile.started
+    metrics = current_app.extensions['profiling']
+    endpoint = _endpoint()
+    stacks = current_app.extensions['profiling_sampler'].stop(threading.get_ident()) if profile.sampling else None
+    if not profile.timed:
+        return
+
+    metrics.observe_request(endpoint, request.method, profile.status, elapsed, profile.queries, profile.sql_seconds)
+
+    threshold = current_app.config.get('PROFILE_SLOW_REQUEST_MS', 0)
+    if threshold > 0 and elapsed * 1000 >= threshold:
+        metrics.observe_slow_request(endpoint)
+        if stacks:
+            directory = current_app.config.get('PROFILE_DIR') or os.path.join(current_app.instance_path, 'profiles')
+            path = write_folded(directory, endpoint, stacks)
+            current_app.logger.warning('Slow request (%.0f ms) %s %s: stacks in %s', elapsed * 1000, request.method, request.path, path)
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return _render_metrics()
+    # Without a token the endpoint is as private as /api/metrics/pool
+    from src.models.school import UserRole
+    from src.routes.auth import role_required
+    return role_required([UserRole.ADMIN])(_render_metrics)()
+
+def _render_metrics():
+    engines = current_app.extensions['sqlalchemy'].engines if 'sqlalchemy' in current_app.extensions else {}
+    body = current_app.extensions['profiling'].render(pool_stats(engines))
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+_sql_hooks_installed = False
+
+def init_profiling(app):
+    """Install the profiling hooks and the /metrics endpoint on app.
+
+    Set METRICS_TOKEN to let scrapers in with 'Authorization: Bearer
+    <token>'; without it /metrics needs an admin session.
+    """
+    global _sql_hooks_installed
+    if 'profiling' in app.extensions:
+        return
+    app.extensions['profiling'] = RequestMetrics()
+    app.extensions['profiling_sampler'] = StackSampler(app.config.get('PROFILE_INTERVAL_MS', 5) / 1000)
+
+    if not _sql_hooks_installed:
+        # Engine-class listeners cover every engine, including ones created later
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _sql_hooks_installed = True
+
+    app.before_request(_start_request)
+    app.after_request(_finish_response)
+    app.teardown_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,129 @@
+"""In-process publish/subscribe hub for server-sent events.
+
+Each SSE connection holds one Subscription: a small deque plus an Event
+the connection waits on, so an idle subscriber costs a few hundred bytes
+and no CPU. The waits use plain threading primitives, which gevent's
+monkey patching turns cooperative; run the app under a gevent worker
+(gunicorn -k gevent) so thousands of idle streams share a handful of OS
+threads instead of each holding a sync worker.
+
+With EVENTS_BROKER_URL set, publishes go through Redis pub/sub and every
+worker relays them to its local subscribers.
+"""
+from flask import current_app
+from collections import deque
+import itertools
+import json
+import threading
+
+try:
+    import redis
+except ImportError:  # optional, only needed for a cross-worker broker
+    redis = None
+
+class Subscription:
+    def __init__(self, hub, channels, maxlen=100):
+        self.hub = hub
+        self.channels = tuple(channels)
+        # Slow consumers drop their oldest events rather than grow without bound
+        self._events = deque(maxlen=maxlen)
+        self._ready = threading.Event()
+
+    def _push(self, event):
+        self._events.append(event)
+        self._ready.set()
+
+    def get(self, timeout=None):
+        """Wait up to timeout seconds and return every pending event."""
+        if not self._events:
+            self._ready.wait(timeout)
+        self._ready.clear()
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+class Hub:
+    def __init__(self, broker=None):
+        self.broker = broker
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        if broker is not None:
+            broker.start(self.deliver)
+
+    def subscribe(self, channels, maxlen=100):
+        subscription = Subscription(self, channels, maxlen)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({s for subscribers in self._channels.values() for s in subscribers})
+
+    def publish(self, channel, event, data):
+        """Send an event to every subscriber of channel, in all workers when brokered."""
+        if self.broker is not None:
+            self.broker.publish(channel, event, data)
+        else:
+            self.deliver(channel, event, data)
+
+    def deliver(self, channel, event, data):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        if not subscribers:
+            return 0
+        message = {'id': next(self._ids), 'event': event, 'data': json.dumps(data)}
+        for subscription in subscribers:
+            subscription._push(message)
+        return len(subscribers)
+
+class RedisBroker:
+    """Relays publishes between workers over Redis pub/sub."""
+
+    def __init__(self, url, prefix='events'):
+        if redis is None:
+            raise RuntimeError('redis is not installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def publish(self, channel, event, data):
+        self.client.publish(f'{self.prefix}:{channel}', json.dumps({'event': event, 'data': data}))
+
+    def start(self, deliver):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        offset = len(self.prefix) + 1
+
+        def handle(message):
+            payload = json.loads(message['data'])
+            deliver(message['channel'].decode()[offset:], payload['event'], payload['data'])
+
+        pubsub.psubscribe(**{f'{self.prefix}:*': handle})
+        pubsub.run_in_thread(sleep_time=0.01, daemon=True)
+
+_hub_lock = threading.Lock()
+
+def event_hub():
+    """The app's Hub, created on first use."""
+    hub = current_app.extensions.get('event_hub')
+    if hub is None:
+        with _hub_lock:
+            hub = current_app.extensions.get('event_hub')
+            if hub is None:
+                url = current_app.config.get('EVENTS_BROKER_URL')
+                hub = current_app.extensions['event_hub'] = Hub(RedisBroker(url) if url else None)
+    return hub
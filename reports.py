@@ -0,0 +1,298 @@
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.models.school import (
+    db, UserRole, Class, Subject, Student, Exam, ExamResult, AttendanceSummary,
+    attendance_percentage
+)
+from src.routes.auth import login_required, role_required
+from src.routes.attendance import _can_view_student
+from src.utils.grading import grade_table
+from src.utils.database import read_replica
+import threading
+import time
+
+reports_bp = Blueprint('reports', __name__)
+
+class ReportCardCache:
+    """In-process TTL cache of computed class report cards keyed by (class_id, term).
+
+    Each entry remembers which exams it was built from so a change to any
+    result of those exams drops it. Every invalidation also bumps a
+    generation counter: a build passes the generation it started at to
+    set(), which discards the result if anything was invalidated meanwhile,
+    since the build may have read data from before that commit. The TTL
+    bounds staleness across worker processes, from replica lag and for
+    attendance, none of which is tracked here.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[0]
+
+    def set(self, key, report, exam_ids, ttl, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            if len(self._entries) >= self.maxsize:
+                oldest = min(self._entries, key=lambda k: self._entries[k][2])
+                del self._entries[oldest]
+            self._entries[key] = (report, frozenset(exam_ids), time.monotonic() + ttl)
+
+    def invalidate(self, class_id, term):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop((class_id, term), None)
+
+    def invalidate_exams(self, exam_ids):
+        exam_ids = set(exam_ids)
+        with self._lock:
+            self._generation += 1
+            for key in [k for k, entry in self._entries.items() if entry[1] & exam_ids]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+report_card_cache = ReportCardCache()
+
+# ORM writes to results or exams are collected at flush and applied on commit,
+# so a concurrent request can't re-cache the old numbers mid-transaction; a
+# build that read them before the commit is turned away by the generation
+# check. Core bulk statements bypass the session and must invalidate explicitly.
+
+@event.listens_for(Session, 'after_flush')
+def _collect_stale_reports(session, flush_context):
+    stale = session.info.setdefault('stale_report_cards', {'exams': set(), 'terms': set()})
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ExamResult):
+            stale['exams'].add(obj.exam_id)
+        elif isinstance(obj, Exam):
+            stale['exams'].add(obj.id)
+            stale['terms'].add((obj.class_id, obj.exam_type))
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_reports(session):
+    stale = session.info.pop('stale_report_cards', None)
+    if stale:
+        report_card_cache.invalidate_exams(stale['exams'])
+        for class_id, term in stale['terms']:
+            report_card_cache.invalidate(class_id, term)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_stale_reports(session):
+    session.info.pop('stale_report_cards', None)
+
+def _rank(scores):
+    """Competition ranking (1, 2, 2, 4) of {key: score}, highest first."""
+    ranks = {}
+    previous = None
+    for position, (key, score) in enumerate(sorted(scores.items(), key=lambda item: -item[1]), start=1):
+        if score != previous:
+            rank = position
+            previous = score
+        ranks[key] = rank
+    return ranks
+
+def _percentage(obtained, maximum):
+    return round(obtained * 100.0 / maximum, 2) if maximum else None
+
+def build_class_report(class_obj, term):
+    """Report cards, rankings and subject averages for one class and term.
+
+    Four set-based queries regardless of class size: the term's exams, the
+    class roster, per-(student, subject) mark totals and attendance rollups.
+    Returns (report, exam_ids).
+    """
+    exams = db.session.query(
+        Exam.id, Exam.subject_id, Exam.max_marks, Subject.name, Subject.code
+    ).join(Subject, Exam.subject_id == Subject.id).filter(
+        Exam.class_id == class_obj.id,
+        Exam.exam_type == term
+    ).all()
+
+    subjects = {}
+    for exam in exams:
+        subject = subjects.setdefault(exam.subject_id, {
+            'subject_id': exam.subject_id, 'name': exam.name, 'code': exam.code, 'max_marks': 0
+        })
+        subject['max_marks'] += exam.max_marks
+    total_max = sum(subject['max_marks'] for subject in subjects.values())
+
+    students = db.session.query(
+        Student.id, Student.student_id, Student.first_name, Student.last_name
+    ).filter(Student.class_id == class_obj.id).order_by(Student.id).all()
+
+    # Missing results count as zero against the subject's full marks
+    marks = {}
+    if exams:
+        rows = db.session.query(
+            ExamResult.student_id, Exam.subject_id, db.func.sum(ExamResult.marks_obtained)
+        ).join(Exam, ExamResult.exam_id == Exam.id).filter(
+            ExamResult.exam_id.in_([exam.id for exam in exams]),
+            ExamResult.student_id.in_(db.session.query(Student.id).filter(Student.class_id == class_obj.id))
+        ).group_by(ExamResult.student_id, Exam.subject_id)
+        for student_id, subject_id, obtained in rows:
+            marks[(student_id, subject_id)] = int(obtained or 0)
+
+    attendance = {
+        student_id: (int(present or 0), int(absent or 0), int(late or 0))
+        for student_id, present, absent, late in db.session.query(
+            AttendanceSummary.student_id,
+            db.func.sum(AttendanceSummary.present_count),
+            db.func.sum(AttendanceSummary.absent_count),
+            db.func.sum(AttendanceSummary.late_count)
+        ).filter(AttendanceSummary.class_id == class_obj.id).group_by(AttendanceSummary.student_id)
+    }
+
+    table = grade_table()
+    ordered_subjects = sorted(subjects.values(), key=lambda s: s['name'])
+    students_with_results = {student_id for student_id, _ in marks}
+
+    # Per-subject class averages and ranks, then overall totals and rank
+    subject_ranks = {}
+    for subject in ordered_subjects:
+        scores = {s.id: marks.get((s.id, subject['subject_id']), 0) for s in students if s.id in students_with_results}
+        subject['class_average'] = round(sum(scores.values()) / len(scores), 2) if scores else None
+        subject['class_average_percentage'] = _percentage(subject['class_average'] or 0, subject['max_marks']) if scores else None
+        subject['highest'] = max(scores.values()) if scores else None
+        subject_ranks[subject['subject_id']] = _rank(scores)
+
+    totals = {
+        s.id: sum(marks.get((s.id, subject_id), 0) for subject_id in subjects)
+        for s in students if s.id in students_with_results
+    }
+    ranks = _rank(totals)
+    overall_grades = dict(zip(totals, table.grade_all(list(totals.values()), total_max))) if total_max else {}
+
+    cards = []
+    for student in students:
+        subject_rows = []
+        for subject in ordered_subjects:
+            obtained = marks.get((student.id, subject['subject_id']))
+            percentage = _percentage(obtained or 0, subject['max_marks'])
+            subject_rows.append({
+                'subject_id': subject['subject_id'],
+                'name': subject['name'],
+                'code': subject['code'],
+                'marks_obtained': obtained,
+                'max_marks': subject['max_marks'],
+                'percentage': percentage if obtained is not None else None,
+                'grade': table.grade(percentage) if obtained is not None else None,
+                'class_average': subject['class_average'],
+                'rank': subject_ranks[subject['subject_id']].get(student.id)
+            })
+        present, absent, late = attendance.get(student.id, (0, 0, 0))
+        total = totals.get(student.id)
+        cards.append({
+            'student_id': student.id,
+            'student_code': student.student_id,
+            'name': f'{student.first_name} {student.last_name}',
+            'subjects': subject_rows,
+            'total_obtained': total,
+            'total_max': total_max,
+            'percentage': _percentage(total, total_max) if total is not None else None,
+            'grade': overall_grades.get(student.id),
+            'rank': ranks.get(student.id),
+            'attendance': {
+                'present_count': present,
+                'absent_count': absent,
+                'late_count': late,
+                'attendance_percentage': attendance_percentage(present, absent, late)
+            }
+        })
+
+    report = {
+        'class_id': class_obj.id,
+        'class_name': class_obj.name,
+        'section': class_obj.section,
+        'term': term,
+        'student_count': len(students),
+        'ranked_count': len(ranks),
+        'class_average_percentage': _percentage(sum(totals.values()) / len(totals), total_max) if totals else None,
+        'subjects': [
+            {key: subject[key] for key in ('subject_id', 'name', 'code', 'max_marks', 'class_average', 'class_average_percentage', 'highest')}
+            for subject in ordered_subjects
+        ],
+        'report_cards': cards
+    }
+    return report, [exam.id for exam in exams]
+
+def get_class_report(class_obj, term):
+    """Cached build_class_report; REPORT_CARD_CACHE_TTL=0 disables the cache."""
+    ttl = current_app.config.get('REPORT_CARD_CACHE_TTL', 300)
+    key = (class_obj.id, term)
+    if ttl > 0:
+        report = report_card_cache.get(key)
+        if report is not None:
+            return report
+        generation = report_card_cache.generation()
+    with read_replica():
+        report, exam_ids = build_class_report(class_obj, term)
+    if ttl > 0:
+        report_card_cache.set(key, report, exam_ids, ttl, generation)
+    return report
+
+@reports_bp.route('/class/<int:class_id>', methods=['GET'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def get_class_report_cards(class_id):
+    try:
+        term = request.args.get('term')
+        if not term:
+            return jsonify({'error': 'term is required'}), 400
+
+        class_obj = db.session.get(Class, class_id)
+        if not class_obj:
+            return jsonify({'error': 'Class not found'}), 404
+
+        return jsonify(get_class_report(class_obj, term)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/student/<int:student_id>', methods=['GET'])
+@login_required
+def get_student_report_card(student_id):
+    try:
+        term = request.args.get('term')
+        if not term:
+            return jsonify({'error': 'term is required'}), 400
+        if not _can_view_student(student_id):
+            return jsonify({'error': 'Insufficient permissions'}), 403
+
+        student = db.session.get(Student, student_id)
+        if not student:
+            return jsonify({'error': 'Student not found'}), 404
+
+        # Served from the class report so a whole class shares one computation
+        report = get_class_report(student.class_assigned, term)
+        card = next(card for card in report['report_cards'] if card['student_id'] == student_id)
+        return jsonify(dict(
+            card,
+            class_id=report['class_id'],
+            class_name=report['class_name'],
+            section=report['section'],
+            term=term,
+            class_size=report['student_count'],
+            subjects_summary=report['subjects']
+        )), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
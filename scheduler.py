@@ -0,0 +1,318 @@
+"""Constraint-based timetable construction.
+
+Lessons are placed into a days x periods grid one at a time, most
+constrained first. Occupancy is tracked as integer bitmasks (one bit per
+slot) for every class, teacher and shared room, so checking whether a slot
+is free is a couple of AND operations instead of a search. When a lesson
+has no free slot, a short ejection chain moves already-placed lessons out
+of the way, and anything still unplaced goes through a min-conflicts tabu
+search. Because state is kept per entity, changing one assignment only
+re-places the lessons it touches.
+"""
+from collections import namedtuple, deque
+import random
+
+Lesson = namedtuple('Lesson', 'key class_id subject_id teacher_id room')
+
+# Soft-constraint weights used when choosing between free slots
+SAME_DAY_PENALTY = 10
+LATE_PERIOD_PENALTY = 1
+
+class Timetable:
+    def __init__(self, days=5, periods_per_day=8, teacher_unavailable=None, room_capacity=None,
+                 max_depth=1, max_repair_steps=20000, tabu_tenure=10, seed=0):
+        self.days = days
+        self.periods = periods_per_day
+        self.slot_count = days * periods_per_day
+        self.full_mask = (1 << self.slot_count) - 1
+        self.room_capacity = room_capacity or {}
+        self.max_depth = max_depth
+        self.max_repair_steps = max_repair_steps
+        self.tabu_tenure = tabu_tenure
+        self.random = random.Random(seed)
+
+        # teacher_id -> bitmask of slots the teacher cannot teach
+        self.teacher_blocked = {}
+        for teacher_id, slots in (teacher_unavailable or {}).items():
+            mask = 0
+            for day, period in slots:
+                mask |= 1 << self.slot(day, period)
+            self.teacher_blocked[teacher_id] = mask
+
+        self.lessons = {}
+        self.placement = {}
+        self.class_busy = {}
+        self.teacher_busy = {}
+        self.room_usage = {}
+        self.subject_days = {}
+        self.by_slot = {}
+        self.teacher_load = {}
+
+    def slot(self, day, period):
+        return day * self.periods + period
+
+    def day_period(self, slot):
+        return divmod(slot, self.periods)
+
+    # -- occupancy bookkeeping -------------------------------------------
+
+    def _room_full_mask(self, room):
+        if room is None:
+            return 0
+        usage = self.room_usage.get(room)
+        if not usage:
+            return 0
+        capacity = self.room_capacity.get(room, 1)
+        mask = 0
+        for slot, used in usage.items():
+            if used >= capacity:
+                mask |= 1 << slot
+        return mask
+
+    def _assign(self, lesson, slot):
+        bit = 1 << slot
+        self.placement[lesson.key] = slot
+        self.by_slot.setdefault(slot, set()).add(lesson.key)
+        self.class_busy[lesson.class_id] = self.class_busy.get(lesson.class_id, 0) | bit
+        self.teacher_busy[lesson.teacher_id] = self.teacher_busy.get(lesson.teacher_id, 0) | bit
+        if lesson.room is not None:
+            usage = self.room_usage.setdefault(lesson.room, {})
+            usage[slot] = usage.get(slot, 0) + 1
+        days = self.subject_days.setdefault((lesson.class_id, lesson.subject_id), [0] * self.days)
+        days[slot // self.periods] += 1
+
+    def _unassign(self, lesson):
+        slot = self.placement.pop(lesson.key)
+        self.by_slot[slot].discard(lesson.key)
+        bit = ~(1 << slot)
+        self.class_busy[lesson.class_id] &= bit
+        self.teacher_busy[lesson.teacher_id] &= bit
+        if lesson.room is not None:
+            self.room_usage[lesson.room][slot] -= 1
+        self.subject_days[(lesson.class_id, lesson.subject_id)][slot // self.periods] -= 1
+        return slot
+
+    def _free_mask(self, lesson):
+        taken = (self.class_busy.get(lesson.class_id, 0)
+                 | self.teacher_busy.get(lesson.teacher_id, 0)
+                 | self.teacher_blocked.get(lesson.teacher_id, 0)
+                 | self._room_full_mask(lesson.room))
+        return self.full_mask & ~taken
+
+    def _cost(self, lesson, slot):
+        day, period = divmod(slot, self.periods)
+        days = self.subject_days.get((lesson.class_id, lesson.subject_id))
+        same_day = days[day] if days else 0
+        return same_day * SAME_DAY_PENALTY + period * LATE_PERIOD_PENALTY
+
+    def _best_slot(self, lesson, mask):
+        best = None
+        best_cost = None
+        while mask:
+            low = mask & -mask
+            slot = low.bit_length() - 1
+            mask ^= low
+            cost = self._cost(lesson, slot)
+            if best_cost is None or cost < best_cost:
+                best, best_cost = slot, cost
+        return best
+
+    # -- placement -------------------------------------------------------
+
+    def _blockers(self, lesson, slot):
+        """Placed lessons that would have to move for lesson to take slot."""
+        blockers = []
+        room_blocker = None
+        for key in sorted(self.by_slot.get(slot, ())):
+            other = self.lessons[key]
+            if other.class_id == lesson.class_id or other.teacher_id == lesson.teacher_id:
+                blockers.append(other)
+            elif lesson.room is not None and other.room == lesson.room and room_blocker is None:
+                room_blocker = other
+        # A shared room only needs one lesson moved, and only when it is full
+        if room_blocker is not None and not any(b.room == lesson.room for b in blockers):
+            if self.room_usage[lesson.room].get(slot, 0) >= self.room_capacity.get(lesson.room, 1):
+                blockers.append(room_blocker)
+        return blockers
+
+    def _place(self, lesson, depth, moving):
+        mask = self._free_mask(lesson)
+        if mask:
+            self._assign(lesson, self._best_slot(lesson, mask))
+            return True
+        if depth == 0:
+            return False
+
+        # Ejection chain: take a slot the teacher can use, move whatever is
+        # in the way somewhere else, recursing at most max_depth levels
+        available = self.full_mask & ~self.teacher_blocked.get(lesson.teacher_id, 0)
+        candidates = []
+        while available:
+            low = available & -available
+            slot = low.bit_length() - 1
+            available ^= low
+            blockers = self._blockers(lesson, slot)
+            if blockers and len(blockers) <= 2 and not any(b.key in moving for b in blockers):
+                candidates.append((len(blockers), self._cost(lesson, slot), slot, blockers))
+        candidates.sort(key=lambda c: (c[0], c[1]))
+
+        for _, _, slot, blockers in candidates:
+            undo = [(b, self._unassign(b)) for b in blockers]
+            # The slot is now free for this lesson unless room capacity disagrees
+            if self._free_mask(lesson) >> slot & 1:
+                self._assign(lesson, slot)
+                moved = []
+                ok = True
+                for blocker in blockers:
+                    if self._place(blocker, depth - 1, moving | {lesson.key}):
+                        moved.append(blocker)
+                    else:
+                        ok = False
+                        break
+                if ok:
+                    return True
+                for blocker in moved:
+                    self._unassign(blocker)
+                self._unassign(lesson)
+            for blocker, old_slot in undo:
+                self._assign(blocker, old_slot)
+        return False
+
+    def _difficulty(self, lesson):
+        # Teachers with many lessons or few available slots go first
+        blocked = bin(self.teacher_blocked.get(lesson.teacher_id, 0)).count('1')
+        return (-(self.teacher_load.get(lesson.teacher_id, 0) + blocked), lesson.class_id, lesson.subject_id)
+
+    def solve(self, lessons, fixed=None):
+        """Place lessons, keeping any fixed {key: slot} placements.
+
+        Returns the list of lessons that could not be placed.
+        """
+        for lesson in lessons:
+            self.lessons[lesson.key] = lesson
+        self.teacher_load = {}
+        for lesson in self.lessons.values():
+            self.teacher_load[lesson.teacher_id] = self.teacher_load.get(lesson.teacher_id, 0) + 1
+
+        for key, slot in (fixed or {}).items():
+            if key in self.lessons and key not in self.placement:
+                self._assign(self.lessons[key], slot)
+
+        pending = sorted((l for l in lessons if l.key not in self.placement), key=self._difficulty)
+        unplaced = []
+        for lesson in pending:
+            if not self._place(lesson, self.max_depth, frozenset()):
+                unplaced.append(lesson)
+        if unplaced:
+            unplaced = self._repair(unplaced)
+        return unplaced
+
+    def _repair(self, unplaced):
+        """Min-conflicts search with a tabu list for lessons greedy couldn't place.
+
+        Each step forces one unplaced lesson into the slot with the fewest
+        blockers and queues the blockers instead; recently vacated
+        (lesson, slot) pairs are tabu so lessons don't bounce straight back.
+        """
+        queue = deque(unplaced)
+        tabu = {}
+        for step in range(self.max_repair_steps):
+            if not queue:
+                break
+            lesson = queue.popleft()
+            mask = self._free_mask(lesson)
+            if mask:
+                self._assign(lesson, self._best_slot(lesson, mask))
+                continue
+
+            available = self.full_mask & ~self.teacher_blocked.get(lesson.teacher_id, 0)
+            best = []
+            best_score = None
+            while available:
+                low = available & -available
+                slot = low.bit_length() - 1
+                available ^= low
+                if tabu.get((lesson.key, slot), -1) >= step:
+                    continue
+                blockers = self._blockers(lesson, slot)
+                score = len(blockers)
+                if best_score is None or score < best_score:
+                    best, best_score = [(slot, blockers)], score
+                elif score == best_score:
+                    best.append((slot, blockers))
+            if not best:
+                queue.append(lesson)
+                continue
+
+            slot, blockers = self.random.choice(best)
+            for blocker in blockers:
+                self._unassign(blocker)
+                tabu[(blocker.key, slot)] = step + self.tabu_tenure
+                queue.append(blocker)
+            self._assign(lesson, slot)
+        return list(queue)
+
+    def replace(self, old_keys, new_lessons):
+        """Incremental re-solve: drop old_keys, place new_lessons.
+
+        Every other placement stays where it is unless the ejection chain or
+        repair search has to move it to make room.
+        """
+        for key in old_keys:
+            if key in self.placement:
+                self._unassign(self.lessons[key])
+            self.lessons.pop(key, None)
+        return self.solve(new_lessons)
+
+    def capacity_problems(self, lessons):
+        """Classes, teachers or rooms with more lessons than usable slots.
+
+        These make the timetable infeasible no matter how lessons are
+        arranged, so callers can report them instead of searching.
+        """
+        problems = []
+        class_load = {}
+        teacher_load = {}
+        room_load = {}
+        for lesson in lessons:
+            class_load[lesson.class_id] = class_load.get(lesson.class_id, 0) + 1
+            teacher_load[lesson.teacher_id] = teacher_load.get(lesson.teacher_id, 0) + 1
+            if lesson.room is not None:
+                room_load[lesson.room] = room_load.get(lesson.room, 0) + 1
+        for class_id, load in sorted(class_load.items()):
+            if load > self.slot_count:
+                problems.append({'class_id': class_id, 'lessons': load, 'slots': self.slot_count})
+        for teacher_id, load in sorted(teacher_load.items()):
+            slots = self.slot_count - bin(self.teacher_blocked.get(teacher_id, 0)).count('1')
+            if load > slots:
+                problems.append({'teacher_id': teacher_id, 'lessons': load, 'slots': slots})
+        for room, load in sorted(room_load.items()):
+            slots = self.slot_count * self.room_capacity.get(room, 1)
+            if load > slots:
+                problems.append({'room': room, 'lessons': load, 'slots': slots})
+        return problems
+
+    def entries(self):
+        for key, slot in self.placement.items():
+            day, period = self.day_period(slot)
+            yield self.lessons[key], day, period
+
+def build_lessons(assignments, periods_per_week, default_periods=4, rooms=None, numbered=None):
+    """Expand (class_id, subject_id, teacher_id) assignments into lessons.
+
+    periods_per_week and rooms are keyed by subject_id; subjects mapped to a
+    room share it across classes (e.g. a single computer lab). Keys are
+    (class_id, subject_id, teacher_id, n), numbered on from numbered[(class_id,
+    subject_id, teacher_id)], so a class can have a subject with several
+    teachers, or the same assignment twice, without lessons sharing a key.
+    """
+    rooms = rooms or {}
+    numbered = dict(numbered or {})
+    lessons = []
+    for class_id, subject_id, teacher_id in assignments:
+        first = numbered.get((class_id, subject_id, teacher_id), 0)
+        count = periods_per_week.get(subject_id, default_periods)
+        for n in range(first, first + count):
+            lessons.append(Lesson((class_id, subject_id, teacher_id, n), class_id, subject_id, teacher_id, rooms.get(subject_id)))
+        numbered[(class_id, subject_id, teacher_id)] = first + count
+    return lessons
@@ -1,9 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from src.utils.passwords import hash_password, verify_password, needs_rehash
+from src.utils.database import RoutingSession
 import enum
 
-db = SQLAlchemy()
+# RoutingSession lets read_replica() send heavy reads to DATABASE_REPLICA_URL
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class UserRole(enum.Enum):
     ADMIN = "admin"
@@ -14,6 +16,13 @@ class UserRole(enum.Enum):
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Role filter plus keyset order for the admin user listing
+        db.Index('ix_users_role_id', 'role', 'id'),
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    # Columns never exposed by to_dict or the compiled serializers
+    serialize_exclude = ('password_hash', 'updated_at')
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -29,10 +38,13 @@ class User(db.Model):
     parent_profile = db.relationship('Parent', backref='user', uselist=False)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
     
     def to_dict(self):
         return {
@@ -223,8 +235,48 @@ class TeacherSubject(db.Model):
             'class_id': self.class_id
         }
 
+class TimetableSlot(db.Model):
+    __tablename__ = 'timetable_slots'
+    __table_args__ = (
+        db.UniqueConstraint('class_id', 'day', 'period', name='uq_timetable_class_slot'),
+        db.UniqueConstraint('teacher_id', 'day', 'period', name='uq_timetable_teacher_slot'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False)
+    day = db.Column(db.Integer, nullable=False)  # 0 = Monday
+    period = db.Column(db.Integer, nullable=False)  # 0-based period of the day
+    room = db.Column(db.String(50))  # shared room, e.g. a lab; None = class room
+    
+    # Relationships
+    class_assigned = db.relationship('Class', backref='timetable_slots')
+    subject = db.relationship('Subject', backref='timetable_slots')
+    teacher = db.relationship('Teacher', backref='timetable_slots')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'class_id': self.class_id,
+            'subject_id': self.subject_id,
+            'teacher_id': self.teacher_id,
+            'day': self.day,
+            'period': self.period,
+            'room': self.room
+        }
+
 class Attendance(db.Model):
     __tablename__ = 'attendance'
+    __table_args__ = (
+        # One mark per student per subject period; daily marks (no subject)
+        # need a partial index since NULLs never conflict in a plain unique key.
+        db.UniqueConstraint('student_id', 'date', 'subject_id', name='uq_attendance_student_date_subject'),
+        db.Index('uq_attendance_student_date_daily', 'student_id', 'date', unique=True,
+                 sqlite_where=db.text('subject_id IS NULL'),
+                 postgresql_where=db.text('subject_id IS NULL')),
+        db.Index('ix_attendance_class_date', 'class_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -253,8 +305,60 @@ class Attendance(db.Model):
             'marked_at': self.marked_at.isoformat() if self.marked_at else None
         }
 
+class AttendanceSummary(db.Model):
+    """Monthly attendance rollup per student and class.
+
+    Maintained incrementally by the attendance write path and rebuildable
+    from Attendance, so percentages never need a scan of the raw marks.
+    """
+    __tablename__ = 'attendance_summaries'
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'class_id', 'month', name='uq_attendance_summary_student_class_month'),
+        db.Index('ix_attendance_summaries_class_month', 'class_id', 'month'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    present_count = db.Column(db.Integer, nullable=False, default=0)
+    absent_count = db.Column(db.Integer, nullable=False, default=0)
+    late_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Relationships
+    student = db.relationship('Student', backref='attendance_summaries')
+    class_assigned = db.relationship('Class', backref='attendance_summaries')
+    
+    @property
+    def total_count(self):
+        return self.present_count + self.absent_count + self.late_count
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'student_id': self.student_id,
+            'class_id': self.class_id,
+            'month': self.month,
+            'present_count': self.present_count,
+            'absent_count': self.absent_count,
+            'late_count': self.late_count,
+            'total_count': self.total_count,
+            'attendance_percentage': attendance_percentage(self.present_count, self.absent_count, self.late_count)
+        }
+
+def attendance_percentage(present, absent, late):
+    """Late counts as attended; None when nothing has been marked yet."""
+    total = present + absent + late
+    if not total:
+        return None
+    return round((present + late) * 100.0 / total, 2)
+
 class Assignment(db.Model):
     __tablename__ = 'assignments'
+    __table_args__ = (
+        db.Index('ix_assignments_teacher_id', 'teacher_id', 'id'),
+        db.Index('ix_assignments_class_due', 'class_id', 'due_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -286,6 +390,14 @@ class Assignment(db.Model):
 
 class AssignmentSubmission(db.Model):
     __tablename__ = 'assignment_submissions'
+    __table_args__ = (
+        # Grading queue: only ungraded rows are indexed, so the index stays
+        # small however many graded submissions pile up
+        db.Index('ix_assignment_submissions_ungraded', 'assignment_id', 'submitted_at', 'id',
+                 sqlite_where=db.text('graded_at IS NULL'),
+                 postgresql_where=db.text('graded_at IS NULL')),
+        db.Index('ix_assignment_submissions_student', 'student_id', 'assignment_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     assignment_id = db.Column(db.Integer, db.ForeignKey('assignments.id'), nullable=False)
@@ -319,6 +431,11 @@ class AssignmentSubmission(db.Model):
 
 class Fee(db.Model):
     __tablename__ = 'fees'
+    __table_args__ = (
+        # Outstanding dues per student and the monthly finance reports
+        db.Index('ix_fees_student_paid_due', 'student_id', 'is_paid', 'due_date'),
+        db.Index('ix_fees_year_month', 'academic_year_id', 'month'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -355,6 +472,10 @@ class Fee(db.Model):
 
 class Notice(db.Model):
     __tablename__ = 'notices'
+    __table_args__ = (
+        # Per-role notice feed: published notices for a target, newest first
+        db.Index('ix_notices_target_published_created', 'target_role', 'is_published', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -382,6 +503,10 @@ class Notice(db.Model):
 
 class Exam(db.Model):
     __tablename__ = 'exams'
+    __table_args__ = (
+        # Report cards load a class's exams for one term (exam_type)
+        db.Index('ix_exams_class_type', 'class_id', 'exam_type'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -413,6 +538,10 @@ class Exam(db.Model):
 
 class ExamResult(db.Model):
     __tablename__ = 'exam_results'
+    __table_args__ = (
+        # One result per student per exam; bulk ingestion upserts on this key
+        db.UniqueConstraint('exam_id', 'student_id', name='uq_exam_results_exam_student'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     exam_id = db.Column(db.Integer, db.ForeignKey('exams.id'), nullable=False)
@@ -7,9 +7,27 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.main import app
 from src.models.school import (
     db, User, UserRole, AcademicYear, Class, Subject, 
-    Teacher, Student, Parent, StudentParent
+    Teacher, Student, Parent, StudentParent, TeacherSubject,
+    Attendance, Fee, Exam, ExamResult
 )
-from datetime import date, datetime
+from src.utils.passwords import hash_password
+from src.routes.attendance import rebuild_attendance_summaries
+from datetime import date, datetime, timedelta
+import argparse
+import random
+import time
+
+SUBJECTS = [
+    ("Mathematics", "MATH", "Mathematics and Arithmetic"),
+    ("English", "ENG", "English Language and Literature"),
+    ("Science", "SCI", "General Science"),
+    ("Social Studies", "SS", "Social Studies and History"),
+    ("Urdu", "URD", "Urdu Language"),
+    ("Computer Science", "CS", "Computer Science and Programming"),
+    ("Physics", "PHY", "Physics"),
+    ("Chemistry", "CHEM", "Chemistry"),
+    ("Biology", "BIO", "Biology")
+]
 
 def seed_database():
     with app.app_context():
@@ -19,6 +37,10 @@ def seed_database():
         
         print("Seeding database with initial data...")
         
+        # Hash each distinct password once and share it across users
+        hashes = {password: hash_password(password) for password in
+                  ("admin123", "principal123", "teacher123", "student123", "parent123")}
+        
         # Create Academic Year
         academic_year = AcademicYear(
             name="2024-2025",
@@ -31,15 +53,8 @@ def seed_database():
         
         # Create Subjects
         subjects = [
-            Subject(name="Mathematics", code="MATH", description="Mathematics and Arithmetic"),
-            Subject(name="English", code="ENG", description="English Language and Literature"),
-            Subject(name="Science", code="SCI", description="General Science"),
-            Subject(name="Social Studies", code="SS", description="Social Studies and History"),
-            Subject(name="Urdu", code="URD", description="Urdu Language"),
-            Subject(name="Computer Science", code="CS", description="Computer Science and Programming"),
-            Subject(name="Physics", code="PHY", description="Physics"),
-            Subject(name="Chemistry", code="CHEM", description="Chemistry"),
-            Subject(name="Biology", code="BIO", description="Biology")
+            Subject(name=name, code=code, description=description)
+            for name, code, description in SUBJECTS
         ]
         
         for subject in subjects:
@@ -67,7 +82,7 @@ def seed_database():
             role=UserRole.ADMIN,
             is_active=True
         )
-        admin_user.set_password("admin123")
+        admin_user.password_hash = hashes["admin123"]
         db.session.add(admin_user)
         
         # Create Principal User
@@ -76,7 +91,7 @@ def seed_database():
             role=UserRole.PRINCIPAL,
             is_active=True
         )
-        principal_user.set_password("principal123")
+        principal_user.password_hash = hashes["principal123"]
         db.session.add(principal_user)
         
         db.session.flush()
@@ -98,7 +113,7 @@ def seed_database():
                 role=UserRole.TEACHER,
                 is_active=True
             )
-            user.set_password("teacher123")
+            user.password_hash = hashes["teacher123"]
             teacher_users.append(user)
             db.session.add(user)
             db.session.flush()
@@ -141,7 +156,7 @@ def seed_database():
                 role=UserRole.STUDENT,
                 is_active=True
             )
-            user.set_password("student123")
+            user.password_hash = hashes["student123"]
             student_users.append(user)
             db.session.add(user)
             db.session.flush()
@@ -180,7 +195,7 @@ def seed_database():
                 role=UserRole.PARENT,
                 is_active=True
             )
-            user.set_password("parent123")
+            user.password_hash = hashes["parent123"]
             parent_users.append(user)
             db.session.add(user)
             db.session.flush()
@@ -218,6 +233,240 @@ def seed_database():
         print("Student: student1@crestwoodacademy.edu.pk / student123")
         print("Parent: parent1@example.com / parent123")
 
+FIRST_NAMES = ["Muhammad", "Ayesha", "Hassan", "Zara", "Ali", "Fatima", "Ahmed", "Sana",
+               "Usman", "Hira", "Bilal", "Maryam", "Hamza", "Amna", "Omar", "Iqra"]
+LAST_NAMES = ["Ali", "Khan", "Ahmed", "Malik", "Hassan", "Qureshi", "Siddiqui", "Butt",
+              "Sheikh", "Raza", "Chaudhry", "Mirza"]
+MONTHS = ["April", "May", "June", "July", "August", "September", "October",
+          "November", "December", "January", "February", "March"]
+
+def _bulk_insert(model, rows, chunk_size=5000):
+    """executemany INSERT in chunks; bypasses the ORM unit of work entirely."""
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(model.__table__.insert(), rows[start:start + chunk_size])
+
+def _reset_sequences(models):
+    """Move PostgreSQL id sequences past ids that were inserted explicitly.
+
+    Without this the next insert that leaves id to the database gets 1 and
+    fails with a duplicate key. SQLite needs nothing: it takes max(id) + 1.
+    """
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    for model in models:
+        table = model.__table__.name
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}"
+        ))
+
+def seed_scale(student_count, days=120, students_per_class=40, random_seed=42):
+    """Generate a large synthetic school with bulk inserts.
+
+    Primary keys are assigned up front so related rows can be built without
+    flushing, and each distinct password is hashed exactly once. The id
+    sequences are moved past them at the end.
+    """
+    if days < 1:
+        raise ValueError("days must be at least 1")
+    rng = random.Random(random_seed)
+    started = time.perf_counter()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        print(f"Seeding synthetic school with {student_count} students...")
+
+        hashes = {password: hash_password(password) for password in
+                  ("admin123", "principal123", "teacher123", "student123", "parent123")}
+        now = datetime.utcnow()
+        year_start = date(2024, 4, 1)
+
+        db.session.execute(AcademicYear.__table__.insert(), [{
+            "id": 1, "name": "2024-2025", "start_date": year_start,
+            "end_date": date(2025, 3, 31), "is_current": True
+        }])
+        _bulk_insert(Subject, [
+            {"id": i + 1, "name": name, "code": code, "description": description}
+            for i, (name, code, description) in enumerate(SUBJECTS)
+        ])
+        subject_ids = list(range(1, len(SUBJECTS) + 1))
+
+        users = [
+            {"id": 1, "email": "admin@crestwoodacademy.edu.pk", "password_hash": hashes["admin123"],
+             "role": UserRole.ADMIN, "is_active": True, "created_at": now, "updated_at": now},
+            {"id": 2, "email": "principal@crestwoodacademy.edu.pk", "password_hash": hashes["principal123"],
+             "role": UserRole.PRINCIPAL, "is_active": True, "created_at": now, "updated_at": now},
+        ]
+
+        def add_user(email, role, password):
+            user_id = len(users) + 1
+            users.append({"id": user_id, "email": email, "password_hash": hashes[password],
+                          "role": role, "is_active": True, "created_at": now, "updated_at": now})
+            return user_id
+
+        # Classes: 12 grades with enough sections to hold students_per_class each
+        sections_per_grade = max(2, -(-student_count // (12 * students_per_class)))
+        class_count = 12 * sections_per_grade
+        teacher_count = class_count + len(SUBJECTS)
+
+        teachers = []
+        for i in range(teacher_count):
+            user_id = add_user(f"teacher{i + 1}@crestwoodacademy.edu.pk", UserRole.TEACHER, "teacher123")
+            teachers.append({
+                "id": i + 1, "user_id": user_id, "employee_id": f"TEA{i + 1:06d}",
+                "first_name": rng.choice(FIRST_NAMES), "last_name": rng.choice(LAST_NAMES),
+                "phone": f"+92 300 {rng.randint(1000000, 9999999)}", "address": "Karachi, Pakistan",
+                "hire_date": date(2015 + rng.randint(0, 9), 1, 1), "qualification": "M.Sc"
+            })
+
+        classes = []
+        for grade in range(1, 13):
+            for section in range(sections_per_grade):
+                class_id = len(classes) + 1
+                classes.append({
+                    "id": class_id, "name": f"Grade {grade}", "section": chr(ord("A") + section),
+                    "academic_year_id": 1, "class_teacher_id": class_id
+                })
+
+        # Round-robin subject assignments keep every teacher's weekly load even
+        teacher_subjects = []
+        for class_row in classes:
+            for subject_id in subject_ids:
+                teacher_subjects.append({
+                    "id": len(teacher_subjects) + 1,
+                    "teacher_id": len(teacher_subjects) % teacher_count + 1,
+                    "subject_id": subject_id,
+                    "class_id": class_row["id"]
+                })
+
+        # Students arrive in families of one to three siblings sharing parents
+        students, parents, links = [], [], []
+        while len(students) < student_count:
+            family_name = rng.choice(LAST_NAMES)
+            family_parents = []
+            for relationship in rng.sample(["father", "mother"], rng.choice((1, 2))):
+                parent_id = len(parents) + 1
+                user_id = add_user(f"parent{parent_id}@example.com", UserRole.PARENT, "parent123")
+                parents.append({
+                    "id": parent_id, "user_id": user_id, "first_name": rng.choice(FIRST_NAMES),
+                    "last_name": family_name, "phone": f"+92 300 {rng.randint(1000000, 9999999)}",
+                    "address": "Karachi, Pakistan", "occupation": rng.choice(["Engineer", "Doctor", "Teacher", "Lawyer"])
+                })
+                family_parents.append((parent_id, relationship))
+
+            for _ in range(min(rng.choice((1, 1, 2, 3)), student_count - len(students))):
+                student_id = len(students) + 1
+                user_id = add_user(f"student{student_id}@crestwoodacademy.edu.pk", UserRole.STUDENT, "student123")
+                class_id = (student_id - 1) % class_count + 1
+                grade = (class_id - 1) // sections_per_grade + 1
+                students.append({
+                    "id": student_id, "user_id": user_id, "student_id": f"STU{student_id:06d}",
+                    "first_name": rng.choice(FIRST_NAMES), "last_name": family_name,
+                    "date_of_birth": date(2019 - grade, rng.randint(1, 12), rng.randint(1, 28)),
+                    "gender": rng.choice(["Male", "Female"]), "phone": None, "address": "Karachi, Pakistan",
+                    "admission_date": year_start, "class_id": class_id
+                })
+                for parent_id, relationship in family_parents:
+                    links.append({"id": len(links) + 1, "student_id": student_id,
+                                  "parent_id": parent_id, "relationship": relationship})
+
+        _bulk_insert(User, users)
+        _bulk_insert(Teacher, teachers)
+        _bulk_insert(Class, classes)
+        _bulk_insert(TeacherSubject, teacher_subjects)
+        _bulk_insert(Student, students)
+        _bulk_insert(Parent, parents)
+        _bulk_insert(StudentParent, links)
+
+        # Daily attendance for the first school days of the year (Mon-Fri)
+        school_days = []
+        day = year_start
+        while len(school_days) < days:
+            if day.weekday() < 5:
+                school_days.append(day)
+            day += timedelta(days=1)
+
+        attendance = []
+        for school_day in school_days:
+            marked_at = datetime.combine(school_day, datetime.min.time()) + timedelta(hours=8)
+            for student in students:
+                roll = rng.random()
+                attendance.append({
+                    "student_id": student["id"], "class_id": student["class_id"], "subject_id": None,
+                    "date": school_day, "status": "present" if roll < 0.9 else "absent" if roll < 0.96 else "late",
+                    "marked_by": student["class_id"], "marked_at": marked_at
+                })
+            if len(attendance) >= 50000:
+                _bulk_insert(Attendance, attendance)
+                attendance = []
+        _bulk_insert(Attendance, attendance)
+        rebuild_attendance_summaries()
+
+        # Monthly tuition fees up to the last seeded school day
+        fees = []
+        months_elapsed = min(12, (school_days[-1].year - year_start.year) * 12 + school_days[-1].month - year_start.month + 1)
+        for student in students:
+            for month_index in range(months_elapsed):
+                due = date(year_start.year + (year_start.month + month_index - 1) // 12,
+                           (year_start.month + month_index - 1) % 12 + 1, 10)
+                paid = rng.random() < 0.85
+                fees.append({
+                    "student_id": student["id"], "fee_type": "tuition", "amount": 5000,
+                    "due_date": due, "academic_year_id": 1, "month": MONTHS[month_index],
+                    "is_paid": paid, "paid_amount": 5000 if paid else 0,
+                    "payment_date": due if paid else None,
+                    "payment_method": rng.choice(["jazzcash", "easypaisa", "bank", "cash"]) if paid else None,
+                    "transaction_id": None
+                })
+        _bulk_insert(Fee, fees)
+
+        # Midterm exam per class and subject, with a result for every student
+        exams = []
+        exam_by_class = {}
+        for assignment in teacher_subjects:
+            exam_id = len(exams) + 1
+            exams.append({
+                "id": exam_id, "name": "Midterm", "exam_type": "midterm",
+                "subject_id": assignment["subject_id"], "class_id": assignment["class_id"],
+                "exam_date": datetime(2024, 9, 15, 9), "duration_minutes": 120,
+                "max_marks": 100, "created_by": assignment["teacher_id"]
+            })
+            exam_by_class.setdefault(assignment["class_id"], []).append(exam_id)
+        _bulk_insert(Exam, exams)
+
+        results = []
+        for student in students:
+            for exam_id in exam_by_class[student["class_id"]]:
+                marks = max(0, min(100, int(rng.gauss(68, 15))))
+                grade = "A" if marks >= 80 else "B" if marks >= 70 else "C" if marks >= 60 else "D" if marks >= 50 else "F"
+                results.append({"exam_id": exam_id, "student_id": student["id"],
+                                "marks_obtained": marks, "grade": grade, "remarks": None})
+        _bulk_insert(ExamResult, results)
+
+        _reset_sequences([AcademicYear, Subject, User, Teacher, Class, TeacherSubject,
+                          Student, Parent, StudentParent, Exam])
+        db.session.commit()
+
+        print(f"Seeded {len(users)} users, {len(students)} students, {len(parents)} parents, "
+              f"{len(classes)} classes, {len(school_days) * len(students)} attendance rows, "
+              f"{len(fees)} fees and {len(results)} exam results "
+              f"in {time.perf_counter() - started:.1f}s")
+        print("Passwords: admin123 / principal123 / teacher123 / student123 / parent123")
+
 if __name__ == "__main__":
-    seed_database()
+    parser = argparse.ArgumentParser(description="Seed the school database")
+    parser.add_argument("--scale", type=int, metavar="STUDENTS",
+                        help="generate a synthetic school with this many students using bulk inserts")
+    parser.add_argument("--days", type=int, default=120, help="school days of attendance history (with --scale)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for --scale")
+    args = parser.parse_args()
+    if args.days < 1:
+        parser.error("--days must be at least 1")
+
+    if args.scale:
+        seed_scale(args.scale, days=args.days, random_seed=args.seed)
+    else:
+        seed_database()
 
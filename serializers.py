@@ -0,0 +1,80 @@
+from flask import current_app, jsonify, Response
+from sqlalchemy.orm import load_only
+import sqlalchemy as sa
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+_compiled = {}
+
+def _field_expression(column, attr):
+    """Python source converting one attribute, matching the models' to_dict."""
+    # Read loaded values straight from the instance dict, skipping the
+    # instrumented descriptor; fall back to it for expired/deferred columns
+    value = f'(d[{attr!r}] if {attr!r} in d else o.{attr})'
+    if isinstance(column.type, (sa.Date, sa.DateTime)):
+        return f'(v.isoformat() if (v := {value}) is not None else None)'
+    if isinstance(column.type, sa.Enum) and column.type.enum_class is not None:
+        return f'(v.value if (v := {value}) is not None else None)'
+    if isinstance(column.type, sa.Numeric) and not isinstance(column.type, (sa.Integer, sa.Float)):
+        return f'(float(v) if (v := {value}) is not None else None)'
+    return value
+
+def default_fields(model):
+    exclude = getattr(model, 'serialize_exclude', ())
+    return tuple(c.key for c in model.__mapper__.column_attrs if c.key not in exclude)
+
+def compile_serializer(model, fields=None):
+    """Build (once) a function turning a model instance into a dict.
+
+    The function body is generated from column metadata, so there is no
+    per-row type dispatch: each field is a single inlined expression.
+    """
+    fields = tuple(fields) if fields else default_fields(model)
+    key = (model, fields)
+    if key not in _compiled:
+        columns = {c.key: c.columns[0] for c in model.__mapper__.column_attrs}
+        unknown = [name for name in fields if name not in columns]
+        if unknown:
+            raise ValueError(f'Unknown field(s): {", ".join(unknown)}')
+        body = ', '.join(f'{name!r}: {_field_expression(columns[name], name)}' for name in fields)
+        source = f'def serialize(o):\n    d = o.__dict__\n    return {{{body}}}\n'
+        namespace = {}
+        exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+        _compiled[key] = namespace['serialize']
+    return _compiled[key]
+
+def parse_fields(model, value):
+    """Parse a ?fields=a,b sparse fieldset against the model's default fields.
+
+    Returns None when no fieldset was requested; raises ValueError for
+    fields that are unknown or not exposed.
+    """
+    if not value:
+        return None
+    allowed = set(default_fields(model))
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f'Unknown field(s): {", ".join(unknown)}')
+    return fields
+
+def project(query, model, fields):
+    """Only load the requested columns (plus the primary key)."""
+    if not fields:
+        return query
+    return query.options(load_only(*(getattr(model, name) for name in fields)))
+
+def serialize_all(model, objects, fields=None):
+    serialize = compile_serializer(model, fields)
+    return [serialize(obj) for obj in objects]
+
+def json_response(payload, status=200):
+    """jsonify, or orjson when available and FAST_JSON is enabled."""
+    if orjson is not None and current_app.config.get('FAST_JSON', True):
+        return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+    response = jsonify(payload)
+    response.status_code = status
+    return response
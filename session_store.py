@@ -0,0 +1,266 @@
+"""Server-side sessions with revocation and sliding expiry.
+
+The session cookie carries only a random id; the data lives in a store
+keyed by the id's SHA-256, so a leaked store does not hand out live
+cookies. Every store also indexes sessions by user id, which is what lets
+logout-everywhere and account deactivation end sessions in all workers.
+
+SESSION_STORE_URL picks the backend:
+
+    memory://                   per process; tests and single-worker runs
+    sqlite:///path/sessions.db  shared by every worker on one host (default,
+                                under the instance folder)
+    redis://host:6379/0         shared between hosts
+
+None of them touch the application database. Expiry slides: each request
+pushes it PERMANENT_SESSION_LIFETIME into the future, but the store is
+only rewritten when the session changed or its expiry is more than
+SESSION_REFRESH_EVERY seconds (default 300) old, so the common request
+is a single keyed read.
+"""
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from werkzeug.datastructures import CallbackDict
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # optional, only needed for sessions shared between hosts
+    redis = None
+
+# Expired entries are swept once every this many writes
+SWEEP_EVERY = 1000
+
+class MemorySessionStore:
+    def __init__(self):
+        self._sessions = {}
+        self._by_user = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key):
+        """(data, expires_at) for key, or None when missing or expired."""
+        entry = self._sessions.get(key)
+        if entry is None or entry[2] < time.time():
+            return None
+        return entry[0], entry[2]
+
+    def set(self, key, data, user_id, expires_at):
+        with self._lock:
+            self._sessions[key] = (data, user_id, expires_at)
+            if user_id is not None:
+                self._by_user.setdefault(user_id, set()).add(key)
+            self._writes += 1
+            if self._writes % SWEEP_EVERY == 0:
+                now = time.time()
+                for expired in [k for k, entry in self._sessions.items() if entry[2] < now]:
+                    self._discard(expired)
+
+    def _discard(self, key):
+        entry = self._sessions.pop(key, None)
+        if entry is not None and entry[1] is not None:
+            keys = self._by_user.get(entry[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry[1]]
+
+    def delete(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def revoke_user(self, user_id, keep=None):
+        """Delete every session of user_id except keep; returns how many went."""
+        with self._lock:
+            keys = [key for key in self._by_user.get(user_id, ()) if key != keep]
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+class SqliteSessionStore:
+    """One SQLite file per host; a single locked connection per process."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'key TEXT PRIMARY KEY, user_id INTEGER, data TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id)')
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT data, expires_at FROM sessions WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0], row[1]
+
+    def set(self, key, data, user_id, expires_at):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sessions (key, user_id, data, expires_at) VALUES (?, ?, ?, ?)',
+                (key, user_id, data, expires_at)
+            )
+            self._writes += 1
+            if self._writes % SWEEP_EVERY == 0:
+                self._conn.execute('DELETE FROM sessions WHERE expires_at < ?', (time.time(),))
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM sessions WHERE key = ?', (key,))
+
+    def revoke_user(self, user_id, keep=None):
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM sessions WHERE user_id = ? AND key IS NOT ?', (user_id, keep))
+            return cursor.rowcount
+
+class RedisSessionStore:
+    """Sessions as expiring strings plus a set of session keys per user."""
+
+    def __init__(self, url, prefix='session'):
+        if redis is None:
+            raise RuntimeError('redis is not installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(f'{self.prefix}:{key}')
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry['data'], entry['expires_at']
+
+    def set(self, key, data, user_id, expires_at):
+        ttl = max(1, int(expires_at - time.time()) + 1)
+        pipe = self.client.pipeline()
+        pipe.set(f'{self.prefix}:{key}', json.dumps({'data': data, 'expires_at': expires_at}), ex=ttl)
+        if user_id is not None:
+            # The index outlives any one session; members whose key expired are harmless
+            pipe.sadd(f'{self.prefix}:user:{user_id}', key)
+            pipe.expire(f'{self.prefix}:user:{user_id}', ttl)
+        pipe.execute()
+
+    def delete(self, key):
+        self.client.delete(f'{self.prefix}:{key}')
+
+    def revoke_user(self, user_id, keep=None):
+        index = f'{self.prefix}:user:{user_id}'
+        keys = [member.decode() for member in self.client.smembers(index)]
+        doomed = [key for key in keys if key != keep]
+        pipe = self.client.pipeline()
+        for key in doomed:
+            pipe.delete(f'{self.prefix}:{key}')
+            pipe.srem(index, key)
+        results = pipe.execute()
+        return sum(results[::2])
+
+_store_lock = threading.Lock()
+
+def session_store(app):
+    """The app's session store, created from SESSION_STORE_URL on first use."""
+    store = app.extensions.get('session_store')
+    if store is None:
+        with _store_lock:
+            store = app.extensions.get('session_store')
+            if store is None:
+                url = app.config.get('SESSION_STORE_URL') or 'sqlite:///' + os.path.join(app.instance_path, 'sessions.db')
+                if url.startswith('memory://'):
+                    store = MemorySessionStore()
+                elif url.startswith('sqlite:///'):
+                    store = SqliteSessionStore(url[len('sqlite:///'):])
+                else:
+                    store = RedisSessionStore(url)
+                app.extensions['session_store'] = store
+    return store
+
+def session_key(sid):
+    return hashlib.sha256(sid.encode()).hexdigest()
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = sid is None
+        self.modified = False
+        # A different user_id at save time means login/logout: rotate the id
+        self.loaded_user_id = self.get('user_id')
+
+class ServerSideSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            entry = session_store(app).get(session_key(sid))
+            if entry is not None:
+                data, expires_at = entry
+                return ServerSession(self.serializer.loads(data), sid=sid, expires_at=expires_at)
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        store = session_store(app)
+
+        if not session:
+            if session.sid is not None:
+                store.delete(session_key(session.sid))
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        response.vary.add('Cookie')
+
+        now = time.time()
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        user_id = session.get('user_id')
+        rotated = session.sid is None or user_id != session.loaded_user_id
+        if rotated:
+            # Fresh id for new sessions and whenever the user changes, so an
+            # id planted before login is worthless afterwards
+            if session.sid is not None:
+                store.delete(session_key(session.sid))
+            session.sid = secrets.token_urlsafe(32)
+            session.loaded_user_id = user_id
+
+        refresh_every = app.config.get('SESSION_REFRESH_EVERY', 300)
+        stale = session.expires_at is None or session.expires_at - now < lifetime - refresh_every
+        if not (rotated or session.modified or stale):
+            return
+
+        session.expires_at = now + lifetime
+        store.set(session_key(session.sid), self.serializer.dumps(dict(session)), user_id, session.expires_at)
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=datetime.fromtimestamp(session.expires_at, timezone.utc),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+def revoke_user_sessions(app, user_id, keep=None):
+    """End every session of user_id in all workers, except the session keep.
+
+    Returns the number of sessions removed.
+    """
+    keep_sid = getattr(keep, 'sid', None)
+    return session_store(app).revoke_user(user_id, keep=session_key(keep_sid) if keep_sid else None)
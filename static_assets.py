@@ -0,0 +1,194 @@
+from flask import current_app, request, send_file, abort
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:  # optional, only needed to precompress .br files
+    brotli = None
+
+# Fallback for builds without a manifest: a content hash right before the
+# extension, as in index-B-3x9aZ_.js (Vite, 8 base64url characters),
+# main.3f9a2c1b.chunk.js (CRA) or app.5d41402abc4b2a76.css (webpack hex).
+# The hash must contain a digit so names like app.settings.json or
+# logo-original.svg are not taken for one.
+FINGERPRINT = re.compile(r'[.-](?=[A-Za-z_-]*[0-9])(?:[A-Za-z0-9_-]{8}|[0-9a-f]{8,32})(?:\.chunk)?\.[A-Za-z0-9]+$')
+
+# Build manifests listing the hashed files: Vite 5, Vite 4 and CRA
+MANIFESTS = ('.vite/manifest.json', 'manifest.json', 'asset-manifest.json')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+DEFAULT_MAX_AGE = 300
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+class StaticIndex:
+    """In-memory index of a built frontend (dist) directory.
+
+    The directory is walked once; each file's ETag, cache policy and any
+    precompressed .br/.gz siblings are recorded so serving a request never
+    touches the filesystem beyond opening the chosen file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _root(self):
+        return os.path.join(current_app.root_path, self.directory)
+
+    def _manifest_files(self, root):
+        """Hashed files named by the bundler's manifest, or None without one.
+
+        The set holds every '/'-prefixed tail of each listed path, so a
+        file matches whatever public URL the paths were built with. A
+        manifest.json that is not a Vite manifest (e.g. a PWA web
+        manifest) is ignored.
+        """
+        files = set()
+        found = False
+        for name in MANIFESTS:
+            try:
+                with open(os.path.join(root, name)) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(manifest, dict):
+                continue
+            if name == 'asset-manifest.json':
+                listed = manifest.get('files')
+                if isinstance(listed, dict):
+                    found = True
+                    files.update(path for path in listed.values() if isinstance(path, str))
+            elif manifest and all(isinstance(chunk, dict) and 'file' in chunk for chunk in manifest.values()):
+                found = True
+                for chunk in manifest.values():
+                    files.add(chunk['file'])
+                    files.update(chunk.get('css', ()))
+                    files.update(chunk.get('assets', ()))
+        if not found:
+            return None
+        # CRA paths carry the public URL, e.g. /student/static/js/main.3f9a2c1b.js
+        tails = set()
+        for path in files:
+            if not path.endswith('.html'):
+                path = '/' + path.lstrip('/')
+                tails.update(path[i:] for i, char in enumerate(path) if char == '/')
+        return tails
+
+    def _scan(self):
+        root = self._root()
+        hashed = self._manifest_files(root)
+        entries = {}
+        for dirpath, _, filenames in os.walk(root):
+            names = set(filenames)
+            for name in filenames:
+                if name.endswith(('.br', '.gz')) and name[:-3] in names:
+                    continue
+                path = os.path.join(dirpath, name)
+                rel = os.path.relpath(path, root).replace(os.sep, '/')
+                stat = os.stat(path)
+                with open(path, 'rb') as f:
+                    digest = hashlib.blake2b(f.read(), digest_size=12).hexdigest()
+                entries[rel] = {
+                    'path': path,
+                    'etag': digest,
+                    'mimetype': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                    'immutable': not name.endswith('.html') and (
+                        '/' + rel in hashed if hashed is not None else bool(FINGERPRINT.search(name))
+                    ),
+                    'mtime': stat.st_mtime,
+                    'variants': {
+                        encoding: path + suffix
+                        for encoding, suffix in ENCODINGS
+                        if name + suffix in names
+                    }
+                }
+        return entries
+
+    def entries(self):
+        if self._entries is None or current_app.debug:
+            with self._lock:
+                if self._entries is None or current_app.debug:
+                    self._entries = self._scan()
+        return self._entries
+
+    def serve(self, filename):
+        entry = self.entries().get(filename)
+        if entry is None:
+            abort(404)
+
+        path = entry['path']
+        etag = entry['etag']
+        encoding = None
+        for candidate, _ in ENCODINGS:
+            if candidate in entry['variants'] and request.accept_encodings[candidate] > 0:
+                encoding = candidate
+                path = entry['variants'][candidate]
+                etag = f'{etag}-{candidate}'
+                break
+
+        response = send_file(
+            path,
+            mimetype=entry['mimetype'],
+            download_name=os.path.basename(entry['path']),
+            etag=etag,
+            last_modified=entry['mtime'],
+            conditional=True,
+            max_age=None
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry['variants']:
+            response.vary.add('Accept-Encoding')
+
+        # Fingerprinted assets never change under the same URL; everything
+        # else (notably index.html) must be revalidated so deploys show up
+        response.cache_control.no_cache = None
+        if entry['immutable']:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        elif filename.endswith('.html'):
+            response.cache_control.no_cache = True
+        else:
+            response.cache_control.public = True
+            response.cache_control.max_age = DEFAULT_MAX_AGE
+            response.cache_control.must_revalidate = True
+        return response
+
+def precompress(directory, min_size=1024, extensions=('.js', '.css', '.html', '.svg', '.json', '.txt', '.map')):
+    """Write .gz (and .br when brotli is installed) next to compressible files.
+
+    Meant to run after the frontend build; returns the number of files written.
+    """
+    written = 0
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            if not name.endswith(extensions):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            with open(path + '.gz', 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            written += 1
+            if brotli is not None:
+                with open(path + '.br', 'wb') as f:
+                    f.write(brotli.compress(data, quality=11))
+                written += 1
+    return written
+
+if __name__ == '__main__':
+    import sys
+    for directory in sys.argv[1:]:
+        print(f'{directory}: {precompress(directory)} files written')
@@ -0,0 +1,75 @@
+from flask import Response, stream_with_context
+from datetime import date, datetime
+from decimal import Decimal
+import csv
+import enum
+import io
+import json
+
+# Flush the response once this many bytes are buffered
+CHUNK_SIZE = 64 * 1024
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def _csv_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def iter_csv(columns, rows):
+    """Yield CSV text in CHUNK_SIZE pieces; only one chunk is held at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_ndjson(columns, rows):
+    """Yield newline-delimited JSON objects in CHUNK_SIZE pieces."""
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps({column: _json_value(value) for column, value in zip(columns, row)}, separators=(',', ':'))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+            size = 0
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
+
+def stream_rows(columns, rows, fmt='csv', filename=None):
+    """Chunked response streaming rows (tuples matching columns) as CSV or NDJSON.
+
+    rows should be a lazily-evaluated query (e.g. with yield_per) so nothing
+    is materialised; the request context is kept alive while streaming.
+    """
+    serializer, mimetype = FORMATS[fmt]
+    headers = {}
+    if filename:
+        headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return Response(
+        stream_with_context(serializer(columns, rows)),
+        mimetype=mimetype,
+        headers=headers
+    )
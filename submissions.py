@@ -0,0 +1,167 @@
+from flask import Blueprint, request, jsonify, session
+from sqlalchemy import bindparam
+from src.models.school import db, UserRole, Teacher, Student, Assignment, AssignmentSubmission
+from src.routes.auth import role_required, get_principal
+from src.utils.pagination import keyset_page, InvalidCursor
+from src.utils.grading import parse_marks
+from datetime import datetime
+
+submissions_bp = Blueprint('submissions', __name__)
+
+QUEUE_SORT_KEY = [AssignmentSubmission.submitted_at, AssignmentSubmission.id]
+QUEUE_MAX_LIMIT = 200
+
+def _grading_teacher_id():
+    """Teachers grade as themselves; admins and principals name a teacher_id."""
+    role, _ = get_principal(session['user_id'])
+    if role == UserRole.TEACHER:
+        return db.session.query(Teacher.id).filter_by(user_id=session['user_id']).scalar()
+    data = request.get_json(silent=True) or {}
+    return request.args.get('teacher_id', type=int) or data.get('teacher_id')
+
+@submissions_bp.route('/queue', methods=['GET'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def get_grading_queue():
+    """Ungraded submissions for a teacher's assignments, oldest first."""
+    try:
+        teacher_id = _grading_teacher_id()
+        if not teacher_id:
+            return jsonify({'error': 'teacher_id is required'}), 400
+
+        limit = request.args.get('limit', 50, type=int)
+        if limit < 1:
+            return jsonify({'error': 'limit must be at least 1'}), 400
+        limit = min(limit, QUEUE_MAX_LIMIT)
+        query = db.session.query(
+            AssignmentSubmission.id,
+            AssignmentSubmission.submitted_at,
+            AssignmentSubmission.assignment_id,
+            AssignmentSubmission.student_id,
+            AssignmentSubmission.submission_text,
+            AssignmentSubmission.file_path,
+            Assignment.title.label('assignment_title'),
+            Assignment.max_marks,
+            Assignment.class_id,
+            Student.first_name,
+            Student.last_name
+        ).join(
+            Assignment, AssignmentSubmission.assignment_id == Assignment.id
+        ).join(
+            Student, AssignmentSubmission.student_id == Student.id
+        ).filter(
+            Assignment.teacher_id == teacher_id,
+            AssignmentSubmission.graded_at.is_(None)
+        )
+        assignment_id = request.args.get('assignment_id', type=int)
+        if assignment_id:
+            query = query.filter(AssignmentSubmission.assignment_id == assignment_id)
+
+        try:
+            rows, next_cursor = keyset_page(
+                query,
+                QUEUE_SORT_KEY,
+                cursor=request.args.get('cursor'),
+                limit=limit,
+                max_limit=QUEUE_MAX_LIMIT,
+                serializers={'submitted_at': lambda v: v.isoformat() if v else None},
+                parsers={'submitted_at': lambda v: datetime.fromisoformat(v) if v else None}
+            )
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'teacher_id': teacher_id,
+            'submissions': [
+                {
+                    'id': row.id,
+                    'assignment_id': row.assignment_id,
+                    'assignment_title': row.assignment_title,
+                    'max_marks': row.max_marks,
+                    'class_id': row.class_id,
+                    'student_id': row.student_id,
+                    'student_name': f'{row.first_name} {row.last_name}',
+                    'submission_text': row.submission_text,
+                    'file_path': row.file_path,
+                    'submitted_at': row.submitted_at.isoformat() if row.submitted_at else None
+                }
+                for row in rows
+            ],
+            'next_cursor': next_cursor
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@submissions_bp.route('/grade', methods=['POST'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL, UserRole.TEACHER])
+def grade_submissions():
+    """Record marks and feedback for many submissions in one transaction.
+
+    Either every grade is applied or, if any row is invalid, none are and
+    the errors are returned together.
+    """
+    try:
+        teacher_id = _grading_teacher_id()
+        if not teacher_id:
+            return jsonify({'error': 'teacher_id is required'}), 400
+
+        grades = (request.get_json() or {}).get('grades')
+        if not isinstance(grades, list) or not grades:
+            return jsonify({'error': 'grades must be a non-empty list of {submission_id, marks_obtained, feedback}'}), 400
+
+        errors = []
+        parsed = {}
+        for number, grade in enumerate(grades, start=1):
+            try:
+                submission_id = int(grade['submission_id'])
+                marks = parse_marks(grade['marks_obtained'])
+            except (KeyError, TypeError, ValueError):
+                errors.append({'row': number, 'error': 'submission_id and marks_obtained must be whole numbers'})
+                continue
+            if submission_id in parsed:
+                errors.append({'row': number, 'submission_id': submission_id, 'error': 'Duplicate submission'})
+                continue
+            parsed[submission_id] = (number, marks, grade.get('feedback'))
+
+        # One lookup checks ownership and max marks for the whole batch
+        max_marks = dict(db.session.query(AssignmentSubmission.id, Assignment.max_marks).join(
+            Assignment, AssignmentSubmission.assignment_id == Assignment.id
+        ).filter(
+            AssignmentSubmission.id.in_(parsed),
+            Assignment.teacher_id == teacher_id
+        ).all()) if parsed else {}
+
+        for submission_id, (number, marks, _) in parsed.items():
+            if submission_id not in max_marks:
+                errors.append({'row': number, 'submission_id': submission_id, 'error': 'Submission not found for this teacher'})
+            elif marks < 0 or (max_marks[submission_id] is not None and marks > max_marks[submission_id]):
+                errors.append({'row': number, 'submission_id': submission_id,
+                               'error': f'marks_obtained must be between 0 and {max_marks[submission_id]}'})
+        if errors:
+            return jsonify({'error': 'Invalid grades', 'errors': sorted(errors, key=lambda e: e['row'])}), 400
+
+        graded_at = datetime.utcnow()
+        table = AssignmentSubmission.__table__
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('submission_id')).values(
+                marks_obtained=bindparam('marks'),
+                feedback=bindparam('feedback_text'),
+                graded_by=teacher_id,
+                graded_at=graded_at
+            ),
+            [
+                {'submission_id': submission_id, 'marks': marks, 'feedback_text': feedback}
+                for submission_id, (_, marks, feedback) in parsed.items()
+            ]
+        )
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Submissions graded successfully',
+            'graded': len(parsed),
+            'graded_at': graded_at.isoformat()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,196 @@
+from flask import Blueprint, request, jsonify
+from src.models.school import db, UserRole, TeacherSubject, TimetableSlot
+from src.routes.auth import login_required, role_required
+from src.utils.scheduler import Timetable, Lesson, build_lessons
+import time
+
+timetable_bp = Blueprint('timetable', __name__)
+
+DEFAULT_DAYS = 5
+DEFAULT_PERIODS_PER_DAY = 8
+DEFAULT_PERIODS_PER_WEEK = 4
+
+def _solver_options(data):
+    """Timetable constructor kwargs plus per-subject periods and rooms.
+
+    JSON object keys arrive as strings, so ids are converted back to int.
+    """
+    timetable_kwargs = {
+        'days': data.get('days', DEFAULT_DAYS),
+        'periods_per_day': data.get('periods_per_day', DEFAULT_PERIODS_PER_DAY),
+        'teacher_unavailable': {
+            int(teacher_id): [tuple(slot) for slot in slots]
+            for teacher_id, slots in data.get('teacher_unavailable', {}).items()
+        },
+        'room_capacity': data.get('room_capacity', {})
+    }
+    periods_per_week = {int(k): v for k, v in data.get('periods_per_week', {}).items()}
+    rooms = {int(k): v for k, v in data.get('rooms', {}).items()}
+    return timetable_kwargs, periods_per_week, rooms
+
+def _slot_rows(timetable, keys=None):
+    return [
+        {
+            'class_id': lesson.class_id,
+            'subject_id': lesson.subject_id,
+            'teacher_id': lesson.teacher_id,
+            'day': day,
+            'period': period,
+            'room': lesson.room
+        }
+        for lesson, day, period in timetable.entries()
+        if keys is None or lesson.key in keys
+    ]
+
+def _unplaced_dicts(unplaced):
+    return [
+        {'class_id': l.class_id, 'subject_id': l.subject_id, 'teacher_id': l.teacher_id}
+        for l in unplaced
+    ]
+
+@timetable_bp.route('/generate', methods=['POST'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL])
+def generate_timetable():
+    try:
+        data = request.get_json() or {}
+        timetable_kwargs, periods_per_week, rooms = _solver_options(data)
+
+        assignments = db.session.query(
+            TeacherSubject.class_id, TeacherSubject.subject_id, TeacherSubject.teacher_id
+        ).all()
+        lessons = build_lessons(assignments, periods_per_week, data.get('default_periods', DEFAULT_PERIODS_PER_WEEK), rooms)
+
+        timetable = Timetable(**timetable_kwargs)
+        problems = timetable.capacity_problems(lessons)
+        if problems:
+            return jsonify({'error': 'Timetable is infeasible', 'problems': problems}), 422
+
+        started = time.perf_counter()
+        unplaced = timetable.solve(lessons)
+        elapsed = time.perf_counter() - started
+
+        # Replace the whole timetable in one transaction
+        db.session.query(TimetableSlot).delete()
+        rows = _slot_rows(timetable)
+        if rows:
+            db.session.execute(TimetableSlot.__table__.insert(), rows)
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Timetable generated',
+            'lessons': len(lessons),
+            'placed': len(timetable.placement),
+            'unplaced': _unplaced_dicts(unplaced),
+            'solve_ms': round(elapsed * 1000, 1)
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@timetable_bp.route('/resolve', methods=['POST'])
+@role_required([UserRole.ADMIN, UserRole.PRINCIPAL])
+def resolve_timetable():
+    """Re-place only the lessons of one changed TeacherSubject assignment."""
+    try:
+        data = request.get_json() or {}
+        if 'teacher_subject_id' not in data:
+            return jsonify({'error': 'teacher_subject_id is required'}), 400
+
+        assignment = TeacherSubject.query.get(data['teacher_subject_id'])
+        if not assignment:
+            return jsonify({'error': 'Assignment not found'}), 404
+
+        timetable_kwargs, periods_per_week, rooms = _solver_options(data)
+        timetable = Timetable(**timetable_kwargs)
+
+        # Rebuild solver state from the stored timetable, keeping every slot fixed
+        existing = {}
+        fixed = {}
+        counters = {}
+        for slot in TimetableSlot.query.order_by(TimetableSlot.id):
+            owner = (slot.class_id, slot.subject_id, slot.teacher_id)
+            n = counters.get(owner, 0)
+            counters[owner] = n + 1
+            lesson = Lesson(owner + (n,), slot.class_id, slot.subject_id, slot.teacher_id, slot.room)
+            existing[lesson.key] = (lesson, slot.day, slot.period)
+            fixed[lesson.key] = timetable.slot(slot.day, slot.period)
+        timetable.solve([lesson for lesson, _, _ in existing.values()], fixed=fixed)
+
+        # The assignment's slots are those of its class and subject that no
+        # other assignment of the pair accounts for; its teacher may have changed
+        pair = (assignment.class_id, assignment.subject_id)
+        other_teachers = {teacher_id for teacher_id, in db.session.query(TeacherSubject.teacher_id).filter(
+            TeacherSubject.class_id == assignment.class_id,
+            TeacherSubject.subject_id == assignment.subject_id,
+            TeacherSubject.id != assignment.id
+        )} - {assignment.teacher_id}
+        old_keys = [key for key in existing if key[:2] == pair and key[2] not in other_teachers]
+        kept = {}
+        for key in set(existing) - set(old_keys):
+            if key[:2] == pair:
+                kept[key[:3]] = kept.get(key[:3], 0) + 1
+        # Periods and room default to what the stored timetable already uses
+        periods = periods_per_week.get(assignment.subject_id, len(old_keys) or DEFAULT_PERIODS_PER_WEEK)
+        if assignment.subject_id in rooms:
+            room = rooms[assignment.subject_id]
+        else:
+            room = existing[old_keys[0]][0].room if old_keys else None
+        new_lessons = build_lessons(
+            [(assignment.class_id, assignment.subject_id, assignment.teacher_id)],
+            {assignment.subject_id: periods},
+            rooms={assignment.subject_id: room},
+            numbered=kept
+        )
+
+        started = time.perf_counter()
+        unplaced = timetable.replace(old_keys, new_lessons)
+        elapsed = time.perf_counter() - started
+
+        # Write back only lessons whose slot, teacher or room changed; lessons
+        # the repair search displaced but could not re-place lose their slot
+        changed = set(old_keys)
+        changed.update(key for key in existing if key not in timetable.placement)
+        for key, slot in timetable.placement.items():
+            before = existing.get(key)
+            lesson = timetable.lessons[key]
+            if before is None or before[0] != lesson or timetable.slot(before[1], before[2]) != slot:
+                changed.add(key)
+
+        stale = [existing[key] for key in changed if key in existing]
+        for lesson, day, period in stale:
+            TimetableSlot.query.filter_by(class_id=lesson.class_id, day=day, period=period).delete()
+        db.session.flush()
+        rows = _slot_rows(timetable, changed)
+        if rows:
+            db.session.execute(TimetableSlot.__table__.insert(), rows)
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Timetable updated',
+            'changed_slots': len(rows),
+            'unplaced': _unplaced_dicts(unplaced),
+            'solve_ms': round(elapsed * 1000, 1)
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@timetable_bp.route('/class/<int:class_id>', methods=['GET'])
+@login_required
+def get_class_timetable(class_id):
+    try:
+        slots = TimetableSlot.query.filter_by(class_id=class_id).order_by(TimetableSlot.day, TimetableSlot.period).all()
+        return jsonify({'class_id': class_id, 'slots': [slot.to_dict() for slot in slots]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@timetable_bp.route('/teacher/<int:teacher_id>', methods=['GET'])
+@login_required
+def get_teacher_timetable(teacher_id):
+    try:
+        slots = TimetableSlot.query.filter_by(teacher_id=teacher_id).order_by(TimetableSlot.day, TimetableSlot.period).all()
+        return jsonify({'teacher_id': teacher_id, 'slots': [slot.to_dict() for slot in slots]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
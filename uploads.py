@@ -0,0 +1,201 @@
+from flask import Blueprint, request, jsonify, session, current_app, send_file
+from src.models.school import db, UserRole, Student, Teacher, Assignment, AssignmentSubmission
+from src.routes.auth import login_required, role_required, get_principal
+from src.utils.blob_store import (
+    BlobStore, UploadError, blob_reference, parse_reference, UPLOAD_MAX_AGE, EXPIRE_EVERY
+)
+from datetime import datetime
+import os
+
+uploads_bp = Blueprint('uploads', __name__)
+
+DEFAULT_MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+# Suggested PATCH size; clients may send any size up to what remains
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+
+def upload_store():
+    """The app's BlobStore, rooted at UPLOAD_FOLDER (instance/uploads by default).
+
+    Uploads idle for UPLOAD_MAX_AGE seconds are swept as new ones start.
+    """
+    store = current_app.extensions.get('upload_store')
+    if store is None:
+        root = current_app.config.get('UPLOAD_FOLDER') or os.path.join(current_app.instance_path, 'uploads')
+        store = current_app.extensions['upload_store'] = BlobStore(
+            root,
+            max_age=current_app.config.get('UPLOAD_MAX_AGE', UPLOAD_MAX_AGE),
+            expire_every=current_app.config.get('UPLOAD_EXPIRE_EVERY', EXPIRE_EVERY)
+        )
+    return store
+
+def _status(upload_id, meta):
+    return {
+        'upload_id': upload_id,
+        'filename': meta['filename'],
+        'size': meta['size'],
+        'offset': meta['offset'],
+        'complete': 'digest' in meta
+    }
+
+def _owned_upload(upload_id):
+    meta = upload_store().upload_meta(upload_id)
+    if meta['user_id'] != session['user_id']:
+        raise UploadError('Upload not found', 404)
+    return meta
+
+def _record_submission(meta):
+    """Point the student's submission at the finished blob (idempotent)."""
+    submission = AssignmentSubmission.query.filter_by(
+        assignment_id=meta['assignment_id'], student_id=meta['student_id']
+    ).first()
+    if submission is None:
+        submission = AssignmentSubmission(assignment_id=meta['assignment_id'], student_id=meta['student_id'])
+        db.session.add(submission)
+    reference = blob_reference(meta['digest'], meta['filename'])
+    if submission.file_path != reference:
+        submission.file_path = reference
+        submission.submitted_at = datetime.utcnow()
+    db.session.commit()
+    return submission
+
+@uploads_bp.route('', methods=['POST'])
+@role_required([UserRole.STUDENT])
+def create_upload():
+    try:
+        data = request.get_json()
+
+        # Validate required fields
+        required_fields = ['assignment_id', 'filename', 'size']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'{field} is required'}), 400
+
+        size = data['size']
+        max_size = current_app.config.get('UPLOAD_MAX_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+        if not isinstance(size, int) or not 0 <= size <= max_size:
+            return jsonify({'error': f'size must be between 0 and {max_size} bytes'}), 413
+
+        filename = os.path.basename(str(data['filename'])).strip()
+        if not filename:
+            return jsonify({'error': 'filename is required'}), 400
+
+        student = Student.query.filter_by(user_id=session['user_id']).first()
+        assignment = db.session.get(Assignment, data['assignment_id'])
+        if not student or not assignment or assignment.class_id != student.class_id:
+            return jsonify({'error': 'Assignment not found'}), 404
+
+        graded = db.session.query(AssignmentSubmission.id).filter(
+            AssignmentSubmission.assignment_id == assignment.id,
+            AssignmentSubmission.student_id == student.id,
+            AssignmentSubmission.graded_at.isnot(None)
+        ).first()
+        if graded:
+            return jsonify({'error': 'Submission has already been graded'}), 409
+
+        upload_id = upload_store().create_upload(
+            size,
+            filename=filename,
+            user_id=session['user_id'],
+            student_id=student.id,
+            assignment_id=assignment.id
+        )
+        response = jsonify({
+            'upload_id': upload_id,
+            'offset': 0,
+            'size': size,
+            'chunk_size': current_app.config.get('UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+        })
+        response.headers['Location'] = f'{request.path}/{upload_id}'
+        return response, 201
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@uploads_bp.route('/<upload_id>', methods=['GET'])
+@login_required
+def get_upload(upload_id):
+    """Current offset of an upload; HEAD works too, for resuming clients."""
+    try:
+        meta = _owned_upload(upload_id)
+        response = jsonify(_status(upload_id, meta))
+        response.headers['Upload-Offset'] = str(meta['offset'])
+        response.headers['Upload-Length'] = str(meta['size'])
+        response.cache_control.no_store = True
+        return response, 200
+
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@uploads_bp.route('/<upload_id>', methods=['PATCH'])
+@login_required
+def append_upload(upload_id):
+    """Append the raw request body at Upload-Offset, streaming it to disk."""
+    try:
+        offset = request.headers.get('Upload-Offset', type=int)
+        if offset is None:
+            return jsonify({'error': 'Upload-Offset header is required'}), 400
+
+        _owned_upload(upload_id)
+        meta = upload_store().append(upload_id, offset, request.stream, request.content_length)
+
+        status = _status(upload_id, meta)
+        if status['complete']:
+            status['submission'] = _record_submission(meta).to_dict()
+        response = jsonify(status)
+        response.headers['Upload-Offset'] = str(meta['offset'])
+        return response, 200
+
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _can_download(submission):
+    role, _ = get_principal(session['user_id'])
+    if role in (UserRole.ADMIN, UserRole.PRINCIPAL):
+        return True
+    if role == UserRole.TEACHER:
+        return db.session.query(Assignment.id).join(Teacher, Assignment.teacher_id == Teacher.id).filter(
+            Assignment.id == submission.assignment_id,
+            Teacher.user_id == session['user_id']
+        ).first() is not None
+    if role == UserRole.STUDENT:
+        return db.session.query(Student.id).filter_by(id=submission.student_id, user_id=session['user_id']).first() is not None
+    return False
+
+@uploads_bp.route('/submissions/<int:submission_id>/file', methods=['GET'])
+@login_required
+def download_submission_file(submission_id):
+    """Serve a submitted file; Range requests get 206 partial responses."""
+    try:
+        submission = db.session.get(AssignmentSubmission, submission_id)
+        if not submission or not _can_download(submission):
+            return jsonify({'error': 'File not found'}), 404
+
+        reference = parse_reference(submission.file_path)
+        if reference is None:
+            return jsonify({'error': 'File not found'}), 404
+        digest, filename = reference
+        path = upload_store().path(digest)
+        if not os.path.exists(path):
+            return jsonify({'error': 'File not found'}), 404
+
+        response = send_file(
+            path,
+            as_attachment=True,
+            download_name=filename,
+            etag=digest,
+            conditional=True,
+            max_age=None
+        )
+        # Blob content never changes for a digest, but access is per user
+        response.cache_control.no_cache = None
+        response.cache_control.private = True
+        response.cache_control.max_age = 24 * 3600
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,18 +1,10 @@
-from flask_sqlalchemy import SQLAlchemy
+"""The User model and db now live in src.models.school.
 
-db = SQLAlchemy()
+This module used to create a second SQLAlchemy() with its own User model
+on a separate metadata, so importing both gave two registries and, once
+bound, two engines and connection pools. It only re-exports the shared
+objects now; import from src.models.school in new code.
+"""
+from src.models.school import db, User
 
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-
-    def __repr__(self):
-        return f'<User {self.username}>'
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email
-        }
+__all__ = ['db', 'User']
@@ -0,0 +1,380 @@
+"""Bulk import of students, parents and their links for admissions season.
+
+A sheet has one row per account with a role column:
+
+    role, email, password, first_name, last_name, phone, address,
+    student rows:  student_id, date_of_birth, gender, admission_date, class_id
+    parent rows:   occupation, relationship, children
+
+children lists the parent's children separated by ';' as admission numbers
+(student_id) or student emails, from the same sheet or already enrolled.
+student_id may be left blank to get STU<user id>, like /register.
+
+The pipeline validates every row first. It then checks emails, admission
+numbers, classes and children against the database with one set-based
+query each, hashes the passwords in a process pool, and inserts in
+batched transactions: students first, then parents with their links. A
+failed batch is rolled back and split in halves until the rows that cannot
+be saved are isolated, so one bad row does not take its batch with it. The
+report names each rejected row with its reason; database errors are logged,
+never returned, since they quote other rows' values.
+
+Emails are kept exactly as entered, as /register and /login match them.
+"""
+from flask import current_app
+from sqlalchemy import insert
+from src.models.school import db, User, UserRole, Student, Parent, StudentParent, Class
+from src.utils.passwords import hash_passwords
+from datetime import date, datetime
+import csv
+import io
+
+try:
+    import openpyxl
+except ImportError:  # optional, only needed for .xlsx sheets
+    openpyxl = None
+
+BATCH_SIZE = 500
+# Values per IN (...) lookup; sheets below this size need a single query
+LOOKUP_CHUNK = 5000
+
+RELATIONSHIPS = ('father', 'mother', 'guardian')
+# Column widths from the models, checked up front so a long value rejects
+# its row instead of failing the insert
+MAX_LENGTHS = {
+    'email': 120,
+    'first_name': 50,
+    'last_name': 50,
+    'phone': 20,
+    'gender': 10,
+    'student_id': 20,
+    'occupation': 100,
+}
+REQUIRED_FIELDS = {
+    'student': ('email', 'password', 'first_name', 'last_name', 'date_of_birth', 'class_id'),
+    'parent': ('email', 'password', 'first_name', 'last_name', 'children'),
+}
+
+class RowRejected(Exception):
+    """Raised while inserting a batch to drop one row and retry the rest."""
+
+    def __init__(self, record, reason):
+        super().__init__(reason)
+        self.record = record
+        self.reason = reason
+
+def _normalise_header(name):
+    return str(name or '').strip().lower().replace(' ', '_')
+
+def read_rows(raw, filename=None, mimetype=None):
+    """[(row number, {column: value})] from CSV or XLSX bytes.
+
+    Row numbers match the sheet, header being row 1; blank rows are skipped.
+    Raises ValueError for unreadable sheets.
+    """
+    is_xlsx = (filename or '').lower().endswith('.xlsx') or mimetype == (
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    if is_xlsx:
+        if openpyxl is None:
+            raise ValueError('openpyxl is required to read .xlsx sheets; upload CSV instead')
+        try:
+            workbook = openpyxl.load_workbook(io.BytesIO(raw), read_only=True, data_only=True)
+        except Exception:
+            raise ValueError('File is not a readable .xlsx workbook')
+        lines = workbook.active.iter_rows(values_only=True)
+    else:
+        lines = csv.reader(io.StringIO(raw.decode('utf-8-sig')))
+
+    header = next(lines, None)
+    if not header:
+        raise ValueError('Sheet is empty')
+    columns = [_normalise_header(name) for name in header]
+    if 'role' not in columns or 'email' not in columns:
+        raise ValueError('Sheet needs at least role and email columns')
+
+    rows = []
+    for number, values in enumerate(lines, start=2):
+        row = {
+            column: (value.isoformat() if isinstance(value, (date, datetime)) else str(value).strip())
+            for column, value in zip(columns, values)
+            if column and value is not None and str(value).strip() != ''
+        }
+        if row:
+            rows.append((number, row))
+    return rows
+
+def _parse_date(value, field):
+    try:
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'{field} must be YYYY-MM-DD')
+
+def _parse_row(row):
+    """Validated record for one sheet row; raises ValueError with the reason."""
+    role = row.get('role', '').lower()
+    if role not in REQUIRED_FIELDS:
+        raise ValueError('role must be student or parent')
+    missing = [field for field in REQUIRED_FIELDS[role] if not row.get(field)]
+    if missing:
+        raise ValueError(f'{", ".join(missing)} required')
+
+    email = row['email']
+    if '@' not in email:
+        raise ValueError('email is not valid')
+    too_long = [field for field, limit in MAX_LENGTHS.items() if len(row.get(field) or '') > limit]
+    if too_long:
+        raise ValueError(', '.join(f'{field} must be at most {MAX_LENGTHS[field]} characters' for field in too_long))
+    record = {
+        'role': role,
+        'email': email,
+        'password': row['password'],
+        'profile': {
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'phone': row.get('phone'),
+            'address': row.get('address')
+        }
+    }
+
+    if role == 'student':
+        try:
+            # Spreadsheets hand whole numbers over as 3.0
+            class_id = float(row['class_id'])
+            if not class_id.is_integer():
+                raise ValueError
+            class_id = int(class_id)
+        except (ValueError, OverflowError):
+            raise ValueError('class_id must be a whole number')
+        record['student_id'] = row.get('student_id')
+        record['profile'].update(
+            date_of_birth=_parse_date(row['date_of_birth'], 'date_of_birth'),
+            gender=row.get('gender'),
+            admission_date=_parse_date(row['admission_date'], 'admission_date') if row.get('admission_date') else date.today(),
+            class_id=class_id
+        )
+    else:
+        relationship = row.get('relationship', 'guardian').lower()
+        if relationship not in RELATIONSHIPS:
+            raise ValueError(f'relationship must be one of: {", ".join(RELATIONSHIPS)}')
+        record['relationship'] = relationship
+        record['children'] = [child.strip() for child in row['children'].split(';') if child.strip()]
+        record['profile']['occupation'] = row.get('occupation')
+    return record
+
+def _lookup(query_for, values):
+    """Run query_for(chunk) over values in LOOKUP_CHUNK pieces and merge the rows."""
+    values = list(values)
+    rows = []
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        rows.extend(query_for(values[start:start + LOOKUP_CHUNK]))
+    return rows
+
+def _insert_users(records, hashes, now):
+    """executemany INSERT of the batch's users; returns their ids in record order.
+
+    Ids are read back by email in one SELECT rather than with RETURNING,
+    which SQLite can only order by falling back to one INSERT per row.
+    """
+    db.session.execute(insert(User), [
+        {
+            'email': record['email'],
+            'password_hash': hashes[record['email']],
+            'role': UserRole(record['role']),
+            'is_active': True,
+            'created_at': now,
+            'updated_at': now
+        }
+        for record in records
+    ])
+    ids = dict(db.session.query(User.email, User.id).filter(User.email.in_([record['email'] for record in records])))
+    return [ids[record['email']] for record in records]
+
+def _insert_profiles(model, rows):
+    """executemany INSERT of profile rows; returns {user_id: profile id}."""
+    db.session.execute(insert(model), rows)
+    return dict(db.session.query(model.user_id, model.id).filter(model.user_id.in_([row['user_id'] for row in rows])))
+
+def import_users(rows, dry_run=False, batch_size=BATCH_SIZE):
+    """Validate and insert sheet rows from read_rows; returns the import report."""
+    errors = []
+    records = []
+
+    def reject(record, message):
+        errors.append({'row': record['row'], 'email': record['email'], 'error': message})
+
+    # Row-level validation and duplicates within the sheet
+    seen_emails, seen_admissions = set(), set()
+    for number, row in rows:
+        try:
+            record = _parse_row(row)
+        except ValueError as e:
+            errors.append({'row': number, 'email': row.get('email'), 'error': str(e)})
+            continue
+        record['row'] = number
+        if record['email'] in seen_emails:
+            reject(record, 'Duplicate email in sheet')
+            continue
+        if record.get('student_id') and record['student_id'] in seen_admissions:
+            reject(record, 'Duplicate student_id in sheet')
+            continue
+        seen_emails.add(record['email'])
+        if record.get('student_id'):
+            seen_admissions.add(record['student_id'])
+        records.append(record)
+
+    # One set-based query per kind of reference
+    taken_emails = {email for email, in _lookup(
+        lambda chunk: db.session.query(User.email).filter(User.email.in_(chunk)), seen_emails
+    )}
+    taken_admissions = {admission for admission, in _lookup(
+        lambda chunk: db.session.query(Student.student_id).filter(Student.student_id.in_(chunk)), seen_admissions
+    )}
+    class_ids = {record['profile']['class_id'] for record in records if record['role'] == 'student'}
+    valid_classes = {class_id for class_id, in _lookup(
+        lambda chunk: db.session.query(Class.id).filter(Class.id.in_(chunk)), class_ids
+    )}
+
+    students, parents = [], []
+    for record in records:
+        if record['email'] in taken_emails:
+            reject(record, 'Email already registered')
+        elif record.get('student_id') in taken_admissions:
+            reject(record, 'student_id already exists')
+        elif record['role'] == 'student' and record['profile']['class_id'] not in valid_classes:
+            reject(record, f'Class {record["profile"]["class_id"]} not found')
+        else:
+            (students if record['role'] == 'student' else parents).append(record)
+
+    # Children resolve to students in this sheet or already enrolled
+    sheet_children = {record['email'] for record in students}
+    sheet_children.update(record['student_id'] for record in students if record['student_id'])
+    references = {child for record in parents for child in record['children']} - sheet_children
+    enrolled = {}
+    for student_pk, admission, email in _lookup(
+        lambda chunk: db.session.query(Student.id, Student.student_id, User.email).join(
+            User, Student.user_id == User.id
+        ).filter(db.or_(Student.student_id.in_(chunk), User.email.in_(chunk))),
+        references
+    ):
+        enrolled[admission] = student_pk
+        enrolled[email] = student_pk
+
+    valid_parents = []
+    for record in parents:
+        unknown = [child for child in record['children'] if child not in sheet_children and child not in enrolled]
+        if unknown:
+            reject(record, f'Unknown or rejected child: {", ".join(unknown)}')
+        else:
+            valid_parents.append(record)
+    parents = valid_parents
+
+    report = {
+        'rows': len(rows),
+        'dry_run': dry_run,
+        'created': {'students': 0, 'parents': 0, 'links': 0},
+        'errors': errors
+    }
+    if dry_run:
+        report['valid'] = {'students': len(students), 'parents': len(parents)}
+        report['failed'] = len(errors)
+        errors.sort(key=lambda e: e['row'])
+        return report
+
+    # Student primary keys by email and admission number, filled as batches commit
+    created = {}
+
+    hashes = dict(zip(
+        [record['email'] for record in students + parents],
+        hash_passwords([record['password'] for record in students + parents])
+    ))
+    now = datetime.utcnow()
+
+    def run_batches(batch_records, insert_batch):
+        """Insert in batches; insert_batch returns a callback run once its batch commits."""
+        # A stack, last item next, so batches go in sheet order
+        pending = [batch_records[start:start + batch_size] for start in range(0, len(batch_records), batch_size)][::-1]
+        while pending:
+            batch = pending.pop()
+            try:
+                committed = insert_batch(batch)
+                db.session.commit()
+            except RowRejected as e:
+                db.session.rollback()
+                reject(e.record, e.reason)
+                batch = [record for record in batch if record is not e.record]
+                if batch:
+                    pending.append(batch)
+                continue
+            except Exception:
+                db.session.rollback()
+                if len(batch) == 1:
+                    current_app.logger.exception('Import of row %s failed', batch[0]['row'])
+                    reject(batch[0], 'Could not be saved')
+                else:
+                    # Halve until the rows the database refuses are isolated
+                    middle = len(batch) // 2
+                    pending.extend([batch[middle:], batch[:middle]])
+                continue
+            committed()
+
+    # Students first so parents in any batch can link to them
+    def insert_students(batch):
+        user_ids = _insert_users(batch, hashes, now)
+        admissions = [record['student_id'] or f'STU{user_id:06d}' for record, user_id in zip(batch, user_ids)]
+        # Generated numbers are only known now; an explicit one elsewhere may already hold them
+        generated = {admission for record, admission in zip(batch, admissions) if not record['student_id']}
+        clashes = (generated & seen_admissions) | {admission for admission, in _lookup(
+            lambda chunk: db.session.query(Student.student_id).filter(Student.student_id.in_(chunk)), generated
+        )}
+        for record, admission in zip(batch, admissions):
+            if admission in clashes:
+                raise RowRejected(record, f'Generated student_id {admission} is already taken; give one explicitly')
+
+        student_ids = _insert_profiles(Student, [
+            dict(record['profile'], user_id=user_id, student_id=admission)
+            for record, user_id, admission in zip(batch, user_ids, admissions)
+        ])
+
+        def committed():
+            for record, user_id in zip(batch, user_ids):
+                created[record['email']] = student_ids[user_id]
+                if record['student_id']:
+                    created[record['student_id']] = student_ids[user_id]
+            report['created']['students'] += len(batch)
+        return committed
+
+    def insert_parents(batch):
+        user_ids = _insert_users(batch, hashes, now)
+        parent_ids = _insert_profiles(Parent, [
+            dict(record['profile'], user_id=user_id)
+            for record, user_id in zip(batch, user_ids)
+        ])
+        links = [
+            {'student_id': student_pk, 'parent_id': parent_ids[user_id], 'relationship': record['relationship']}
+            for record, user_id in zip(batch, user_ids)
+            for student_pk in record['child_ids']
+        ]
+        db.session.execute(insert(StudentParent), links)
+
+        def committed():
+            report['created']['parents'] += len(batch)
+            report['created']['links'] += len(links)
+        return committed
+
+    run_batches(students, insert_students)
+
+    # A parent whose child was rejected while saving has nobody to link to
+    linkable = []
+    for record in parents:
+        child_ids = [created.get(child) or enrolled.get(child) for child in record['children']]
+        if None in child_ids:
+            reject(record, 'Child was not imported')
+        else:
+            record['child_ids'] = list(dict.fromkeys(child_ids))
+            linkable.append(record)
+    run_batches(linkable, insert_parents)
+
+    report['failed'] = len(errors)
+    errors.sort(key=lambda e: e['row'])
+    return report